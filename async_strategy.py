@@ -0,0 +1,158 @@
+"""Asyncio execution path for the VWAP strategy."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, List, Optional
+
+import metrics
+from deadlines import deadline, remaining
+from order_book import WorkingOrder
+from scheduler import Scheduler
+from vwap_strategy import VWAPStrategy
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVWAPStrategy(VWAPStrategy):
+    """VWAP strategy that overlaps independent API round trips.
+
+    The position check, market data fetch and price quote are issued
+    together, so the reads of an iteration take about as long as the slowest
+    of them rather than their sum. The rest of the iteration (decision,
+    order placement, snapshot and journal) is the synchronous strategy's
+    ``_execute``, run in a worker thread under the same iteration deadline.
+    The cancels of an order replacement are sent in parallel on the event
+    loop before the new order is placed, as are the cancels on shutdown.
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Await a coroutine function, or run a blocking one in a worker thread.
+
+        Blocking calls run under what is left of the calling thread's deadline
+        and may hand cancels back to this event loop (see ``_cancel_orders``).
+        """
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        self._loop = asyncio.get_running_loop()
+        return await asyncio.to_thread(_call_within, remaining(), func, args, kwargs)
+
+    async def _gather_cancels(self, order_ids: List[str], seconds: Optional[float]) -> List[Any]:
+        """Cancel orders concurrently under ``seconds``; each result or exception, in order."""
+        return await asyncio.gather(
+            *(asyncio.to_thread(_call_within, seconds, self._cancel_order, (order_id,), {})
+              for order_id in order_ids),
+            return_exceptions=True
+        )
+
+    def _cancel_orders(self, orders: List[WorkingOrder]) -> bool:
+        """
+        Cancel working orders in parallel on the strategy's event loop.
+
+        Runs in the worker thread of ``_execute``, which waits for all of the
+        cancels before the replacement is placed. Called anywhere else, the
+        orders are cancelled one after another.
+
+        Raises:
+            Exception: The first cancel error, once every cancel has finished
+        """
+        loop = self._loop
+        if len(orders) < 2 or loop is None or not loop.is_running() or _running_loop() is loop:
+            return super()._cancel_orders(orders)
+        results = asyncio.run_coroutine_threadsafe(
+            self._gather_cancels([order.order_id for order in orders], remaining()), loop
+        ).result()
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return all(results)
+
+    async def cancel_all_orders_async(self):
+        """Cancel all open orders for the instrument concurrently."""
+        try:
+            orders = await self._call(self.client.get_orders, status='OPEN')
+            order_ids = self._instrument_order_ids(orders)
+            results = await self._gather_cancels(order_ids, remaining())
+            failed = False
+            for order_id, result in zip(order_ids, results):
+                if isinstance(result, Exception):
+                    failed = True
+                    logger.error(f"Error cancelling order {order_id}: {result}")
+            if failed:
+                self.order_book.mark_stale()
+            else:
+                self.order_book.reconcile(self.instrument, [])
+
+        except Exception as e:
+            logger.error(f"Error cancelling orders: {e}")
+            self.order_book.mark_stale()
+
+    async def execute_strategy_async(self):
+        """Execute one iteration of the strategy with concurrent reads."""
+        with metrics.timed(metrics.ITERATION_SECONDS, self.instrument):
+            logger.info("Executing strategy iteration...")
+            self.iteration += 1
+            self.degraded = []
+            started = time.perf_counter()
+            # The deadline is this thread's, so other tasks on the loop share it
+            with deadline(self.iteration_budget):
+                has_position, data, current_price = await asyncio.gather(
+                    self._call(self.has_open_position),
+                    self._call(self.fetch_market_data),
+                    self._call(self.get_current_price)
+                )
+                await self._call(self._execute, started, current_price, has_position, data,
+                                 time.perf_counter() - started)
+
+    async def run_async(self):
+        """Run the strategy loop on the event loop."""
+        logger.info("Starting VWAP strategy (async)...")
+        logger.info(f"Configuration: deviation={self.vwap_deviation}, "
+                   f"interval={self.timer_interval}s, size={self.contract_size}")
+
+        scheduler = Scheduler()
+        due = scheduler.now()
+        try:
+            while True:
+                try:
+                    await self.execute_strategy_async()
+                except Exception as e:
+                    logger.error(f"Error in strategy execution: {e}", exc_info=True)
+
+                # Next bar close one interval after this run was due, so run time does not drift
+                due = scheduler.next_due(due, self.timer_interval)
+                wait = due - scheduler.now()
+                logger.info(f"Waiting {wait:.0f} seconds until next check...")
+                await asyncio.sleep(wait)
+
+        except KeyboardInterrupt:
+            logger.info("Strategy stopped by user")
+            await self.cancel_all_orders_async()
+        except asyncio.CancelledError:
+            logger.info("Strategy stopped by user")
+            await self.cancel_all_orders_async()
+            raise
+        except Exception as e:
+            logger.error(f"Strategy error: {e}", exc_info=True)
+            await self.cancel_all_orders_async()
+            raise
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """The event loop running in this thread, if any."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _call_within(seconds: Optional[float], func: Callable, args, kwargs):
+    """Call ``func`` under a deadline of ``seconds`` (None: unbounded)."""
+    if seconds is not None:
+        # deadline() treats 0 as unbounded; a spent deadline must stay spent
+        seconds = max(seconds, 1e-9)
+    with deadline(seconds):
+        return func(*args, **kwargs)
@@ -11,6 +11,8 @@ router = APIRouter()
 class ConfigResponse(BaseModel):
     """Configuration response model."""
     vwap_deviation: float
+    band_mode: str
+    anchor: str
     timer_interval: int
     contract_size: int
     instrument: str
@@ -21,6 +23,8 @@ async def get_config():
     """Get current configuration."""
     return ConfigResponse(
         vwap_deviation=settings.VWAP_DEVIATION,
+        band_mode=settings.BAND_MODE,
+        anchor=settings.VWAP_ANCHOR,
         timer_interval=settings.TIMER_INTERVAL,
         contract_size=settings.CONTRACT_SIZE,
         instrument=settings.INSTRUMENT
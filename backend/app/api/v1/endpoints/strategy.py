@@ -1,19 +1,28 @@
 """Strategy control endpoints."""
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
+import json
 import logging
+import time
 
 from app.core.config import settings
+from app.core.workers import run_blocking
+from app.services.state_stream import StateStream
 from app.services.strategy_service import StrategyService
+from snapshots import etag_matches
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Global strategy service instance
 strategy_service = StrategyService()
+state_stream = StateStream(strategy_service, settings.STREAM_INTERVAL, settings.STREAM_QUEUE_SIZE)
+
+# Seconds of silence after which streams send a keepalive
+KEEPALIVE_INTERVAL = 15.0
 
 
 class StrategyStatusResponse(BaseModel):
@@ -21,6 +30,7 @@ class StrategyStatusResponse(BaseModel):
     is_running: bool
     status: str
     config: dict
+    instruments: dict = {}
 
 
 class StrategyControlRequest(BaseModel):
@@ -36,7 +46,8 @@ async def get_strategy_status():
         return StrategyStatusResponse(
             is_running=status["is_running"],
             status=status["status"],
-            config=status["config"]
+            config=status["config"],
+            instruments=status["instruments"]
         )
     except Exception as e:
         logger.error(f"Error getting strategy status: {e}")
@@ -48,14 +59,15 @@ async def control_strategy(request: StrategyControlRequest):
     """Start or stop the strategy."""
     try:
         if request.action == "start":
-            result = strategy_service.start_strategy()
+            result = await run_blocking(strategy_service.start_strategy, time.perf_counter(),
+                                        timeout=settings.STRATEGY_START_TIMEOUT)
             return JSONResponse({
                 "success": True,
                 "message": "Strategy started",
                 "status": result
             })
         elif request.action == "stop":
-            result = strategy_service.stop_strategy()
+            result = await run_blocking(strategy_service.stop_strategy)
             return JSONResponse({
                 "success": True,
                 "message": "Strategy stopped",
@@ -63,29 +75,91 @@ async def control_strategy(request: StrategyControlRequest):
             })
         else:
             raise HTTPException(status_code=400, detail="Invalid action. Use 'start' or 'stop'")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error controlling strategy: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/instruments")
+async def get_instruments():
+    """Get per-instrument strategy status."""
+    try:
+        return JSONResponse({"instruments": strategy_service.get_instrument_status()})
+    except Exception as e:
+        logger.error(f"Error getting instrument status: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/positions")
-async def get_positions():
+async def get_positions(instrument: Optional[str] = None):
     """Get current positions."""
     try:
-        positions = strategy_service.get_positions()
+        positions = await run_blocking(strategy_service.get_positions, instrument)
         return JSONResponse({"positions": positions})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting positions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/vwap")
-async def get_vwap():
-    """Get current VWAP calculation."""
+async def get_vwap(instrument: Optional[str] = None,
+                   if_none_match: Optional[str] = Header(None)):
+    """Get the current VWAP snapshot; honours If-None-Match with a 304."""
     try:
-        vwap_data = strategy_service.get_vwap_data()
-        return JSONResponse(vwap_data)
+        cached = await run_blocking(strategy_service.get_vwap_snapshot, instrument)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting VWAP data: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
+        return JSONResponse({"error": str(e)})
+    if cached is None:
+        return JSONResponse({"error": "Strategy not initialized"})
+    
+    # Clients revalidate every time; unchanged snapshots cost a 304
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(cached.payload, headers=headers)
+
+
+@router.get("/stream")
+async def stream_state():
+    """Push strategy state as Server-Sent Events: the full state, then changed fields."""
+    async def events():
+        subscription = state_stream.subscribe()
+        try:
+            while True:
+                message = await subscription.get(KEEPALIVE_INTERVAL)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                kind, data = message
+                yield f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            state_stream.unsubscribe(subscription)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.websocket("/ws")
+async def stream_state_ws(websocket: WebSocket):
+    """Push strategy state over a WebSocket: the full state, then changed fields."""
+    await websocket.accept()
+    subscription = state_stream.subscribe()
+    try:
+        while True:
+            message = await subscription.get(KEEPALIVE_INTERVAL)
+            if message is None:
+                await websocket.send_json({"type": "keepalive"})
+                continue
+            kind, data = message
+            await websocket.send_json({"type": kind, "data": data})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        state_stream.unsubscribe(subscription)
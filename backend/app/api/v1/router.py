@@ -2,11 +2,12 @@
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import strategy, status, config
+from app.api.v1.endpoints import strategy, status, config, metrics
 
 api_router = APIRouter()
 
 api_router.include_router(status.router, prefix="/status", tags=["status"])
 api_router.include_router(config.router, prefix="/config", tags=["config"])
 api_router.include_router(strategy.router, prefix="/strategy", tags=["strategy"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
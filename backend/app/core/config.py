@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "VWAP Trading Strategy API"
     VERSION: str = "1.0.0"
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    # Log per-module import times at startup (app.main reads it before the settings load)
+    STARTUP_PROFILE: bool = os.getenv("STARTUP_PROFILE", "False").lower() == "true"
     
     # Server settings
     HOST: str = os.getenv("HOST", "0.0.0.0")
@@ -38,9 +40,54 @@ class Settings(BaseSettings):
     
     # Strategy configuration (with defaults)
     VWAP_DEVIATION: float = float(os.getenv("VWAP_DEVIATION", "2.0"))
+    # "fixed": deviation in price points, "stddev": in volume-weighted standard deviations
+    BAND_MODE: str = os.getenv("BAND_MODE", "fixed")
+    # "rolling" (last 240 minutes) or a session anchor: "globex", "rth", "weekly", "custom"
+    VWAP_ANCHOR: str = os.getenv("VWAP_ANCHOR", "rolling")
+    # Exchange-local "HH:MM" or "YYYY-MM-DDTHH:MM" for the "custom" anchor
+    VWAP_ANCHOR_TIME: str = os.getenv("VWAP_ANCHOR_TIME", "")
     TIMER_INTERVAL: int = int(os.getenv("TIMER_INTERVAL", "1800"))
     CONTRACT_SIZE: int = int(os.getenv("CONTRACT_SIZE", "1"))
     INSTRUMENT: str = os.getenv("INSTRUMENT", "MGC")
+    BAR_STORE_DIR: str = os.getenv("BAR_STORE_DIR", "")
+    # Directory of the binary decision/order journal (empty disables it)
+    JOURNAL_DIR: str = os.getenv("JOURNAL_DIR", "")
+    # Comma-separated instruments or a JSON list of per-strategy configs
+    STRATEGIES: str = os.getenv("STRATEGIES", "")
+    # Market feed triggering re-evaluation on bars/quotes ("poll"; empty uses the timer only)
+    MARKET_FEED: str = os.getenv("MARKET_FEED", "")
+    FEED_POLL_INTERVAL: float = float(os.getenv("FEED_POLL_INTERVAL", "1.0"))
+    EVENT_MIN_INTERVAL: float = float(os.getenv("EVENT_MIN_INTERVAL", "1.0"))
+    # Local order book: seconds between broker reconciles, price change kept as is
+    ORDER_RECONCILE_INTERVAL: float = float(os.getenv("ORDER_RECONCILE_INTERVAL", "300"))
+    ORDER_PRICE_TOLERANCE: float = float(os.getenv("ORDER_PRICE_TOLERANCE", "0.0"))
+    # Seconds between reconciles of the tracked positions with the broker
+    POSITION_RECONCILE_INTERVAL: float = float(os.getenv("POSITION_RECONCILE_INTERVAL", "60"))
+    # Seconds identical client reads are shared from a cache
+    CLIENT_CACHE_TTL: float = float(os.getenv("CLIENT_CACHE_TTL", "1.0"))
+    # "calls/seconds" budgets of client calls and of historical bar requests (empty: unlimited)
+    RATE_LIMIT: str = os.getenv("RATE_LIMIT", "200/60")
+    HISTORY_RATE_LIMIT: str = os.getenv("HISTORY_RATE_LIMIT", "50/30")
+    # Session token lifetime (refreshed an hour early) and seconds between keep-alive reads
+    CLIENT_TOKEN_TTL: float = float(os.getenv("CLIENT_TOKEN_TTL", "86400"))
+    CLIENT_KEEPALIVE_INTERVAL: float = float(os.getenv("CLIENT_KEEPALIVE_INTERVAL", "240"))
+    # Time budget of an iteration's client calls, per-read deadline (0: unbounded) and hedge delay
+    ITERATION_BUDGET: float = float(os.getenv("ITERATION_BUDGET", "20"))
+    READ_TIMEOUT: float = float(os.getenv("READ_TIMEOUT", "5"))
+    HEDGE_AFTER: float = float(os.getenv("HEDGE_AFTER", "1.0"))
+    # Consecutive failed reads that stop calls to an endpoint, and seconds until it is retried
+    BREAKER_FAILURES: int = int(os.getenv("BREAKER_FAILURES", "5"))
+    BREAKER_RESET: float = float(os.getenv("BREAKER_RESET", "30"))
+    # Age in seconds after which the VWAP snapshot served by the API is refreshed
+    SNAPSHOT_TTL: float = float(os.getenv("SNAPSHOT_TTL", "5"))
+    # Push stream: seconds between state reads outside strategy runs, messages queued per client
+    STREAM_INTERVAL: float = float(os.getenv("STREAM_INTERVAL", "1.0"))
+    STREAM_QUEUE_SIZE: int = int(os.getenv("STREAM_QUEUE_SIZE", "16"))
+    # Worker threads for broker-touching API calls, and their deadline in seconds
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "4"))
+    API_CALL_TIMEOUT: float = float(os.getenv("API_CALL_TIMEOUT", "10"))
+    # Deadline for starting the strategy, which authenticates with the broker
+    STRATEGY_START_TIMEOUT: float = float(os.getenv("STRATEGY_START_TIMEOUT", "30"))
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,24 @@
+"""Prometheus metrics of the API itself."""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Latency of API requests by route template, so path parameters do not add series
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latency of API requests",
+    ["method", "route", "status"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# Blocking service calls that missed their deadline on the worker pool
+WORKER_CALL_TIMEOUTS = Counter(
+    "api_worker_call_timeouts",
+    "Blocking service calls that exceeded their deadline",
+    ["call"],
+)
+
+# Seconds from the app module starting to load to its first /health response
+TIME_TO_HEALTHY_SECONDS = Gauge(
+    "api_time_to_first_healthy_seconds",
+    "Seconds from loading the API to its first healthy response",
+)
@@ -0,0 +1,48 @@
+"""Bounded worker pool for blocking (broker-touching) service calls."""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import WORKER_CALL_TIMEOUTS
+
+logger = logging.getLogger(__name__)
+
+# Blocking calls run here so they never stall the event loop; the bound keeps
+# a slow broker from tying up more than API_WORKERS threads
+executor = ThreadPoolExecutor(max_workers=settings.API_WORKERS, thread_name_prefix="api-worker")
+
+
+async def run_blocking(func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Run a blocking call on the worker pool with a deadline.
+
+    Args:
+        func: Blocking callable
+        *args: Positional arguments for ``func``
+        timeout: Seconds allowed, including time queued for a free worker
+            (default: API_CALL_TIMEOUT)
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        The call's result
+
+    Raises:
+        HTTPException: 504 if the deadline passes; the call itself cannot be
+            interrupted and finishes in the background
+    """
+    timeout = settings.API_CALL_TIMEOUT if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        name = getattr(func, "__name__", repr(func))
+        WORKER_CALL_TIMEOUTS.labels(name).inc()
+        logger.warning(f"{name} did not finish within {timeout}s")
+        raise HTTPException(status_code=504, detail=f"{name} did not finish within {timeout}s")
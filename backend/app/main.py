@@ -1,24 +1,44 @@
 """FastAPI main application entry point."""
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+import asyncio
 import logging
+import os
 import sys
+import time
+from contextlib import asynccontextmanager
+
+# Start of the time to the first healthy response
+STARTED = time.perf_counter()
+
+# Root modules live two directories up outside the container
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from import_profile import ImportProfile
+
+# Read before the settings are loaded, so that their import is profiled too
+_import_profile = ImportProfile().start() if os.getenv("STARTUP_PROFILE", "False").lower() == "true" else None
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.api.v1.endpoints.strategy import strategy_service
 from app.api.v1.router import api_router
 from app.core.config import settings
 from app.core.logging_config import setup_logging
+from app.core.metrics import HTTP_REQUEST_SECONDS, TIME_TO_HEALTHY_SECONDS
 
 # Configure logging first
 setup_logging(level="DEBUG" if settings.DEBUG else "INFO")
 logger = logging.getLogger(__name__)
 
-# Validate configuration on startup
-try:
-    settings.validate_credentials()
-except ValueError as e:
-    logger.warning(f"Configuration validation warning: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Stop the strategies and write out their journal when the API shuts down."""
+    yield
+    await asyncio.to_thread(strategy_service.shutdown)
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -27,7 +47,8 @@ app = FastAPI(
     description="VWAP-Based Automated Trading Strategy API for TopstepX",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -39,9 +60,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Record request latency by route
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe the latency of every request by route."""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, _route_template(request), status_code
+        ).observe(time.perf_counter() - started)
+
+
+def _route_template(request: Request) -> str:
+    """Path template of the matched route, e.g. /api/v1/strategy/status."""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Routes of included routers may only know the path below their prefix
+    concrete = route.path_format.format(**request.path_params)
+    path = request.url.path
+    prefix = path[:len(path) - len(concrete)] if path.endswith(concrete) else ""
+    return prefix + route.path
+
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+if _import_profile is not None:
+    _import_profile.stop()
+    _import_profile.log()
+
+_healthy = False
+
 
 @app.get("/")
 async def root():
@@ -56,6 +112,12 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    global _healthy
+    if not _healthy:
+        _healthy = True
+        elapsed = time.perf_counter() - STARTED
+        TIME_TO_HEALTHY_SECONDS.set(elapsed)
+        logger.info(f"First healthy response {elapsed:.3f}s after the app started loading")
     return JSONResponse({"status": "healthy"})
 
 
@@ -0,0 +1,81 @@
+"""Push stream of strategy state for the streaming endpoints."""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.services.strategy_service import StrategyService
+
+from broadcast import Broadcaster, Subscription
+
+logger = logging.getLogger(__name__)
+
+
+class StateStream:
+    """Single producer of strategy state changes for all streaming clients.
+
+    While at least one client is subscribed, a task on the event loop reads
+    the service's local stream state after every strategy run (and every
+    ``interval`` seconds for changes made outside a run) and publishes it
+    through a ``Broadcaster``. The state comes from published snapshots and
+    the local order and position books, so clients never cause API calls.
+    """
+
+    def __init__(self, service: StrategyService, interval: float = 1.0, queue_size: int = 16):
+        """
+        Initialize the stream.
+
+        Args:
+            service: Strategy service whose state is streamed
+            interval: Seconds between state reads when no strategy runs
+            queue_size: Messages queued per client before updates are merged
+        """
+        self.service = service
+        self.interval = interval
+        self.broadcaster = Broadcaster(queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._engine = None
+
+    def subscribe(self) -> Subscription:
+        """Subscribe a client, starting the producer if it is not running."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+        # New clients start from the current state, not the last published one
+        self.broadcaster.publish(self.service.get_stream_state())
+        return self.broadcaster.subscribe()
+
+    def unsubscribe(self, subscription: Subscription):
+        """Unsubscribe a client; the producer stops after the last one."""
+        self.broadcaster.unsubscribe(subscription)
+        if self._wake is not None:
+            self._wake.set()
+
+    def _notify(self, name: str):
+        """Engine listener: wake the producer after a strategy run."""
+        loop = self._loop
+        if self._task is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self):
+        """Publish state changes until no client is subscribed."""
+        try:
+            while len(self.broadcaster):
+                engine = self.service.engine
+                if engine is not None and engine is not self._engine:
+                    engine.add_listener(self._notify)
+                    self._engine = engine
+                # Clear first so runs finishing during the read are not lost
+                self._wake.clear()
+                self.broadcaster.publish(self.service.get_stream_state())
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        except Exception as e:
+            logger.error(f"State stream stopped: {e}", exc_info=True)
+        finally:
+            self._task = None
@@ -2,45 +2,109 @@
 
 import threading
 import logging
-from typing import Dict, Optional, List
+import time
+from typing import TYPE_CHECKING, Dict, Optional, List
 from app.core.config import settings
 
-# Import strategy from parent directory
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../..'))
+from snapshots import CachedSnapshot, SnapshotCache, snapshot_payload
 
-from vwap_strategy import VWAPStrategy
+if TYPE_CHECKING:
+    # The strategy modules load numpy; they are imported when a strategy first starts
+    from client_manager import ClientManager
+    from strategy_engine import StrategyEngine
+    from vwap_strategy import VWAPStrategy
 
 logger = logging.getLogger(__name__)
 
+# Seconds shutdown waits for a running strategy iteration
+SHUTDOWN_TIMEOUT = 30.0
+
 
 class StrategyService:
-    """Service for managing the VWAP trading strategy."""
+    """Service for managing the VWAP trading strategies."""
     
     def __init__(self):
         """Initialize the strategy service."""
-        self.strategy: Optional[VWAPStrategy] = None
-        self.strategy_thread: Optional[threading.Thread] = None
-        self.is_running = False
+        self.engine: Optional["StrategyEngine"] = None
+        self.snapshots = SnapshotCache(settings.SNAPSHOT_TTL)
+        self._clients: Optional["ClientManager"] = None
         self._lock = threading.Lock()
+    
+    @property
+    def clients(self) -> "ClientManager":
+        """Client manager, created on first use; it authenticates on the first start."""
+        if self._clients is None:
+            from client_manager import ClientManager
+            # Kept warm for later starts
+            self._clients = ClientManager(
+                token_ttl=settings.CLIENT_TOKEN_TTL,
+                keepalive_interval=settings.CLIENT_KEEPALIVE_INTERVAL,
+                cache_ttl=settings.CLIENT_CACHE_TTL,
+                rate_limit=settings.RATE_LIMIT,
+                history_rate_limit=settings.HISTORY_RATE_LIMIT,
+                read_timeout=settings.READ_TIMEOUT,
+                hedge_after=settings.HEDGE_AFTER,
+                breaker_failures=settings.BREAKER_FAILURES,
+                breaker_reset=settings.BREAKER_RESET
+            )
+        return self._clients
+    
+    @property
+    def is_running(self) -> bool:
+        return self.engine is not None and self.engine.is_running
+    
+    @property
+    def strategy(self) -> Optional["VWAPStrategy"]:
+        """The primary (first configured) strategy."""
+        if self.engine is None:
+            return None
+        return next(iter(self.engine.strategies.values()))
+    
+    def get_strategy(self, name: Optional[str] = None) -> Optional["VWAPStrategy"]:
+        """Strategy by name, or the primary strategy if no name is given."""
+        if name is None:
+            return self.strategy
+        if self.engine is None:
+            return None
+        return self.engine.strategies.get(name)
         
     def get_status(self) -> Dict:
-        """Get current strategy status."""
-        with self._lock:
-            return {
-                "is_running": self.is_running,
-                "status": "running" if self.is_running else "stopped",
-                "config": {
-                    "vwap_deviation": settings.VWAP_DEVIATION,
-                    "timer_interval": settings.TIMER_INTERVAL,
-                    "contract_size": settings.CONTRACT_SIZE,
-                    "instrument": settings.INSTRUMENT
-                }
-            }
+        """
+        Get current strategy status.
+        
+        Reads local state only and does not wait for a start or stop in
+        progress, so it is safe to call on the event loop.
+        """
+        is_running = self.is_running
+        return {
+            "is_running": is_running,
+            "status": "running" if is_running else "stopped",
+            "config": {
+                "vwap_deviation": settings.VWAP_DEVIATION,
+                "band_mode": settings.BAND_MODE,
+                "anchor": settings.VWAP_ANCHOR,
+                "timer_interval": settings.TIMER_INTERVAL,
+                "contract_size": settings.CONTRACT_SIZE,
+                "instrument": settings.INSTRUMENT
+            },
+            "instruments": self.get_instrument_status()
+        }
+    
+    def get_instrument_status(self) -> Dict[str, Dict]:
+        """Get per-instrument strategy status."""
+        if self.engine is None:
+            return {}
+        return self.engine.get_status()
     
-    def start_strategy(self) -> Dict:
-        """Start the trading strategy in a background thread."""
+    def start_strategy(self, requested_at: Optional[float] = None) -> Dict:
+        """
+        Start the trading strategies in a background thread.
+        
+        Args:
+            requested_at: ``time.perf_counter()`` when the start was
+                requested, for the time-to-first-decision metric (default: now)
+        """
+        requested_at = time.perf_counter() if requested_at is None else requested_at
         with self._lock:
             if self.is_running:
                 return {"status": "already_running", "message": "Strategy is already running"}
@@ -49,39 +113,54 @@ class StrategyService:
                 # Validate credentials before starting
                 settings.validate_credentials()
                 
-                # Initialize strategy
-                self.strategy = VWAPStrategy(
-                    vwap_deviation=settings.VWAP_DEVIATION,
-                    timer_interval=settings.TIMER_INTERVAL,
-                    contract_size=settings.CONTRACT_SIZE,
-                    instrument=settings.INSTRUMENT
-                )
+                # Initialize strategies on one shared client
+                if self.engine is None:
+                    from bar_store import BarStore
+                    from feeds import create_feed
+                    from journal import JournalWriter
+                    from strategy_engine import StrategyEngine, parse_strategy_configs
+                    
+                    configs = parse_strategy_configs(settings.STRATEGIES, {
+                        "vwap_deviation": settings.VWAP_DEVIATION,
+                        "band_mode": settings.BAND_MODE,
+                        "anchor": settings.VWAP_ANCHOR,
+                        "anchor_time": settings.VWAP_ANCHOR_TIME or None,
+                        "timer_interval": settings.TIMER_INTERVAL,
+                        "contract_size": settings.CONTRACT_SIZE,
+                        "instrument": settings.INSTRUMENT,
+                    })
+                    client = self.clients.get()
+                    self.engine = StrategyEngine(
+                        configs,
+                        client=client,
+                        feed=create_feed(settings.MARKET_FEED, client, settings.FEED_POLL_INTERVAL),
+                        min_event_interval=settings.EVENT_MIN_INTERVAL,
+                        bar_store=BarStore(settings.BAR_STORE_DIR) if settings.BAR_STORE_DIR else None,
+                        journal=JournalWriter(settings.JOURNAL_DIR) if settings.JOURNAL_DIR else None,
+                        order_reconcile_interval=settings.ORDER_RECONCILE_INTERVAL,
+                        order_price_tolerance=settings.ORDER_PRICE_TOLERANCE,
+                        position_reconcile_interval=settings.POSITION_RECONCILE_INTERVAL,
+                        iteration_budget=settings.ITERATION_BUDGET
+                    )
                 
-                # Start strategy in background thread
-                self.strategy_thread = threading.Thread(
-                    target=self._run_strategy,
-                    daemon=True
-                )
-                self.strategy_thread.start()
-                self.is_running = True
+                self.engine.start(requested_at)
                 
                 logger.info("Strategy started successfully")
                 return {"status": "started", "message": "Strategy started successfully"}
                 
             except Exception as e:
                 logger.error(f"Error starting strategy: {e}")
-                self.is_running = False
                 raise
     
     def stop_strategy(self) -> Dict:
-        """Stop the trading strategy."""
+        """Stop the trading strategies."""
         with self._lock:
             if not self.is_running:
                 return {"status": "already_stopped", "message": "Strategy is not running"}
             
             try:
-                self.is_running = False
-                # Strategy will stop on next iteration (daemon thread)
+                # Engine stops between strategy iterations
+                self.engine.stop()
                 logger.info("Strategy stop requested")
                 return {"status": "stopped", "message": "Strategy stop requested"}
                 
@@ -89,52 +168,83 @@ class StrategyService:
                 logger.error(f"Error stopping strategy: {e}")
                 raise
     
-    def _run_strategy(self):
-        """Internal method to run strategy in background thread."""
-        try:
-            if self.strategy:
-                # Modify strategy to check is_running flag
-                while self.is_running:
-                    self.strategy.execute_strategy()
-                    import time
-                    time.sleep(self.strategy.timer_interval)
-        except Exception as e:
-            logger.error(f"Error in strategy execution: {e}")
-            self.is_running = False
+    def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """
+        Stop the strategies for good, e.g. when the API shuts down.
+        
+        Waits up to ``timeout`` seconds for a running iteration, then closes
+        the journal, so batched records are written, and the client.
+        """
+        with self._lock:
+            if self.engine is not None:
+                self.engine.close(timeout)
+            if self._clients is not None:
+                self._clients.close()
+        logger.info("Strategy service shut down")
     
-    def get_positions(self) -> List[Dict]:
-        """Get current positions."""
-        if not self.strategy:
+    def get_positions(self, name: Optional[str] = None) -> List[Dict]:
+        """Get current positions from the strategy's position tracker."""
+        strategy = self.get_strategy(name)
+        if not strategy:
             return []
         
         try:
-            if hasattr(self.strategy, 'has_open_position'):
-                has_position = self.strategy.has_open_position()
-                return [{"has_position": has_position}] if has_position else []
-            return []
+            position = strategy.get_position()
+            if not position.is_open:
+                return []
+            return [{
+                "instrument": position.instrument,
+                "quantity": position.quantity,
+                "side": position.side,
+                "average_price": position.average_price,
+                "has_position": True
+            }]
         except Exception as e:
             logger.error(f"Error getting positions: {e}")
             return []
     
-    def get_vwap_data(self) -> Dict:
-        """Get current VWAP calculation data."""
-        if not self.strategy:
-            return {"error": "Strategy not initialized"}
+    def get_stream_state(self) -> Dict:
+        """
+        Get the state pushed to streaming clients.
+        
+        Only local state is read (published snapshots, order book, position
+        tracker), so it costs no API calls however often it is read.
+        """
+        strategies = {}
+        if self.engine is not None:
+            for name, strategy in self.engine.strategies.items():
+                snapshot = strategy.snapshot
+                strategies[name] = {
+                    "vwap": snapshot_payload(snapshot) if snapshot is not None else None,
+                    "orders": [order._asdict() for order in strategy.order_book.for_instrument(strategy.instrument)],
+                    "position": strategy.position_tracker.get(strategy.instrument)._asdict(),
+                }
+        return {"is_running": self.is_running, "strategies": strategies}
+    
+    def get_vwap_snapshot(self, name: Optional[str] = None) -> Optional[CachedSnapshot]:
+        """
+        Get the strategy's latest VWAP snapshot.
         
+        The snapshot published by the strategy loop is served while it is
+        younger than SNAPSHOT_TTL; concurrent requests for a stale one share
+        a single refresh against the API.
+        
+        Raises:
+            Exception: If the refresh fails and nothing was published yet
+        """
+        strategy = self.get_strategy(name)
+        if not strategy:
+            return None
+        key = name or next(iter(self.engine.strategies))
+        return self.snapshots.get(key, lambda: strategy.snapshot, strategy.refresh_snapshot)
+    
+    def get_vwap_data(self, name: Optional[str] = None) -> Dict:
+        """Get current VWAP calculation data."""
         try:
-            # Fetch and calculate VWAP
-            data = self.strategy.fetch_market_data()
-            vwap = self.strategy.calculate_vwap(data)
-            current_price = self.strategy.get_current_price()
-            
-            return {
-                "vwap": vwap,
-                "current_price": current_price,
-                "deviation": self.strategy.vwap_deviation,
-                "long_entry": vwap - self.strategy.vwap_deviation if vwap else None,
-                "short_entry": vwap + self.strategy.vwap_deviation if vwap else None,
-            }
+            cached = self.get_vwap_snapshot(name)
         except Exception as e:
             logger.error(f"Error getting VWAP data: {e}")
             return {"error": str(e)}
-
+        if cached is None:
+            return {"error": "Strategy not initialized"}
+        return cached.payload
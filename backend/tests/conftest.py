@@ -0,0 +1,44 @@
+"""Fixtures for the API tests: the app with a strategy engine on the simulated exchange."""
+
+import logging
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND not in sys.path:
+    sys.path.insert(0, BACKEND)
+
+from fastapi.testclient import TestClient
+
+# The app module puts the root modules on the path, so it is imported first
+from app.main import app
+from app.api.v1.endpoints import strategy as endpoints
+
+from simulator import SimulatedExchange
+from snapshots import SnapshotCache
+from strategy_engine import StrategyEngine, parse_strategy_configs
+
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+@pytest.fixture
+def service():
+    """The app's strategy service with an engine on the simulator, not started."""
+    service = endpoints.strategy_service
+    engine, snapshots = service.engine, service.snapshots
+    service.engine = StrategyEngine(
+        parse_strategy_configs('', {'vwap_deviation': 2.0, 'timer_interval': 1800,
+                                    'contract_size': 1, 'instrument': 'MGC'}),
+        client=SimulatedExchange(seed=3)
+    )
+    service.snapshots = SnapshotCache(snapshots.ttl)
+    yield service
+    service.engine, service.snapshots = engine, snapshots
+
+
+@pytest.fixture
+def client(service):
+    """Test client for the app; the lifespan is not run, so the service stays open."""
+    return TestClient(app)
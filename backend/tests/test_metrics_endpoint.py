@@ -0,0 +1,37 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def scrape(client):
+    """Samples exposed by the metrics endpoint, as {(name, labels): value}."""
+    response = client.get('/api/v1/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    return {(sample.name, tuple(sorted(sample.labels.items()))): sample.value
+            for family in text_string_to_metric_families(response.text)
+            for sample in family.samples}
+
+
+def test_metrics_expose_request_latency_by_route(client, service):
+    """Requests are counted by method, route template and status, with the strategy stages."""
+    key = ('http_request_duration_seconds_count',
+           (('method', 'GET'), ('route', '/api/v1/strategy/status'), ('status', '200')))
+    before = scrape(client).get(key, 0.0)
+    for _ in range(2):
+        assert client.get('/api/v1/strategy/status').status_code == 200
+    service.strategy.execute_strategy()
+
+    samples = scrape(client)
+    assert samples[key] == before + 2
+    assert samples[('strategy_iteration_duration_seconds_count', (('instrument', 'MGC'),))] >= 1
+
+
+def test_metrics_expose_time_to_first_healthy_response(client):
+    """The startup gauge is set by the first /health response and kept afterwards."""
+    assert client.get('/health').status_code == 200
+    first = scrape(client)[('api_time_to_first_healthy_seconds', ())]
+    assert first > 0
+
+    assert client.get('/health').status_code == 200
+    assert scrape(client)[('api_time_to_first_healthy_seconds', ())] == first
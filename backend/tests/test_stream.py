@@ -0,0 +1,88 @@
+"""Tests for the streaming endpoints and their shared state stream."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.api.v1.endpoints import strategy as endpoints
+from app.main import app
+from app.services.state_stream import StateStream
+
+
+@pytest.fixture
+def stream(service, monkeypatch):
+    """A fresh state stream for the endpoints, polling often so tests do not wait."""
+    stream = StateStream(service, interval=0.2)
+    monkeypatch.setattr(endpoints, 'state_stream', stream)
+    return stream
+
+
+def run_strategies(engine):
+    """Make every strategy due and run it, as the engine's loop would."""
+    for name in engine.strategies:
+        engine.scheduler.schedule(name, engine.scheduler.now())
+    assert engine.run_due()
+
+
+def wait_for_unsubscribed(stream, timeout=2.0):
+    """Wait for the endpoint to unregister its subscriber after a disconnect."""
+    deadline = time.monotonic() + timeout
+    while len(stream.broadcaster) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return len(stream.broadcaster) == 0
+
+
+def test_websocket_receives_state_then_updates(client, service, stream):
+    """A client gets the full state first, then the fields a strategy run changed."""
+    with client.websocket_connect('/api/v1/strategy/ws') as websocket:
+        first = websocket.receive_json()
+        assert first['type'] == 'snapshot'
+        assert first['data']['is_running'] is False
+        assert first['data']['strategies']['MGC']['vwap'] is None
+        assert len(stream.broadcaster) == 1
+
+        run_strategies(service.engine)
+        update = websocket.receive_json()
+        assert update['type'] == 'update'
+        assert update['data']['strategies']['MGC']['vwap']['instrument'] == 'MGC'
+        assert 'is_running' not in update['data']
+
+    assert wait_for_unsubscribed(stream)
+
+
+def test_server_sent_events_receive_state_then_updates(service, stream):
+    """The SSE stream sends the same messages as named events."""
+    # TestClient reads whole response bodies, so the endless stream is read
+    # at the ASGI level and ended with a disconnect
+    events = []
+    disconnected = asyncio.Event()
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+             'scheme': 'http', 'path': '/api/v1/strategy/stream', 'raw_path': b'/api/v1/strategy/stream',
+             'root_path': '', 'query_string': b'', 'headers': [(b'host', b'test')],
+             'client': ('test', 1), 'server': ('test', 80)}
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            assert dict(message['headers'])[b'content-type'].startswith(b'text/event-stream')
+        elif message['type'] == 'http.response.body' and message.get('body'):
+            for event in message['body'].decode().split('\n\n'):
+                if event.startswith('event: '):
+                    kind, data = event.split('\n')
+                    events.append((kind[len('event: '):], json.loads(data[len('data: '):])))
+                    if len(events) == 1:
+                        await asyncio.to_thread(run_strategies, service.engine)
+                    else:
+                        disconnected.set()
+
+    asyncio.run(asyncio.wait_for(app(scope, receive, send), 5.0))
+
+    assert [kind for kind, _ in events] == ['snapshot', 'update']
+    assert events[0][1]['strategies']['MGC']['vwap'] is None
+    assert events[1][1]['strategies']['MGC']['vwap']['instrument'] == 'MGC'
+    assert len(stream.broadcaster) == 0
@@ -0,0 +1,46 @@
+"""Tests for the cached VWAP snapshot endpoint."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_unchanged_snapshot_revalidates_with_304(client, service):
+    """A request with the returned ETag gets 304 until the snapshot's content changes."""
+    first = client.get('/api/v1/strategy/vwap')
+    assert first.status_code == 200 and first.json()['instrument'] == 'MGC'
+    etag = first.headers['ETag']
+
+    again = client.get('/api/v1/strategy/vwap', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.headers['ETag'] == etag
+    assert again.content == b''
+
+    strategy = service.strategy
+    strategy.snapshot = strategy.snapshot._replace(vwap=strategy.snapshot.vwap + 1.0)
+    changed = client.get('/api/v1/strategy/vwap', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+
+def test_concurrent_requests_share_one_refresh(client, service):
+    """Requests arriving while a stale snapshot is refreshed wait for that refresh."""
+    strategy = service.strategy
+    strategy.refresh_snapshot()
+    strategy.snapshot = strategy.snapshot._replace(timestamp=0.0)
+    refresh = strategy.refresh_snapshot
+    refreshes = []
+    lock = threading.Lock()
+
+    def slow_refresh():
+        with lock:
+            refreshes.append(threading.current_thread().name)
+        time.sleep(0.3)
+        return refresh()
+
+    strategy.refresh_snapshot = slow_refresh
+    # No more requests than API workers, so none queues past the refresh
+    with ThreadPoolExecutor(4) as pool:
+        responses = list(pool.map(lambda _: client.get('/api/v1/strategy/vwap'), range(4)))
+
+    assert [r.status_code for r in responses] == [200] * 4
+    assert len(refreshes) == 1
+    assert len({r.headers['ETag'] for r in responses}) == 1
@@ -0,0 +1,72 @@
+"""Tests for running blocking service calls on the bounded worker pool."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.main import app
+
+
+def block_positions(service, monkeypatch):
+    """Make position reads block until the returned event is set; counts the calls entered."""
+    release = threading.Event()
+    entered = threading.Semaphore(0)
+
+    def get_positions(name=None):
+        entered.release()
+        release.wait(10.0)
+        return []
+
+    monkeypatch.setattr(service, 'get_positions', get_positions)
+    return release, entered
+
+
+def timeouts():
+    """Position reads counted as timed out so far."""
+    return REGISTRY.get_sample_value('api_worker_call_timeouts_total', {'call': 'get_positions'}) or 0.0
+
+
+def test_slow_call_returns_504(client, service, monkeypatch):
+    """A call that misses its deadline answers 504 and is counted."""
+    release, _ = block_positions(service, monkeypatch)
+    monkeypatch.setattr(settings, 'API_CALL_TIMEOUT', 0.2)
+    before = timeouts()
+    try:
+        started = time.perf_counter()
+        response = client.get('/api/v1/strategy/positions')
+        elapsed = time.perf_counter() - started
+    finally:
+        release.set()
+
+    assert response.status_code == 504
+    assert 'get_positions' in response.json()['detail']
+    assert elapsed < 2.0
+    assert timeouts() == before + 1
+
+
+def test_health_answers_while_workers_are_blocked(service, monkeypatch):
+    """Blocked strategy calls tie up the worker pool, never the event loop."""
+    release, entered = block_positions(service, monkeypatch)
+    # One event loop serves every request, as under uvicorn
+    with TestClient(app) as client, ThreadPoolExecutor(settings.API_WORKERS) as pool:
+        try:
+            blocked = [pool.submit(client.get, '/api/v1/strategy/positions')
+                       for _ in range(settings.API_WORKERS)]
+            for _ in blocked:
+                assert entered.acquire(timeout=5.0)
+
+            started = time.perf_counter()
+            health = client.get('/health')
+            status = client.get('/api/v1/strategy/status')
+            elapsed = time.perf_counter() - started
+            assert not any(future.done() for future in blocked)
+        finally:
+            release.set()
+
+        assert health.status_code == 200 and status.status_code == 200
+        assert elapsed < 1.0
+        assert [future.result().status_code for future in blocked] == [200] * settings.API_WORKERS
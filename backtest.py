@@ -0,0 +1,413 @@
+"""Vectorized backtest of the VWAP band entry logic over historical bars."""
+
+import argparse
+import datetime
+import logging
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+import config
+from journal import decisions, decode
+from vwap_accumulator import VWAPAccumulator
+
+logger = logging.getLogger(__name__)
+
+# Initial window when scanning forward for exits, and the cap on
+# queries x window elements evaluated per step
+_SCAN_CHUNK = 16
+_SCAN_BLOCK = 1 << 22
+
+
+class Trade(NamedTuple):
+    """A filled entry order and how the position was closed."""
+    side: str  # 'BUY' or 'SELL'
+    order_index: int  # Bar whose close triggered the limit order
+    entry_index: int
+    entry_price: float
+    exit_index: int
+    exit_price: float
+    reason: str  # 'target', 'stop' or 'end'
+    pnl: float  # Price points times contract size
+
+
+def rolling_vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 volume: np.ndarray, lookback: int) -> np.ndarray:
+    """
+    VWAP over the trailing ``lookback`` bars ending at each bar.
+
+    Uses the same typical price as ``VWAPStrategy.calculate_vwap``. Prices are
+    offset by the first typical price before the cumulative sums so that
+    differences of large running totals keep their precision.
+
+    Returns:
+        Array of VWAP values, NaN where the window has no volume
+    """
+    typical_price = (high + low + close) / 3.0
+    offset = typical_price[0] if len(typical_price) else 0.0
+    cum_pv = np.concatenate(([0.0], np.cumsum((typical_price - offset) * volume)))
+    cum_volume = np.concatenate(([0.0], np.cumsum(volume)))
+
+    end = np.arange(1, len(volume) + 1)
+    start = np.maximum(end - lookback, 0)
+    window_volume = cum_volume[end] - cum_volume[start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = (cum_pv[end] - cum_pv[start]) / window_volume + offset
+    vwap[window_volume <= 0] = np.nan
+    return vwap
+
+
+def decision_indices(n_bars: int, timer_interval: int, lookback: int) -> np.ndarray:
+    """Bars at whose close the strategy runs, one per ``timer_interval`` seconds."""
+    step = max(1, int(timer_interval) // 60)
+    return np.arange(lookback - 1, n_bars, step)
+
+
+def run_backtest(bars: Dict[str, np.ndarray], vwap_deviation: float = 2.0,
+                 timer_interval: int = 1800, lookback: int = 240,
+                 contract_size: int = 1, take_profit: Optional[float] = None,
+                 stop_loss: Optional[float] = None,
+                 vwap: Optional[np.ndarray] = None) -> List[Trade]:
+    """
+    Backtest the strategy's entry rules over 1-minute bars.
+
+    At every decision bar with no open position the close is compared with
+    VWAP -/+ ``vwap_deviation``; a cross places a limit order at the band,
+    replacing any working order. Orders fill on a later bar that trades
+    through the limit. The live strategy leaves exits to the trader, so the
+    backtest closes positions with a bracket of ``take_profit`` and
+    ``stop_loss`` points (both default to ``vwap_deviation``); when a bar
+    touches both, the stop is assumed to fill first.
+
+    VWAP, signals, fills and exits are all computed with array operations;
+    the only Python loop walks the chain of trades that are actually taken.
+
+    Args:
+        bars: Column arrays with open, high, low, close and volume
+        vwap_deviation: Deviation from VWAP for entry logic
+        timer_interval: Seconds between strategy iterations
+        lookback: Bars in the VWAP window
+        contract_size: Contracts per trade
+        take_profit: Exit target in price points
+        stop_loss: Exit stop in price points
+        vwap: Precomputed ``rolling_vwap`` for this lookback, if available
+
+    Returns:
+        Trades in entry order
+    """
+    open_, high, low, close = (np.asarray(bars[name], dtype=float)
+                               for name in ('open', 'high', 'low', 'close'))
+    n_bars = len(close)
+    take_profit = vwap_deviation if take_profit is None else take_profit
+    stop_loss = vwap_deviation if stop_loss is None else stop_loss
+    if vwap is None:
+        vwap = rolling_vwap(high, low, close, np.asarray(bars['volume'], dtype=float), lookback)
+
+    decision_idx = decision_indices(n_bars, timer_interval, lookback)
+    decision_vwap = vwap[decision_idx]
+    decision_close = close[decision_idx]
+    long_entry = decision_vwap - vwap_deviation
+    short_entry = decision_vwap + vwap_deviation
+    is_long = decision_close <= long_entry  # False where VWAP is NaN
+    is_short = ~is_long & (decision_close >= short_entry)
+    signal = is_long | is_short
+    signal_index = decision_idx[signal]
+    signal_long = is_long[signal]
+    signal_price = np.where(is_long, long_entry, short_entry)[signal]
+
+    n_signals = len(signal_index)
+    if n_signals == 0:
+        return []
+
+    # Fills: each order works from the bar after its signal until the next
+    # signal replaces it, so every bar belongs to at most one order.
+    bar_index = np.arange(signal_index[0] + 1, n_bars)
+    owner = np.searchsorted(signal_index, bar_index, side='left') - 1
+    hit = np.where(signal_long[owner], low[bar_index] <= signal_price[owner],
+                   high[bar_index] >= signal_price[owner])
+    filled_signal, first_hit = np.unique(owner[hit], return_index=True)
+    fill = bar_index[hit][first_hit]
+
+    is_buy = signal_long[filled_signal]
+    price = signal_price[filled_signal]
+    entry = np.where(is_buy, np.minimum(price, open_[fill]), np.maximum(price, open_[fill]))
+    target = np.where(is_buy, entry + take_profit, entry - take_profit)
+    stop = np.where(is_buy, entry - stop_loss, entry + stop_loss)
+
+    # Exits: first later bar touching the stop or target of each filled order
+    exit_index = _first_touch(low, high, fill + 1,
+                              np.where(is_buy, stop, target), np.where(is_buy, target, stop))
+    exit_index, exit_price, reason = _price_exits(is_buy, exit_index, target, stop,
+                                                  open_, high, low, close)
+
+    # Walk the chain of trades: after an exit, the next signal at or after the
+    # exit bar is the first one seen with a flat position.
+    resume = np.searchsorted(signal_index, exit_index, side='left')
+    resume[reason == 'end'] = n_signals
+    fill_slot = np.full(n_signals, -1)
+    fill_slot[filled_signal] = np.arange(len(filled_signal))
+    fill_slot = fill_slot.tolist()
+    resume = resume.tolist()
+
+    taken = []
+    k = 0
+    while k < n_signals:
+        slot = fill_slot[k]
+        if slot < 0:
+            k += 1
+            continue
+        taken.append(slot)
+        k = resume[slot]
+
+    taken = np.array(taken, dtype=int)
+    points = np.where(is_buy, exit_price - entry, entry - exit_price) * contract_size
+    columns = zip(
+        np.where(is_buy[taken], 'BUY', 'SELL').tolist(),
+        signal_index[filled_signal[taken]].tolist(),
+        fill[taken].tolist(),
+        entry[taken].tolist(),
+        exit_index[taken].tolist(),
+        exit_price[taken].tolist(),
+        reason[taken].tolist(),
+        points[taken].tolist(),
+    )
+    return [Trade(*row) for row in columns]
+
+
+def replay_backtest(bars: Dict[str, np.ndarray], vwap_deviation: float = 2.0,
+                    timer_interval: int = 1800, lookback: int = 240,
+                    contract_size: int = 1, take_profit: Optional[float] = None,
+                    stop_loss: Optional[float] = None) -> List[Trade]:
+    """
+    Bar-by-bar replay of the same rules as ``run_backtest``.
+
+    VWAP comes from the live ``VWAPAccumulator``. This is the reference the
+    vectorized engine is checked against; it is far slower on long histories.
+    """
+    open_, high, low, close, volume = (np.asarray(bars[name], dtype=float)
+                                       for name in ('open', 'high', 'low', 'close', 'volume'))
+    n_bars = len(close)
+    take_profit = vwap_deviation if take_profit is None else take_profit
+    stop_loss = vwap_deviation if stop_loss is None else stop_loss
+    step = max(1, int(timer_interval) // 60)
+    accumulator = VWAPAccumulator(max_bars=lookback)
+
+    trades: List[Trade] = []
+    order = None  # (order_index, is_buy, price)
+    position = None  # (order_index, entry_index, is_buy, entry, target, stop)
+    for i in range(n_bars):
+        if position is not None and i > position[1]:
+            order_index, fill, is_buy, entry, target, stop = position
+            if is_buy:
+                hit = low[i] <= stop or high[i] >= target
+            else:
+                hit = high[i] >= stop or low[i] <= target
+            if hit:
+                trades.append(_close_trade(is_buy, order_index, fill, entry, i, target, stop,
+                                           open_, high, low, close, contract_size))
+                position = None
+        elif order is not None and i > order[0]:
+            order_index, is_buy, price = order
+            if (is_buy and low[i] <= price) or (not is_buy and high[i] >= price):
+                entry = min(price, open_[i]) if is_buy else max(price, open_[i])
+                if is_buy:
+                    position = (order_index, i, True, entry, entry + take_profit, entry - stop_loss)
+                else:
+                    position = (order_index, i, False, entry, entry - take_profit, entry + stop_loss)
+                order = None
+
+        accumulator.append(high[i], low[i], close[i], volume[i])
+        if i < lookback - 1 or (i - (lookback - 1)) % step != 0 or position is not None:
+            continue
+        current_vwap = accumulator.vwap
+        if current_vwap is None:
+            continue
+        long_entry = current_vwap - vwap_deviation
+        short_entry = current_vwap + vwap_deviation
+        if close[i] <= long_entry:
+            order = (i, True, long_entry)
+        elif close[i] >= short_entry:
+            order = (i, False, short_entry)
+
+    if position is not None:
+        order_index, fill, is_buy, entry, target, stop = position
+        trades.append(_close_trade(is_buy, order_index, fill, entry, None, target, stop,
+                                   open_, high, low, close, contract_size))
+    return trades
+
+
+def compare_decisions(bars: Dict[str, np.ndarray], records: np.ndarray,
+                      vwap_deviation: float = 2.0, lookback: int = 240,
+                      tolerance: float = 1e-6) -> Dict[str, np.ndarray]:
+    """
+    Compare journaled live decisions with the backtest's on the same bars.
+
+    Each live decision that evaluated the bands ('none', 'BUY' or 'SELL') is
+    matched to the last bar closed by its timestamp. The backtest decision
+    there uses that bar's ``rolling_vwap`` and the live price, so differences
+    come from the VWAP inputs (missing, late or revised bars) or the band
+    logic, not from price timing. Fixed bands only.
+
+    Args:
+        bars: Column arrays with timestamp, high, low, close and volume
+        records: Journal records (see ``journal.read_journals``)
+        vwap_deviation: Band offset the live strategy ran with
+        lookback: Bars in the live VWAP window
+        tolerance: VWAP difference up to which the two count as equal
+
+    Returns:
+        Column arrays per compared decision: timestamp, bar_index,
+        live_decision, backtest_decision, live_vwap, backtest_vwap,
+        vwap_agree and agree (same decision)
+    """
+    live = decisions(records)
+    live = live[np.isin(decode(live, 'decision'), ('none', 'BUY', 'SELL'))]
+    timestamps = live['timestamp'].astype('datetime64[ns]')
+    closes = np.asarray(bars['timestamp'], dtype='datetime64[ns]') + np.timedelta64(60, 's')
+    bar_index = np.searchsorted(closes, timestamps, side='right') - 1
+    matched = bar_index >= 0
+    live, timestamps, bar_index = live[matched], timestamps[matched], bar_index[matched]
+
+    high, low, close, volume = (np.asarray(bars[name], dtype=float)
+                                for name in ('high', 'low', 'close', 'volume'))
+    backtest_vwap = rolling_vwap(high, low, close, volume, lookback)[bar_index]
+    price = live['price']
+    backtest_decision = np.where(price <= backtest_vwap - vwap_deviation, 'BUY',
+                                 np.where(price >= backtest_vwap + vwap_deviation, 'SELL', 'none'))
+    live_decision = decode(live, 'decision')
+    return {
+        'timestamp': timestamps,
+        'bar_index': bar_index,
+        'live_decision': live_decision,
+        'backtest_decision': backtest_decision,
+        'live_vwap': live['vwap'],
+        'backtest_vwap': backtest_vwap,
+        'vwap_agree': np.abs(live['vwap'] - backtest_vwap) <= tolerance,
+        'agree': live_decision == backtest_decision,
+    }
+
+
+def summarize(trades: List[Trade]) -> Dict:
+    """Summary statistics for a list of trades."""
+    pnl = np.array([trade.pnl for trade in trades], dtype=float)
+    equity = np.cumsum(pnl)
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity
+    return {
+        "trades": len(trades),
+        "total_pnl": float(pnl.sum()),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else 0.0,
+        "avg_pnl": float(pnl.mean()) if len(pnl) else 0.0,
+        "max_drawdown": float(drawdown.max()) if len(pnl) else 0.0,
+    }
+
+
+def _first_touch(low: np.ndarray, high: np.ndarray, start: np.ndarray,
+                 lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    For each query, the first bar at or after ``start`` with ``low <= lower``
+    or ``high >= upper``; -1 if there is none.
+
+    All queries advance together through windows that double in size, so a
+    touch close to ``start`` does not cost a scan of the rest of the history.
+    """
+    n_bars = len(low)
+    result = np.full(len(start), -1)
+    pending = np.flatnonzero(start < n_bars)
+    cursor = start[pending].copy()
+    width = _SCAN_CHUNK
+    while len(pending):
+        offsets = cursor[:, None] + np.arange(width)
+        valid = offsets < n_bars
+        offsets = np.minimum(offsets, n_bars - 1)
+        hits = valid & ((low[offsets] <= lower[pending, None]) | (high[offsets] >= upper[pending, None]))
+        found = hits.any(axis=1)
+        result[pending[found]] = offsets[found, hits[found].argmax(axis=1)]
+
+        cursor = cursor[~found] + width
+        pending = pending[~found]
+        keep = cursor < n_bars
+        cursor, pending = cursor[keep], pending[keep]
+        # Widen the window while bounding the size of the query x window block
+        width = max(_SCAN_CHUNK, min(width * 2, _SCAN_BLOCK // max(len(pending), 1)))
+    return result
+
+
+def _price_exits(is_buy: np.ndarray, exit_index: np.ndarray, target: np.ndarray,
+                 stop: np.ndarray, open_: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray):
+    """Vectorized counterpart of the exit pricing in ``_close_trade``."""
+    at_end = exit_index < 0
+    exit_index = np.where(at_end, len(close) - 1, exit_index)
+    exit_open = open_[exit_index]
+    stopped = np.where(is_buy, low[exit_index] <= stop, high[exit_index] >= stop)
+    stop_price = np.where(is_buy, np.minimum(stop, exit_open), np.maximum(stop, exit_open))
+    target_price = np.where(is_buy, np.maximum(target, exit_open), np.minimum(target, exit_open))
+    exit_price = np.where(stopped, stop_price, target_price)
+    reason = np.where(stopped, 'stop', 'target')
+    exit_price = np.where(at_end, close[exit_index], exit_price)
+    reason = np.where(at_end, 'end', reason)
+    return exit_index, exit_price, reason
+
+
+def _close_trade(is_buy: bool, order_index: int, entry_index: int, entry: float,
+                 exit_index: Optional[int], target: float, stop: float,
+                 open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                 close: np.ndarray, contract_size: int) -> Trade:
+    """Build a trade, pricing the exit at the stop or target (or the open past them)."""
+    if exit_index is None:
+        exit_index = len(close) - 1
+        exit_price, reason = float(close[exit_index]), 'end'
+    elif is_buy:
+        if low[exit_index] <= stop:
+            exit_price, reason = min(stop, open_[exit_index]), 'stop'
+        else:
+            exit_price, reason = max(target, open_[exit_index]), 'target'
+    else:
+        if high[exit_index] >= stop:
+            exit_price, reason = max(stop, open_[exit_index]), 'stop'
+        else:
+            exit_price, reason = min(target, open_[exit_index]), 'target'
+
+    points = exit_price - entry if is_buy else entry - exit_price
+    return Trade(
+        side='BUY' if is_buy else 'SELL',
+        order_index=order_index,
+        entry_index=entry_index,
+        entry_price=float(entry),
+        exit_index=int(exit_index),
+        exit_price=float(exit_price),
+        reason=reason,
+        pnl=float(points * contract_size),
+    )
+
+
+def main():
+    """Run a backtest over bars from the local bar store."""
+    from bar_store import BarStore
+
+    parser = argparse.ArgumentParser(description="Backtest the VWAP strategy on stored bars")
+    parser.add_argument('--store', default=config.BAR_STORE_DIR, help="Bar store directory")
+    parser.add_argument('--instrument', default=config.INSTRUMENT)
+    parser.add_argument('--start', type=datetime.datetime.fromisoformat, required=True)
+    parser.add_argument('--end', type=datetime.datetime.fromisoformat, required=True)
+    parser.add_argument('--deviation', type=float, default=config.VWAP_DEVIATION)
+    parser.add_argument('--interval', type=int, default=config.TIMER_INTERVAL)
+    parser.add_argument('--lookback', type=int, default=240)
+    parser.add_argument('--contract-size', type=int, default=config.CONTRACT_SIZE)
+    args = parser.parse_args()
+
+    if not args.store:
+        parser.error("--store or BAR_STORE_DIR is required")
+
+    bars = BarStore(args.store).read(args.instrument, args.start, args.end)
+    trades = run_backtest(bars, args.deviation, args.interval, args.lookback, args.contract_size)
+    for key, value in summarize(trades).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    main()
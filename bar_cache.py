@@ -0,0 +1,188 @@
+"""In-memory bar cache for delta fetching of historical market data."""
+
+import datetime
+import logging
+import threading
+from typing import Optional
+
+import numpy as np
+
+from bars import COLUMNS, Bars, as_bars, bar_count, empty_bars, slice_bars, to_frame
+
+logger = logging.getLogger(__name__)
+
+
+class BarCache:
+    """Bounded buffer of 1-minute bars held as column arrays.
+
+    Bars are kept oldest first with unique timestamps. Merging fetched bars
+    inserts new bars, overwrites revisions of bars already held (the
+    still-forming bar) and drops the oldest bars once ``capacity`` is
+    exceeded. Timestamps are stored as naive UTC to match
+    ``datetime.datetime.utcnow()``. The arrays are replaced, never modified,
+    so bars handed out by ``to_bars`` stay valid.
+    """
+
+    def __init__(self, capacity: int = 1440):
+        """
+        Initialize the bar cache.
+
+        Args:
+            capacity: Maximum number of bars held before the oldest are dropped
+        """
+        self.capacity = capacity
+        self._bars: Bars = _read_only(empty_bars())
+        # Earliest time the cached bars are known to be complete from
+        self._covered_from: Optional[np.datetime64] = None
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bars['timestamp'])
+
+    @property
+    def first_timestamp(self) -> Optional[datetime.datetime]:
+        """Timestamp of the oldest cached bar, if any."""
+        timestamps = self._bars['timestamp']
+        return _to_datetime(timestamps[0]) if len(timestamps) else None
+
+    @property
+    def last_timestamp(self) -> Optional[datetime.datetime]:
+        """Timestamp of the newest cached bar, if any."""
+        timestamps = self._bars['timestamp']
+        return _to_datetime(timestamps[-1]) if len(timestamps) else None
+
+    def clear(self):
+        """Drop all cached bars."""
+        with self._lock:
+            self._bars = _read_only(empty_bars())
+            self._covered_from = None
+            self._frame = None
+
+    def fetch_start(self, window_start: datetime.datetime) -> datetime.datetime:
+        """
+        Start time for the next fetch of a window.
+
+        Args:
+            window_start: Start of the window the caller needs (naive UTC)
+
+        Returns:
+            Timestamp of the last cached bar, so the still-forming bar is
+            refetched with everything after it, or ``window_start`` when the
+            cache does not cover the window
+        """
+        with self._lock:
+            timestamps = self._bars['timestamp']
+            if (not len(timestamps) or self._covered_from is None
+                    or self._covered_from > _to_datetime64(window_start)):
+                return window_start
+            return _to_datetime(timestamps[-1])
+
+    def merge(self, data, fetched_from: datetime.datetime) -> int:
+        """
+        Merge fetched bars into the cache.
+
+        Args:
+            data: Bars (or a DataFrame) with timestamps
+            fetched_from: Start time the bars were requested from
+
+        Returns:
+            Number of bars added or revised
+        """
+        fetched_from = _to_datetime64(fetched_from)
+        new = _sorted_unique(as_bars(data))
+
+        with self._lock:
+            if self._covered_from is None or fetched_from < self._covered_from:
+                self._covered_from = fetched_from
+            if not len(new['timestamp']):
+                return 0
+
+            cached = self._bars
+            timestamps = cached['timestamp']
+            # Position of each new bar among the cached ones, and whether it is unchanged
+            position = np.searchsorted(timestamps, new['timestamp'])
+            held = position < len(timestamps)
+            held[held] = timestamps[position[held]] == new['timestamp'][held]
+            unchanged = held.copy()
+            for name in COLUMNS:
+                if name != 'timestamp':
+                    unchanged[held] &= cached[name][position[held]] == new[name][held]
+            changed = int(len(unchanged) - unchanged.sum())
+            if not changed:
+                return 0
+
+            start = int(position[0])
+            if np.isin(timestamps[start:], new['timestamp']).all():
+                # Usual delta: the fetch covers everything from its first bar on
+                merged = {name: np.concatenate((cached[name][:start], new[name])) for name in COLUMNS}
+            else:
+                keep = ~np.isin(timestamps, new['timestamp'])
+                merged = {name: np.concatenate((cached[name][keep], new[name])) for name in COLUMNS}
+                merged = slice_bars(merged, np.argsort(merged['timestamp'], kind='stable'))
+            if len(merged['timestamp']) > self.capacity:
+                merged = slice_bars(merged, slice(-self.capacity, None))
+            self._bars = _read_only(merged)
+            self._frame = None
+            return changed
+
+    def evict_before(self, timestamp: datetime.datetime) -> int:
+        """
+        Drop bars older than a timestamp.
+
+        Args:
+            timestamp: Bars strictly before this time (naive UTC) are dropped
+
+        Returns:
+            Number of bars evicted
+        """
+        with self._lock:
+            evicted = int(np.searchsorted(self._bars['timestamp'], _to_datetime64(timestamp)))
+            if evicted:
+                self._bars = slice_bars(self._bars, slice(evicted, None))
+                self._frame = None
+        return evicted
+
+    def to_bars(self) -> Bars:
+        """Cached bars as read-only column arrays, oldest first."""
+        return self._bars
+
+    def to_frame(self):
+        """
+        Cached bars as a DataFrame, oldest first (requires pandas).
+
+        The frame is rebuilt only after the cache changes, so callers must not
+        modify it in place.
+        """
+        with self._lock:
+            if self._frame is None:
+                self._frame = to_frame(self._bars)
+            return self._frame
+
+
+def _sorted_unique(bars: Bars) -> Bars:
+    """Bars sorted by timestamp, keeping the last of duplicate timestamps."""
+    if 'timestamp' not in bars:
+        raise ValueError("Bars must have a timestamp column or DatetimeIndex")
+    bars = {name: np.asarray(bars[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+    timestamps = bars['timestamp']
+    if bar_count(bars) > 1 and not (timestamps[1:] > timestamps[:-1]).all():
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        last = np.append(timestamps[1:] != timestamps[:-1], True)
+        bars = slice_bars(bars, order[last])
+    return bars
+
+
+def _read_only(bars: Bars) -> Bars:
+    for column in bars.values():
+        column.flags.writeable = False
+    return bars
+
+
+def _to_datetime64(timestamp) -> np.datetime64:
+    return np.datetime64(timestamp, 'ns')
+
+
+def _to_datetime(timestamp: np.datetime64) -> datetime.datetime:
+    return timestamp.astype('datetime64[us]').item()
@@ -0,0 +1,286 @@
+"""Columnar, memory-mapped on-disk store of 1-minute bars."""
+
+import datetime
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Column name -> on-disk dtype, the same as in memory
+from bars import COLUMNS, Bars, as_bars, bar_count, to_frame
+
+logger = logging.getLogger(__name__)
+
+
+class BarStore:
+    """Append-only bar store with one memory-mapped file per column.
+
+    Layout is ``<root>/<instrument>/<YYYY-MM-DD>/<column>.bin`` with days in
+    UTC. Each instrument also keeps ``coverage.json``, the time ranges that
+    have been fetched from the broker, so stored ranges are not refetched.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the bar store.
+
+        Args:
+            root: Directory holding the store; created if missing
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # path -> (file size, memmap) so unchanged files are not remapped
+        self._maps: Dict[str, Tuple[int, np.memmap]] = {}
+        self._coverage: Dict[str, List[List[int]]] = {}
+        self._lock = threading.RLock()
+
+    def append(self, instrument: str, data) -> int:
+        """
+        Append closed bars to the store.
+
+        Bars at or before the last stored bar of their day are skipped, so the
+        same range can be appended repeatedly.
+
+        Args:
+            instrument: Instrument symbol
+            data: Bars (or a DataFrame) with timestamps and OHLCV columns
+
+        Returns:
+            Number of bars written
+        """
+        if not bar_count(data):
+            return 0
+
+        data = as_bars(data)
+        timestamps = np.asarray(data['timestamp'], dtype='datetime64[ns]')
+        order = np.argsort(timestamps, kind='stable')
+        columns = {'timestamp': timestamps[order]}
+        for name, dtype in COLUMNS.items():
+            if name != 'timestamp':
+                columns[name] = np.asarray(data[name], dtype=dtype)[order]
+
+        days = columns['timestamp'].astype('datetime64[D]')
+        written = 0
+        with self._lock:
+            for day in np.unique(days):
+                in_day = days == day
+                day_dir = self._day_dir(instrument, str(day))
+                last = self._last_in_day(day_dir)
+                keep = in_day if last is None else in_day & (columns['timestamp'] > last)
+                keep &= np.concatenate(([True], columns['timestamp'][1:] != columns['timestamp'][:-1]))
+                if not keep.any():
+                    continue
+                os.makedirs(day_dir, exist_ok=True)
+                self._repair_day(day_dir)
+                for name, dtype in COLUMNS.items():
+                    with open(os.path.join(day_dir, f'{name}.bin'), 'ab') as f:
+                        f.write(np.ascontiguousarray(columns[name][keep], dtype=dtype).tobytes())
+                written += int(keep.sum())
+        return written
+
+    def read_days(self, instrument: str, start: datetime.datetime,
+                  end: datetime.datetime) -> Iterator[Tuple[datetime.date, Bars]]:
+        """
+        Iterate over stored bars in ``[start, end)`` one day partition at a time.
+
+        Yielded arrays are read-only views into the memory-mapped files; no
+        data is copied.
+
+        Args:
+            instrument: Instrument symbol
+            start: Range start (naive UTC, inclusive)
+            end: Range end (naive UTC, exclusive)
+        """
+        start64, end64 = np.datetime64(start, 'ns'), np.datetime64(end, 'ns')
+        first_day, last_day = start64.astype('datetime64[D]'), end64.astype('datetime64[D]')
+        for day in self._days(instrument):
+            day64 = np.datetime64(day, 'D')
+            if day64 < first_day or day64 > last_day:
+                continue
+            bars = self._map_day(self._day_dir(instrument, day))
+            if bars is None:
+                continue
+            lo = int(np.searchsorted(bars['timestamp'], start64, side='left'))
+            hi = int(np.searchsorted(bars['timestamp'], end64, side='left'))
+            if hi > lo:
+                yield (datetime.date.fromisoformat(day),
+                       {name: column[lo:hi] for name, column in bars.items()})
+
+    def read(self, instrument: str, start: datetime.datetime,
+             end: datetime.datetime) -> Bars:
+        """
+        Read stored bars in ``[start, end)`` as column arrays.
+
+        A range inside one day returns views into the memory map; ranges that
+        span days are concatenated into new arrays.
+
+        Args:
+            instrument: Instrument symbol
+            start: Range start (naive UTC, inclusive)
+            end: Range end (naive UTC, exclusive)
+
+        Returns:
+            Dict of column name to array, oldest bar first
+        """
+        parts = [bars for _, bars in self.read_days(instrument, start, end)]
+        if not parts:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+    def read_frame(self, instrument: str, start: datetime.datetime,
+                   end: datetime.datetime):
+        """Read stored bars in ``[start, end)`` as a DataFrame (requires pandas)."""
+        return to_frame(self.read(instrument, start, end))
+
+    def last_timestamp(self, instrument: str) -> Optional[datetime.datetime]:
+        """Timestamp of the newest stored bar, if any."""
+        for day in reversed(self._days(instrument)):
+            last = self._last_in_day(self._day_dir(instrument, day))
+            if last is not None:
+                return _to_datetime(last)
+        return None
+
+    def mark_covered(self, instrument: str, start: datetime.datetime,
+                     end: datetime.datetime):
+        """
+        Record that ``[start, end)`` has been fetched from the broker.
+
+        Args:
+            instrument: Instrument symbol
+            start: Range start (naive UTC)
+            end: Range end (naive UTC)
+        """
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        if end_ns <= start_ns:
+            return
+        with self._lock:
+            coverage = self._load_coverage(instrument)
+            if any(lo <= start_ns and end_ns <= hi for lo, hi in coverage):
+                return
+            intervals = sorted(coverage + [[start_ns, end_ns]])
+            merged: List[List[int]] = []
+            for lo, hi in intervals:
+                if merged and lo <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], hi)
+                else:
+                    merged.append([lo, hi])
+            self._coverage[instrument] = merged
+
+            path = os.path.join(self.root, instrument, 'coverage.json')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(merged, f)
+            os.replace(tmp_path, path)
+
+    def missing_ranges(self, instrument: str, start: datetime.datetime,
+                       end: datetime.datetime) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Sub-ranges of ``[start, end)`` that have not been fetched yet.
+
+        Args:
+            instrument: Instrument symbol
+            start: Range start (naive UTC)
+            end: Range end (naive UTC)
+
+        Returns:
+            List of (start, end) pairs as naive UTC datetimes
+        """
+        cursor, end_ns = _to_ns(start), _to_ns(end)
+        missing = []
+        with self._lock:
+            for lo, hi in self._load_coverage(instrument):
+                if hi <= cursor:
+                    continue
+                if lo >= end_ns:
+                    break
+                if lo > cursor:
+                    missing.append((cursor, lo))
+                cursor = max(cursor, hi)
+        if cursor < end_ns:
+            missing.append((cursor, end_ns))
+        return [(_to_datetime(np.datetime64(lo, 'ns')), _to_datetime(np.datetime64(hi, 'ns')))
+                for lo, hi in missing]
+
+    def _day_dir(self, instrument: str, day: str) -> str:
+        return os.path.join(self.root, instrument, day)
+
+    def _days(self, instrument: str) -> List[str]:
+        """Sorted day partitions stored for an instrument."""
+        instrument_dir = os.path.join(self.root, instrument)
+        if not os.path.isdir(instrument_dir):
+            return []
+        return sorted(name for name in os.listdir(instrument_dir)
+                      if os.path.isdir(os.path.join(instrument_dir, name)))
+
+    def _map_day(self, day_dir: str) -> Optional[Bars]:
+        """Memory-map every column of a day partition, trimmed to equal length."""
+        with self._lock:
+            columns = {}
+            for name, dtype in COLUMNS.items():
+                path = os.path.join(day_dir, f'{name}.bin')
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    return None
+                if size < dtype.itemsize:
+                    return None
+                cached = self._maps.get(path)
+                if cached is None or cached[0] != size:
+                    cached = (size, np.memmap(path, dtype=dtype, mode='r',
+                                              shape=(size // dtype.itemsize,)))
+                    self._maps[path] = cached
+                columns[name] = cached[1]
+
+        # A crash mid-append can leave columns of unequal length
+        length = min(len(column) for column in columns.values())
+        return {name: column[:length] for name, column in columns.items()}
+
+    def _repair_day(self, day_dir: str):
+        """Truncate columns left at unequal lengths by an interrupted append."""
+        lengths = {}
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(day_dir, f'{name}.bin')
+            lengths[name] = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        length = min(lengths.values())
+        if all(count == length for count in lengths.values()):
+            return
+        logger.warning(f"Truncating {day_dir} to {length} bars after an interrupted append")
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(day_dir, f'{name}.bin')
+            self._maps.pop(path, None)
+            with open(path, 'ab') as f:
+                f.truncate(length * dtype.itemsize)
+
+    def _last_in_day(self, day_dir: str) -> Optional[np.datetime64]:
+        bars = self._map_day(day_dir)
+        if bars is None or len(bars['timestamp']) == 0:
+            return None
+        return bars['timestamp'][-1]
+
+    def _load_coverage(self, instrument: str) -> List[List[int]]:
+        if instrument not in self._coverage:
+            path = os.path.join(self.root, instrument, 'coverage.json')
+            try:
+                with open(path) as f:
+                    self._coverage[instrument] = json.load(f)
+            except FileNotFoundError:
+                self._coverage[instrument] = []
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable bar store coverage {path}: {e}")
+                self._coverage[instrument] = []
+        return [list(interval) for interval in self._coverage[instrument]]
+
+
+def _to_ns(timestamp) -> int:
+    """Nanoseconds since the epoch of a naive UTC time."""
+    return int(np.datetime64(timestamp, 'ns').astype(np.int64))
+
+
+def _to_datetime(timestamp: np.datetime64) -> datetime.datetime:
+    return timestamp.astype('datetime64[us]').item()
@@ -0,0 +1,244 @@
+"""Typed column arrays of 1-minute bars and normalization of bar responses."""
+
+import datetime
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Column name -> dtype. Timestamps are naive UTC nanoseconds.
+COLUMNS = {
+    'timestamp': np.dtype('datetime64[ns]'),
+    'open': np.dtype('float64'),
+    'high': np.dtype('float64'),
+    'low': np.dtype('float64'),
+    'close': np.dtype('float64'),
+    'volume': np.dtype('float64'),
+}
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+Bars = Dict[str, np.ndarray]
+
+# Record keys accepted for each field, in order of preference; the short
+# names are those of the ProjectX gateway's bar responses
+FIELD_KEYS = {
+    'open': ('open', 'o'),
+    'high': ('high', 'h'),
+    'low': ('low', 'l'),
+    'close': ('close', 'c'),
+    'volume': ('volume', 'v'),
+}
+TIMESTAMP_KEYS = ('timestamp', 't', 'time', 'datetime', 'date')
+
+_EPOCH_UNITS = {'epoch_s': 10 ** 9, 'epoch_ms': 10 ** 6}
+
+
+def empty_bars(timestamps: bool = True) -> Bars:
+    """Bars with no rows."""
+    return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()
+            if timestamps or name != 'timestamp'}
+
+
+def bar_count(data) -> int:
+    """Number of bars in column arrays or a DataFrame."""
+    if hasattr(data, 'columns'):
+        return len(data)
+    column = data.get('close')
+    return 0 if column is None else len(column)
+
+
+def slice_bars(bars: Bars, index) -> Bars:
+    """Rows of every column selected by a slice, mask or index array."""
+    return {name: column[index] for name, column in bars.items()}
+
+
+def to_frame(bars: Bars):
+    """Bars as a pandas DataFrame, for callers that want one."""
+    import pandas as pd
+    return pd.DataFrame(bars)
+
+
+def frame_to_bars(data) -> Bars:
+    """
+    Column arrays from a bar DataFrame.
+
+    Timestamps come from a ``timestamp`` column or a DatetimeIndex and are
+    converted to naive UTC; a frame without either yields bars without a
+    ``timestamp`` column.
+    """
+    import pandas as pd
+
+    bars = {name: data[name].to_numpy(dtype=float) for name in FIELDS}
+    if 'timestamp' in data.columns:
+        timestamps = pd.to_datetime(data['timestamp'])
+    elif isinstance(data.index, pd.DatetimeIndex):
+        timestamps = data.index.to_series()
+    else:
+        return bars
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+    bars['timestamp'] = timestamps.to_numpy(dtype='datetime64[ns]')
+    return bars
+
+
+def as_bars(data) -> Bars:
+    """Column arrays from either column arrays or a DataFrame."""
+    return frame_to_bars(data) if hasattr(data, 'columns') else data
+
+
+class BarSchema(NamedTuple):
+    """Where a bar response keeps each field, and how its timestamps are written."""
+    keys: Dict[str, str]  # field -> record key
+    timestamp_key: Optional[str]
+    # 'iso' (naive ISO 8601), 'iso_z' (ISO with a Z suffix), 'iso_offset'
+    # (ISO with a +HH:MM offset), 'iso_other' (any other ISO offset),
+    # 'epoch_s', 'epoch_ms' or 'datetime'
+    timestamp_format: Optional[str]
+
+
+def resolve_schema(record: Dict[str, Any]) -> Optional[BarSchema]:
+    """
+    Work out the schema of a bar response from one of its records.
+
+    Returns:
+        The schema, or None if a price or volume field is missing
+    """
+    keys = {}
+    for field, candidates in FIELD_KEYS.items():
+        key = next((key for key in candidates if key in record), None)
+        if key is None:
+            return None
+        keys[field] = key
+
+    timestamp_key = next((key for key in TIMESTAMP_KEYS if key in record), None)
+    if timestamp_key is None:
+        timestamp_key = next((key for key in record
+                              if 'time' in key.lower() or 'date' in key.lower()), None)
+    timestamp_format = None
+    if timestamp_key is not None:
+        timestamp_format = _timestamp_format(record[timestamp_key])
+        if timestamp_format is None:
+            timestamp_key = None
+    return BarSchema(keys, timestamp_key, timestamp_format)
+
+
+def _timestamp_format(value: Any) -> Optional[str]:
+    """Timestamp format of a sample value, or None if it is not a timestamp."""
+    if isinstance(value, datetime.datetime):
+        return 'datetime'
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+        # Seconds since the epoch stay below 1e11 until the year 5138
+        return 'epoch_ms' if abs(value) >= 1e11 else 'epoch_s'
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if value.endswith('Z'):
+        return 'iso_z'
+    if parsed.tzinfo is None:
+        return 'iso'
+    return 'iso_offset' if value[-6] in '+-' and value[-3] == ':' else 'iso_other'
+
+
+class BarNormalizer:
+    """Converts bar responses of one client into ``Bars`` column arrays.
+
+    The response schema (field keys and timestamp format) is resolved from
+    the first non-empty response and reused, so each call only copies
+    values into preallocated arrays and parses timestamps with one
+    vectorized NumPy conversion. A response that no longer matches the
+    schema has it resolved again. Lists of records are the fast path;
+    pandas and polars DataFrames are accepted as well.
+    """
+
+    def __init__(self):
+        self.schema: Optional[BarSchema] = None
+
+    def normalize(self, data) -> Bars:
+        """
+        Convert a historical data response.
+
+        Args:
+            data: List of bar records, or a DataFrame
+
+        Returns:
+            Bars with naive UTC timestamps (no ``timestamp`` column when the
+            response has none); empty bars if fields are missing
+        """
+        if data is None:
+            return empty_bars()
+        if hasattr(data, 'to_dicts'):
+            data = data.to_dicts()  # polars
+        elif hasattr(data, 'columns'):
+            if data.empty:
+                return empty_bars()
+            missing = [name for name in FIELDS if name not in data.columns]
+            if missing:
+                logger.error(f"Missing required columns: {missing}")
+                return empty_bars()
+            return frame_to_bars(data)
+
+        records = data if isinstance(data, Sequence) else list(data)
+        if not records:
+            return empty_bars()
+
+        if self.schema is not None:
+            try:
+                return self._convert(records, self.schema)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.info(f"Bar response no longer matches its schema ({e}), resolving it again")
+
+        schema = resolve_schema(records[0])
+        if schema is None:
+            missing = [name for name, keys in FIELD_KEYS.items()
+                       if not any(key in records[0] for key in keys)]
+            logger.error(f"Missing required columns: {missing}")
+            return empty_bars()
+        self.schema = schema
+        return self._convert(records, schema)
+
+    def _convert(self, records: List[Dict[str, Any]], schema: BarSchema) -> Bars:
+        """Copy records into column arrays following a schema."""
+        count = len(records)
+        bars = {}
+        for field, key in schema.keys.items():
+            bars[field] = np.fromiter((record[key] for record in records), dtype=np.float64, count=count)
+        if schema.timestamp_key is not None:
+            bars['timestamp'] = _parse_timestamps(
+                [record[schema.timestamp_key] for record in records], schema.timestamp_format)
+        return bars
+
+
+def _parse_timestamps(values: List[Any], timestamp_format: str) -> np.ndarray:
+    """Parse timestamps written in one known format to naive UTC datetime64[ns]."""
+    if timestamp_format == 'iso':
+        return np.array(values, dtype='datetime64[ns]')
+    if timestamp_format == 'iso_z':
+        return np.array([value[:-1] for value in values], dtype='datetime64[ns]')
+    if timestamp_format == 'iso_offset':
+        # '+HH:MM' suffix: parse the local part, then subtract the offset
+        local = np.array([value[:-6] for value in values], dtype='datetime64[ns]')
+        offsets = np.fromiter(
+            ((-1 if value[-6] == '-' else 1) * (int(value[-5:-3]) * 60 + int(value[-2:]))
+             for value in values), dtype=np.int64, count=len(values))
+        return local - offsets.astype('timedelta64[m]')
+    if timestamp_format in _EPOCH_UNITS:
+        seconds = np.asarray(values, dtype=np.float64)
+        return (seconds * _EPOCH_UNITS[timestamp_format]).astype(np.int64).astype('datetime64[ns]')
+    if timestamp_format == 'datetime':
+        return np.array([_naive_utc(value) for value in values], dtype='datetime64[ns]')
+    if timestamp_format == 'iso_other':
+        return np.array([_naive_utc(datetime.datetime.fromisoformat(value)) for value in values],
+                        dtype='datetime64[ns]')
+    raise ValueError(f"Unknown timestamp format: {timestamp_format}")
+
+
+def _naive_utc(value: datetime.datetime) -> datetime.datetime:
+    """Naive UTC time of a naive (assumed UTC) or aware datetime."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,378 @@
+"""Benchmarks of the strategy hot path and API endpoints with JSON baselines."""
+
+import argparse
+import contextlib
+import datetime
+import inspect
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bars import frame_to_bars
+from journal import (HEADER, MAGIC, RECORD_DTYPE, VERSION, JournalWriter, decisions, decode,
+                     read_journals)
+from simulator import SimulatedExchange, random_walk_bars
+from strategy_engine import StrategyEngine, parse_strategy_configs
+from vwap_strategy import VWAPStrategy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+# name -> setup function returning (or yielding) the operation to time
+BENCHMARKS: Dict[str, Callable[[], object]] = {}
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark.
+
+    The decorated function sets up and returns the timed operation, or
+    yields it and cleans up after the yield once the benchmark has run.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def measure(op: Callable[[], object], repeat: int = 5, min_time: float = 0.05) -> Dict[str, float]:
+    """
+    Time an operation.
+
+    The operation is run in batches sized so that a batch takes at least
+    ``min_time``; the per-call time of ``repeat`` batches is recorded.
+
+    Returns:
+        Median and minimum seconds per call, and calls per second
+    """
+    op()  # Warm up caches and lazy imports
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            op()
+        timings.append((time.perf_counter() - started) / number)
+
+    median = statistics.median(timings)
+    return {'median': median, 'min': min(timings), 'ops_per_sec': 1.0 / median if median else float('inf')}
+
+
+def run_benchmarks(selected: Optional[List[str]] = None, repeat: int = 5,
+                   min_time: float = 0.05) -> Dict[str, Dict[str, float]]:
+    """
+    Run registered benchmarks.
+
+    Args:
+        selected: Substrings of benchmark names to run (default: all)
+        repeat: Timed batches per benchmark
+        min_time: Minimum seconds per batch
+
+    Returns:
+        Timing results by benchmark name
+    """
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        with contextlib.ExitStack() as cleanup:
+            try:
+                op = setup()
+                if inspect.isgenerator(op):
+                    # Resume the generator afterwards to run its cleanup
+                    cleanup.callback(next, op, None)
+                    op = next(op)
+            except ImportError as e:
+                logger.warning(f"Skipping {name}: {e}")
+                continue
+            results[name] = measure(op, repeat, min_time)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Find benchmarks slower than their baseline.
+
+    Args:
+        results: Current timings
+        baseline: Saved timings
+        threshold: Allowed slowdown as a fraction of the baseline median
+
+    Returns:
+        One message per regressed benchmark
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]['median']
+        if result['median'] > base * (1.0 + threshold):
+            regressions.append(f"{name}: {result['median'] * 1e3:.3f} ms vs baseline "
+                               f"{base * 1e3:.3f} ms ({result['median'] / base - 1.0:+.0%})")
+    return regressions
+
+
+def missing_from_baseline(results: Dict[str, Dict[str, float]],
+                          baseline: Dict[str, Dict[str, float]]) -> List[str]:
+    """Names of benchmarks that ran but have no baseline to compare with."""
+    return [name for name in results if name not in baseline]
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    """Saved timings, or an empty dict if there is no baseline yet."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]]):
+    """Merge timings into a baseline file."""
+    saved = load_baseline(path)
+    saved.update(results)
+    with open(path, 'w') as f:
+        json.dump({
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': saved,
+        }, f, indent=2, sort_keys=True)
+
+
+def make_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk 1-minute bars ending now."""
+    return pd.DataFrame({
+        'timestamp': pd.date_range(end=pd.Timestamp(datetime.datetime.utcnow()).floor('1min'),
+                                   periods=n, freq='1min'),
+        **random_walk_bars(n, seed, volatility=0.5, wick=0.5),
+    })
+
+
+def _strategy(**kwargs) -> VWAPStrategy:
+    return VWAPStrategy(client=SimulatedExchange(), **kwargs)
+
+
+def _register_calculate_vwap(n: int):
+    @benchmark(f'calculate_vwap[{n}]')
+    def setup():
+        strategy = _strategy()
+        data = make_bars(n)
+        return lambda: strategy.calculate_vwap(data)
+
+
+for _n in (240, 10_000, 100_000, 1_000_000):
+    _register_calculate_vwap(_n)
+
+
+@benchmark('update_vwap[240, last bar revised]')
+def _update_vwap():
+    strategy = _strategy()
+    data = frame_to_bars(make_bars(240))
+    strategy.update_vwap(data)
+    versions = []
+    for revision in (0.0, 0.25):
+        bars = dict(data, close=data['close'].copy())
+        bars['close'][-1] += revision
+        versions.append(bars)
+    state = {'i': 0}
+
+    def op():
+        state['i'] ^= 1
+        strategy.update_vwap(versions[state['i']])
+    return op
+
+
+@benchmark('normalize_market_data[240]')
+def _normalize():
+    strategy = _strategy()
+    records = SimulatedExchange().get_historical_data(
+        instrument='MGC', start=datetime.datetime.utcnow() - datetime.timedelta(minutes=240))
+    return lambda: strategy._normalize_market_data(records)
+
+
+@benchmark('fetch_market_data[240, cold]')
+def _fetch_cold():
+    strategy = _strategy()
+
+    def op():
+        strategy.bar_cache.clear()
+        strategy.fetch_market_data()
+    return op
+
+
+@benchmark('fetch_market_data[240, delta]')
+def _fetch_delta():
+    strategy = _strategy()
+    strategy.fetch_market_data()
+    return strategy.fetch_market_data
+
+
+@benchmark('execute_strategy[no signal]')
+def _execute_no_signal():
+    strategy = _strategy(vwap_deviation=1e9)
+    return strategy.execute_strategy
+
+
+@benchmark('place_limit_order[amend working order]')
+def _place_limit_order():
+    strategy = _strategy()
+    # Far from the market, so the order rests and is moved by the next call
+    prices = [strategy.get_current_price() - 1000, strategy.get_current_price() - 1001]
+    state = {'i': 0}
+
+    def op():
+        state['i'] ^= 1
+        strategy.place_limit_order('BUY', prices[state['i']])
+    return op
+
+
+@benchmark('place_limit_order[unchanged price]')
+def _place_unchanged_order():
+    strategy = _strategy()
+    price = strategy.get_current_price() - 1000
+    return lambda: strategy.place_limit_order('BUY', price)
+
+
+@benchmark('journal record_decision')
+def _journal_record():
+    with tempfile.TemporaryDirectory(prefix='journal-bench-') as directory:
+        writer = JournalWriter(directory)
+        try:
+            yield lambda: writer.record_decision('MGC', 1, 'none', vwap=2000.0, band_width=2.0,
+                                                 price=2001.0, bars_hash=1, bar_count=240,
+                                                 fetch_seconds=0.01, vwap_seconds=0.001,
+                                                 total_seconds=0.02)
+        finally:
+            writer.close()
+
+
+@benchmark('journal replay[1M decisions]')
+def _journal_replay():
+    records = np.zeros(1_000_000, dtype=RECORD_DTYPE)
+    records['timestamp'] = np.arange(len(records)) * 60_000_000_000
+    records['decision'] = np.arange(len(records)) % 3
+    records['price'] = 2000.0
+    records['vwap'] = 2000.0 + np.sin(np.arange(len(records)))
+    with tempfile.TemporaryDirectory(prefix='journal-bench-') as directory:
+        with open(os.path.join(directory, '1970-01-01.journal'), 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+            f.write(records.tobytes())
+
+        def op():
+            made = decisions(read_journals(directory))
+            return (decode(made, 'decision') == 'BUY').sum(), np.nanmean(made['price'] - made['vwap'])
+        yield op
+
+
+def _register_endpoint(path: str):
+    @benchmark(f'GET /api/v1/strategy/{path}')
+    def setup():
+        client = _api_client()
+        url = f'/api/v1/strategy/{path}'
+
+        def op():
+            response = client.get(url)
+            assert response.status_code == 200, response.text
+        return op
+
+
+for _path in ('status', 'instruments', 'positions', 'vwap'):
+    _register_endpoint(_path)
+
+
+_api = {}
+
+
+def _api_client():
+    """Test client for the backend app with a strategy engine on the simulator."""
+    if 'client' not in _api:
+        backend = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+        if backend not in sys.path:
+            sys.path.insert(0, backend)
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.api.v1.endpoints import strategy as endpoints
+
+        logging.getLogger('httpx').setLevel(logging.WARNING)
+        endpoints.strategy_service.engine = StrategyEngine(
+            parse_strategy_configs('', {'vwap_deviation': 2.0, 'timer_interval': 1800,
+                                        'contract_size': 1, 'instrument': 'MGC'}),
+            client=SimulatedExchange()
+        )
+        _api['client'] = TestClient(app)
+    return _api['client']
+
+
+def main():
+    """Run the benchmarks and compare with or save a baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark the strategy hot path and API endpoints")
+    parser.add_argument('filters', nargs='*', help="Only run benchmarks whose name contains one of these")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="Save the results as the new baseline")
+    parser.add_argument('--check', action='store_true',
+                        help="Also fail when a benchmark has no baseline, e.g. in CI")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown over the baseline before failing (fraction)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.05)
+    parser.add_argument('--list', action='store_true', help="List benchmark names")
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+
+    # Strategy logging would dominate the timings
+    logging.disable(logging.INFO)
+    results = run_benchmarks(args.filters, args.repeat, args.min_time)
+    baseline = load_baseline(args.baseline)
+
+    print(f"{'benchmark':<40} {'median':>12} {'ops/s':>12} {'baseline':>12}")
+    for name, result in results.items():
+        base = f"{baseline[name]['median'] * 1e3:.3f} ms" if name in baseline else '-'
+        print(f"{name:<40} {result['median'] * 1e3:>9.3f} ms {result['ops_per_sec']:>12.1f} {base:>12}")
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\nRegressions:")
+        print('\n'.join(f"  {message}" for message in regressions))
+        return 1
+    missing = missing_from_baseline(results, baseline)
+    if args.check and missing:
+        print(f"\nNo baseline in {args.baseline} for: {', '.join(missing)}")
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(main())
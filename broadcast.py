@@ -0,0 +1,149 @@
+"""Fan-out of state changes to streaming clients."""
+
+import asyncio
+import collections
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+# Message kinds: the full state (first message of a subscription) and changes since
+SNAPSHOT, UPDATE = 'snapshot', 'update'
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Changes between two nested state dicts.
+
+    Args:
+        old: Previous state
+        new: Current state
+
+    Returns:
+        Nested dict holding only the changed values; keys removed from
+        ``new`` map to None
+    """
+    changes = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff_state(previous, value)
+            if nested:
+                changes[key] = nested
+        elif key not in old or previous != value:
+            changes[key] = value
+    for key in old:
+        if key not in new:
+            changes[key] = None
+    return changes
+
+
+def merge_changes(base: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply changes to a state or to earlier changes, without modifying either.
+
+    Returns:
+        New dict equivalent to ``base`` followed by ``changes``
+    """
+    merged = dict(base)
+    for key, value in changes.items():
+        previous = merged.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            merged[key] = merge_changes(previous, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class Subscription:
+    """Bounded queue of messages for one client.
+
+    When the client falls ``maxsize`` messages behind, new changes are merged
+    into the newest queued message instead of growing the queue, so a slow
+    client skips intermediate states but still converges on the current one.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.merged = 0
+        self._queue: Deque[Tuple[str, Dict[str, Any]]] = collections.deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, kind: str, data: Dict[str, Any]):
+        """Queue a message, merging it into the newest one if the queue is full."""
+        if len(self._queue) >= self.maxsize:
+            last_kind, last_data = self._queue[-1]
+            self._queue[-1] = (last_kind, merge_changes(last_data, data))
+            self.merged += 1
+        else:
+            self._queue.append((kind, data))
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Next message as (kind, data).
+
+        Args:
+            timeout: Seconds to wait for a message
+
+        Returns:
+            The message, or None if none arrived within ``timeout``
+        """
+        while not self._queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._queue.popleft()
+
+
+class Broadcaster:
+    """Publishes one producer's state to any number of subscriptions.
+
+    The producer hands over its full state; only the fields that changed
+    since the last publish are queued for subscribers, and a new subscriber
+    starts with the full state. All methods run on one event loop.
+    """
+
+    def __init__(self, queue_size: int = 16):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            queue_size: Messages queued per client before updates are merged
+        """
+        self.queue_size = queue_size
+        self.state: Dict[str, Any] = {}
+        self._subscriptions: Set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        """New subscription whose first message is the current state."""
+        subscription = Subscription(self.queue_size)
+        subscription.put(SNAPSHOT, self.state)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop queueing messages for a subscription."""
+        self._subscriptions.discard(subscription)
+
+    def publish(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue the changes from the previous state for every subscriber.
+
+        Args:
+            state: Current full state; must not be modified afterwards
+
+        Returns:
+            The changes, empty if nothing changed
+        """
+        changes = diff_state(self.state, state)
+        self.state = state
+        if changes:
+            for subscription in self._subscriptions:
+                subscription.put(UPDATE, changes)
+        return changes
@@ -0,0 +1,175 @@
+"""Process-wide authenticated ProjectX client, kept warm across strategy starts."""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import metrics
+from deadlines import DeadlineClient
+from shared_client import SharedClient, share_client
+from vwap_strategy import create_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts after a failed token refresh
+RETRY_INTERVAL = 30.0
+
+
+class _Connection:
+    """Proxy to the current authenticated client, so a replacement takes effect in place."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+        # Look the method up on every call: the client may have been replaced
+        if asyncio.iscoroutinefunction(attr):
+            @functools.wraps(attr)
+            async def call_async(*args, **kwargs):
+                return await getattr(self.client, name)(*args, **kwargs)
+            return call_async
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            return getattr(self.client, name)(*args, **kwargs)
+        return call
+
+
+class ClientManager:
+    """Authenticates once and shares the client with every strategy start.
+
+    The first ``get`` creates the client (which authenticates) and wraps it
+    in a ``SharedClient``; later calls, including after a strategy stop and
+    restart, return the same one. A background thread re-authenticates
+    ``refresh_margin`` before the session token's ``token_ttl`` runs out,
+    using the client's ``authenticate`` when it has one and a new client
+    otherwise, and makes a cheap read every ``keepalive_interval`` seconds so
+    pooled HTTP connections are not closed as idle.
+    """
+
+    def __init__(self, factory: Optional[Callable[[], object]] = None,
+                 token_ttl: float = 86400.0, refresh_margin: float = 3600.0,
+                 keepalive_interval: float = 240.0, cache_ttl: float = 1.0,
+                 rate_limit: str = '', history_rate_limit: str = '',
+                 read_timeout: float = 0.0, hedge_after: float = 1.0,
+                 breaker_failures: int = 5, breaker_reset: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the manager; nothing is created until ``get``.
+
+        Args:
+            factory: Creates an authenticated client (default: ``create_client``)
+            token_ttl: Seconds a session token is valid after authenticating
+            refresh_margin: Seconds before expiry at which the token is refreshed
+            keepalive_interval: Seconds between keep-alive reads; 0 disables them
+            cache_ttl: Read cache TTL of the shared client
+            rate_limit: 'calls/seconds' budget of the shared client
+            history_rate_limit: 'calls/seconds' budget of historical bar requests
+            read_timeout: Deadline of each read (see ``DeadlineClient``); 0
+                leaves calls unbounded
+            hedge_after: Seconds after which a slow read is sent again
+            breaker_failures: Consecutive failed reads that open an endpoint's breaker
+            breaker_reset: Seconds an open breaker refuses calls
+            clock: Monotonic time source
+        """
+        self.factory = factory if factory is not None else create_client
+        self.token_ttl = token_ttl
+        self.refresh_margin = refresh_margin
+        self.keepalive_interval = keepalive_interval
+        self.cache_ttl = cache_ttl
+        self.rate_limit = rate_limit
+        self.history_rate_limit = history_rate_limit
+        self.read_timeout = read_timeout
+        self.hedge_after = hedge_after
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection: Optional[_Connection] = None
+        self._shared: Optional[SharedClient] = None
+        self._refresh_at = float('inf')
+        self._keepalive_at = float('inf')
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._shared is not None
+
+    def get(self) -> SharedClient:
+        """The shared client, authenticating on first use."""
+        with self._lock:
+            if self._shared is None:
+                started = time.perf_counter()
+                self._connection = _Connection(self.factory())
+                client = metrics.instrument_client(self._connection)
+                if self.read_timeout > 0:
+                    # Below the shared client, so a hedged read is not merged into the slow one
+                    client = DeadlineClient(client, self.read_timeout, self.hedge_after,
+                                            failure_threshold=self.breaker_failures,
+                                            reset_timeout=self.breaker_reset)
+                self._shared = share_client(client, self.cache_ttl,
+                                            self.rate_limit, self.history_rate_limit)
+                self._authenticated(started, 'connect')
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._run, name='client-manager', daemon=True)
+                self._thread.start()
+            return self._shared
+
+    def refresh(self):
+        """Re-authenticate now, keeping the old session if that fails."""
+        with self._lock:
+            if self._connection is None:
+                return
+            started = time.perf_counter()
+            authenticate = getattr(self._connection.client, 'authenticate', None)
+            if callable(authenticate):
+                authenticate()
+            else:
+                self._connection.client = self.factory()
+            self._authenticated(started, 'refresh')
+
+    def close(self):
+        """Stop refreshing and forget the client; the next ``get`` authenticates again."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            self._connection = None
+            self._shared = None
+            self._thread = None
+
+    def _authenticated(self, started: float, reason: str):
+        """Schedule the next refresh after authenticating; caller holds the lock."""
+        elapsed = time.perf_counter() - started
+        metrics.CLIENT_AUTHENTICATIONS.labels(reason).inc()
+        logger.info(f"ProjectX client authenticated ({reason}) in {elapsed:.2f}s")
+        now = self._clock()
+        self._refresh_at = now + max(self.token_ttl - self.refresh_margin, RETRY_INTERVAL)
+        if self.keepalive_interval > 0:
+            self._keepalive_at = now + self.keepalive_interval
+
+    def _run(self):
+        """Refresh the token and keep connections alive until closed."""
+        while not self._stop_event.wait(max(0.0, min(self._refresh_at, self._keepalive_at) - self._clock())):
+            now = self._clock()
+            if now >= self._refresh_at:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Token refresh failed, retrying in {RETRY_INTERVAL:.0f}s: {e}")
+                    self._refresh_at = now + RETRY_INTERVAL
+            elif now >= self._keepalive_at:
+                self._keepalive_at = now + self.keepalive_interval
+                shared = self._shared
+                try:
+                    if shared is not None:
+                        shared.get_positions()
+                except Exception as e:
+                    logger.warning(f"Keep-alive read failed: {e}")
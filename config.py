@@ -4,7 +4,31 @@ import os
 
 # VWAP Strategy Parameters (can be overridden by environment variables)
 VWAP_DEVIATION = float(os.getenv('VWAP_DEVIATION', '2.0'))  # Deviation from VWAP for entry logic (2.0 or 3.0)
+BAND_MODE = os.getenv('BAND_MODE', 'fixed')  # 'fixed': deviation in price points, 'stddev': in volume-weighted standard deviations
+VWAP_ANCHOR = os.getenv('VWAP_ANCHOR', 'rolling')  # 'rolling' (last 240 minutes), 'globex', 'rth', 'weekly' or 'custom' session VWAP
+VWAP_ANCHOR_TIME = os.getenv('VWAP_ANCHOR_TIME', '')  # Exchange-local 'HH:MM' or 'YYYY-MM-DDTHH:MM' for the 'custom' anchor
 TIMER_INTERVAL = int(os.getenv('TIMER_INTERVAL', '1800'))  # Time interval between order checks in seconds (default: 30 minutes)
 CONTRACT_SIZE = int(os.getenv('CONTRACT_SIZE', '1'))  # Fixed contract size per trade
 INSTRUMENT = os.getenv('INSTRUMENT', 'MGC')  # Trading instrument (Micro Gold Future)
 
+BAR_STORE_DIR = os.getenv('BAR_STORE_DIR', '')  # Directory of the on-disk bar store (empty disables it)
+JOURNAL_DIR = os.getenv('JOURNAL_DIR', '')  # Directory of the decision/order journal (empty disables it)
+ASYNC_EXECUTION = os.getenv('ASYNC_EXECUTION', 'False').lower() == 'true'  # Overlap API calls with the asyncio execution path
+STARTUP_PROFILE = os.getenv('STARTUP_PROFILE', 'False').lower() == 'true'  # Log per-module import times of the strategy modules at startup
+STRATEGIES = os.getenv('STRATEGIES', '')  # Comma-separated instruments or JSON list of strategy configs run together
+MARKET_FEED = os.getenv('MARKET_FEED', '')  # Market feed triggering re-evaluation on bars/quotes ('poll'; empty uses the timer only)
+FEED_POLL_INTERVAL = float(os.getenv('FEED_POLL_INTERVAL', '1.0'))  # Seconds between quote polls of the 'poll' feed
+EVENT_MIN_INTERVAL = float(os.getenv('EVENT_MIN_INTERVAL', '1.0'))  # Minimum seconds between event-triggered runs of a strategy
+ORDER_RECONCILE_INTERVAL = float(os.getenv('ORDER_RECONCILE_INTERVAL', '300'))  # Seconds between reconciles of the local order book with the broker
+ORDER_PRICE_TOLERANCE = float(os.getenv('ORDER_PRICE_TOLERANCE', '0.0'))  # Price change up to which a working order is kept as is
+POSITION_RECONCILE_INTERVAL = float(os.getenv('POSITION_RECONCILE_INTERVAL', '60'))  # Seconds between reconciles of tracked positions with the broker
+CLIENT_CACHE_TTL = float(os.getenv('CLIENT_CACHE_TTL', '1.0'))  # Seconds identical client reads are served from cache
+RATE_LIMIT = os.getenv('RATE_LIMIT', '200/60')  # 'calls/seconds' budget of client calls (empty: unlimited)
+HISTORY_RATE_LIMIT = os.getenv('HISTORY_RATE_LIMIT', '50/30')  # 'calls/seconds' budget of historical bar requests
+CLIENT_TOKEN_TTL = float(os.getenv('CLIENT_TOKEN_TTL', '86400'))  # Seconds a session token is valid; refreshed an hour before
+CLIENT_KEEPALIVE_INTERVAL = float(os.getenv('CLIENT_KEEPALIVE_INTERVAL', '240'))  # Seconds between keep-alive reads (0 disables them)
+ITERATION_BUDGET = float(os.getenv('ITERATION_BUDGET', '20'))  # Seconds the client calls of one iteration may take in total
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', '5'))  # Deadline of each client read (0 leaves calls unbounded)
+HEDGE_AFTER = float(os.getenv('HEDGE_AFTER', '1.0'))  # Seconds after which a slow read is sent again (0 disables hedging)
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', '5'))  # Consecutive failed reads that stop calls to an endpoint
+BREAKER_RESET = float(os.getenv('BREAKER_RESET', '30'))  # Seconds before a stopped endpoint is tried again
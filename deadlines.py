@@ -0,0 +1,234 @@
+"""Deadlines, hedged reads and circuit breakers for ProjectX client calls."""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class DeadlineExceeded(TimeoutError):
+    """A call did not finish within its deadline."""
+
+
+class CircuitOpen(RuntimeError):
+    """A call was refused because its endpoint keeps failing."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """
+    Bound the client calls made on this thread inside the block.
+
+    Nested deadlines can only shorten the enclosing one.
+
+    Args:
+        seconds: Time budget of the block; None leaves it unbounded
+    """
+    previous = getattr(_local, 'deadline', None)
+    if seconds is not None and seconds > 0:
+        until = time.monotonic() + seconds
+        _local.deadline = until if previous is None else min(previous, until)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left of the current thread's deadline, capped at ``default``."""
+    until = getattr(_local, 'deadline', None)
+    if until is None:
+        return default
+    left = max(0.0, until - time.monotonic())
+    return left if default is None else min(left, default)
+
+
+class CircuitBreaker:
+    """Refuses calls to an endpoint after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls fail at once for ``reset_timeout`` seconds. Then a single trial
+    call is let through: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial call
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'."""
+        if self._opened_at is None:
+            return 'closed'
+        if self._trial or self._clock() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Whether a call may be made now; claims the trial call when half open."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+
+class DeadlineClient:
+    """Client proxy that bounds how long a call can hold up its caller.
+
+    Reads run on a small worker pool. A read still running after
+    ``hedge_after`` seconds is sent a second time and the first answer wins;
+    a read that fails fast is retried once. Either way it gives up at its
+    deadline: ``read_timeout`` or what is left of the caller's ``deadline``
+    block, whichever is sooner. Each read method has a ``CircuitBreaker``, so
+    an endpoint that keeps failing is not called until it had time to
+    recover. Order calls are never repeated (a duplicate could double an
+    order); they are only bounded by ``order_timeout``, after which their
+    outcome is unknown until the next reconcile. A call that is given up on
+    finishes in the background. Coroutine methods pass through unchanged.
+    """
+
+    instrumented = True
+
+    def __init__(self, client, read_timeout: float = 5.0, hedge_after: float = 1.0,
+                 order_timeout: float = 10.0, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, max_workers: int = 8,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the proxy.
+
+        Args:
+            client: Instrumented ProjectX client
+            read_timeout: Maximum seconds per read, including its second attempt
+            hedge_after: Seconds after which a slow read is sent again; 0 disables hedging
+            order_timeout: Maximum seconds per order call
+            failure_threshold: Consecutive failed reads that open an endpoint's breaker
+            reset_timeout: Seconds an open breaker refuses calls
+            max_workers: Threads for calls in progress, including abandoned ones
+            clock: Monotonic time source of the breakers
+        """
+        # Imported here: the shared client imports this module for its deadlines
+        from shared_client import ORDER_METHODS, READ_METHODS
+        self._client = metrics.instrument_client(client)
+        self._order_methods = ORDER_METHODS
+        self.read_timeout = read_timeout
+        self.hedge_after = hedge_after
+        self.order_timeout = order_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(failure_threshold, reset_timeout, clock) for name in READ_METHODS}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='client-call')
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if (name not in self.breakers and name not in self._order_methods) or not callable(attr) \
+                or asyncio.iscoroutinefunction(attr):
+            return attr
+        if name in self.breakers:
+            wrapper = functools.partial(self._read, name, attr)
+        else:
+            wrapper = functools.partial(self._order, name, attr)
+        # Cache the wrapper so later lookups skip __getattr__
+        self.__dict__[name] = wrapper
+        return wrapper
+
+    def _read(self, name: str, func: Callable, *args, **kwargs):
+        """Make a read with hedging, one retry and its endpoint's breaker."""
+        timeout = remaining(self.read_timeout)
+        if timeout <= 0:
+            # The caller's budget is spent; that says nothing about the endpoint
+            raise DeadlineExceeded(f"No time left for {name}")
+        breaker = self.breakers[name]
+        if not breaker.allow():
+            metrics.CLIENT_CIRCUIT_REJECTIONS.labels(name).inc()
+            raise CircuitOpen(f"{name} is failing; not called for up to {breaker.reset_timeout:.0f}s")
+        try:
+            result = self._attempts(name, func, args, kwargs, timeout,
+                                    attempts=2, hedge_after=self.hedge_after)
+        except (TypeError, AttributeError):
+            # Rejected arguments (callers try alternative signatures), not a failing endpoint
+            breaker.record_success()
+            raise
+        except Exception:
+            breaker.record_failure()
+            if breaker.state != 'closed':
+                logger.warning(f"Circuit breaker for {name} opened")
+            raise
+        breaker.record_success()
+        return result
+
+    def _order(self, name: str, func: Callable, *args, **kwargs):
+        """Make an order call once, bounded by ``order_timeout``."""
+        # Not cut short by the caller's deadline: once decided, an order gets its full time
+        return self._attempts(name, func, args, kwargs, self.order_timeout, attempts=1)
+
+    def _attempts(self, name: str, func: Callable, args, kwargs, timeout: float,
+                  attempts: int, hedge_after: float = 0.0):
+        """Run up to ``attempts`` calls (hedges or retries) and return the first result."""
+        until = time.monotonic() + timeout
+        pending = {self._executor.submit(func, *args, **kwargs)}
+        started = 1
+        error: Optional[BaseException] = None
+        while True:
+            left = until - time.monotonic()
+            if left <= 0:
+                metrics.CLIENT_DEADLINE_EXCEEDED.labels(name).inc()
+                raise DeadlineExceeded(f"{name} did not finish within {timeout:.2f}s") from error
+            can_hedge = hedge_after > 0 and started < attempts
+            done, pending = wait(pending, timeout=min(left, hedge_after) if can_hedge else left,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+                if isinstance(error, (TypeError, AttributeError)):
+                    raise error
+            if not pending:
+                # Every call failed: retry while attempts are left
+                if started >= attempts:
+                    raise error
+            elif done or not can_hedge:
+                # One call failed while another runs, or the deadline is up
+                continue
+            else:
+                metrics.CLIENT_HEDGED_CALLS.labels(name).inc()
+            pending.add(self._executor.submit(func, *args, **kwargs))
+            started += 1
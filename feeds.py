@@ -0,0 +1,274 @@
+"""Market data feeds that push bar and quote events to the strategy engine."""
+
+import abc
+import datetime
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from bars import FIELDS, as_bars
+from vwap_strategy import extract_price
+
+logger = logging.getLogger(__name__)
+
+
+class MarketEvent(NamedTuple):
+    """One market data update for an instrument."""
+    kind: str  # 'bar' when a bar closed, 'quote' for a new price
+    instrument: str
+    timestamp: datetime.datetime
+    price: Optional[float]
+    bar: Optional[Dict[str, float]] = None  # OHLCV of the closed bar, if known
+
+
+EventCallback = Callable[[MarketEvent], None]
+
+
+class MarketFeed(abc.ABC):
+    """Base class for market data feeds.
+
+    Subscribers register a callback for a set of instruments and are called on
+    the feed's thread for every event of those instruments, so callbacks
+    should only hand the event off. Subclasses produce events in ``start``
+    and call ``publish`` for each one.
+    """
+
+    def __init__(self):
+        """Initialize the feed with no subscribers."""
+        self._subscribers: List = []
+        self._lock = threading.Lock()
+
+    @property
+    def instruments(self) -> List[str]:
+        """Instruments any subscriber is interested in."""
+        with self._lock:
+            instruments = []
+            for subscribed, _ in self._subscribers:
+                instruments.extend(i for i in subscribed if i not in instruments)
+            return instruments
+
+    def subscribe(self, instruments: Iterable[str], callback: EventCallback):
+        """
+        Receive events for some instruments.
+
+        Args:
+            instruments: Instruments to receive events for
+            callback: Called with each MarketEvent
+        """
+        with self._lock:
+            self._subscribers.append((frozenset(instruments), callback))
+
+    def unsubscribe(self, callback: EventCallback):
+        """Stop calling a subscribed callback."""
+        with self._lock:
+            self._subscribers = [(i, cb) for i, cb in self._subscribers if cb != callback]
+
+    def publish(self, event: MarketEvent):
+        """Deliver an event to the subscribers of its instrument."""
+        with self._lock:
+            callbacks = [cb for instruments, cb in self._subscribers if event.instrument in instruments]
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in market event callback: {e}", exc_info=True)
+
+    @abc.abstractmethod
+    def start(self):
+        """Start producing events."""
+
+    @abc.abstractmethod
+    def stop(self):
+        """Stop producing events."""
+
+
+class ReplayFeed(MarketFeed):
+    """Deterministic feed replaying stored 1-minute bars.
+
+    Every bar produces quote events along its open, high, low and close (when
+    ``quotes`` is set) followed by a bar event stamped at the bar's close.
+    Events of all instruments are merged in time order, ties broken by the
+    order instruments were given in, so a replay always yields the same
+    sequence. ``replay`` delivers the events on the calling thread; ``start``
+    does so on a background thread, optionally paced by ``speed``.
+    """
+
+    def __init__(self, bars: Dict[str, object], quotes: bool = True, speed: float = 0.0,
+                 bar_minutes: int = 1):
+        """
+        Initialize the replay feed.
+
+        Args:
+            bars: Per instrument, ``Bars``, a DataFrame with timestamp and
+                OHLCV columns, or the column arrays returned by ``BarStore.read``
+            quotes: Emit quote events within each bar as well as bar events
+            speed: Replay speed as a multiple of real time; 0 replays without
+                waiting between events
+            bar_minutes: Bar length, used to stamp bar events at the bar close
+        """
+        super().__init__()
+        self.speed = speed
+        self._events = _replay_events(bars, quotes, datetime.timedelta(minutes=bar_minutes))
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def events(self) -> List[MarketEvent]:
+        """All events of the replay in delivery order."""
+        return list(self._events)
+
+    def replay(self, limit: Optional[int] = None) -> int:
+        """
+        Deliver events on the calling thread.
+
+        Args:
+            limit: Stop after this many events (default: all)
+
+        Returns:
+            Number of events delivered
+        """
+        delivered = 0
+        previous = None
+        for event in self._events[:limit]:
+            if self._stop_event.is_set():
+                break
+            if self.speed > 0 and previous is not None:
+                delay = (event.timestamp - previous).total_seconds() / self.speed
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+            previous = event.timestamp
+            self.publish(event)
+            delivered += 1
+        return delivered
+
+    def start(self):
+        """Replay all events on a background thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.replay, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop a running replay."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for a background replay to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class PollingQuoteFeed(MarketFeed):
+    """Feed that turns client quote polling into events.
+
+    The client is asked for every subscribed instrument's quote each
+    ``poll_interval`` seconds. A quote event is published when the price
+    changes and a bar event when a new minute starts (the previous bar
+    closed). Use it with clients that have no streaming interface.
+    """
+
+    def __init__(self, client, poll_interval: float = 1.0):
+        """
+        Initialize the polling feed.
+
+        Args:
+            client: ProjectX client providing get_market_data
+            poll_interval: Seconds between polls of each instrument
+        """
+        super().__init__()
+        self.client = client
+        self.poll_interval = poll_interval
+        self._last_price: Dict[str, float] = {}
+        self._last_minute: Dict[str, datetime.datetime] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self, now: Optional[datetime.datetime] = None):
+        """Poll every subscribed instrument once and publish any changes."""
+        now = now or datetime.datetime.utcnow()
+        minute = now.replace(second=0, microsecond=0)
+        for instrument in self.instruments:
+            try:
+                price = extract_price(self.client.get_market_data(instrument))
+            except Exception as e:
+                logger.error(f"Error polling quote for {instrument}: {e}")
+                continue
+
+            last_minute = self._last_minute.get(instrument)
+            self._last_minute[instrument] = minute
+            if last_minute is not None and minute > last_minute:
+                self.publish(MarketEvent('bar', instrument, minute, price))
+
+            if price is not None and price != self._last_price.get(instrument):
+                self._last_price[instrument] = price
+                self.publish(MarketEvent('quote', instrument, now, price))
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            self.poll()
+            self._stop_event.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
+
+    def start(self):
+        """Start polling on a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+def create_feed(kind: str, client, poll_interval: float = 1.0) -> Optional[MarketFeed]:
+    """
+    Create the live feed named in configuration.
+
+    Args:
+        kind: 'poll' for PollingQuoteFeed; empty for no feed (timer only)
+        client: Client the feed reads from
+        poll_interval: Poll interval for polling feeds
+
+    Returns:
+        The feed, or None if event-driven execution is disabled
+    """
+    kind = (kind or '').strip().lower()
+    if not kind:
+        return None
+    if kind == 'poll':
+        return PollingQuoteFeed(client, poll_interval)
+    raise ValueError(f"Unknown market feed: {kind}")
+
+
+def _replay_events(bars: Dict[str, object], quotes: bool,
+                   bar_length: datetime.timedelta) -> List[MarketEvent]:
+    """Build the time-ordered event list of a replay."""
+    keyed = []
+    for order, (instrument, data) in enumerate(bars.items()):
+        data = as_bars(data)
+        timestamps = np.asarray(data['timestamp'], dtype='datetime64[us]').tolist()
+        columns = [np.asarray(data[name], dtype=float).tolist() for name in FIELDS]
+        for opened, open_, high, low, close, volume in zip(timestamps, *columns):
+            closed = opened + bar_length
+            if quotes:
+                path = (open_, high, low, close)
+                for step, price in enumerate(path):
+                    # Spread the quotes over the bar; a bar close sorts before quotes at the same time
+                    at = opened + bar_length * step / len(path)
+                    keyed.append(((at, 1, order, step),
+                                  MarketEvent('quote', instrument, at, price)))
+            bar = {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+            keyed.append(((closed, 0, order, 0),
+                          MarketEvent('bar', instrument, closed, close, bar)))
+    keyed.sort(key=lambda item: item[0])
+    return [event for _, event in keyed]
@@ -34,11 +34,15 @@ export default function Dashboard() {
   useEffect(() => {
     fetchStatus()
     fetchVWAP()
-    const interval = setInterval(() => {
-      fetchStatus()
-      fetchVWAP()
-    }, 5000) // Update every 5 seconds
-    return () => clearInterval(interval)
+    // VWAP and run state are pushed as they change
+    return apiService.subscribeState((state) => {
+      const primary = Object.values(state.strategies)[0]
+      if (primary?.vwap) {
+        setVWAPData(primary.vwap)
+      }
+      setStatus((current) => current && { ...current, is_running: state.is_running,
+                                            status: state.is_running ? 'running' : 'stopped' })
+    })
   }, [])
 
   const handleStart = async () => {
@@ -14,18 +14,71 @@ export interface StrategyStatus {
   status: string
   config: {
     vwap_deviation: number
+    band_mode: string
+    anchor: string
     timer_interval: number
     contract_size: number
     instrument: string
   }
+  instruments?: Record<string, InstrumentStatus>
+}
+
+export interface InstrumentStatus {
+  instrument: string
+  vwap_deviation: number
+  band_mode: string
+  anchor: string
+  timer_interval: number
+  contract_size: number
+  vwap: number | null
+  current_order_id: string | null
+  iterations: number
+  last_run: number | null
+  last_duration: number | null
+  last_error: string | null
+  next_run: number | null
 }
 
 export interface VWAPData {
   vwap: number | null
   current_price: number | null
   deviation: number
+  band_mode: string
+  band_width: number | null
+  std: number | null
+  anchor: string
+  session_start: string | null
   long_entry: number | null
   short_entry: number | null
+  instrument: string
+  decision: string
+  timestamp: string
+}
+
+export interface StrategyState {
+  vwap: VWAPData | null
+  orders: { order_id: string; instrument: string; side: string; price: number; quantity: number }[]
+  position: { instrument: string; quantity: number; side: string | null; average_price: number | null }
+}
+
+export interface StreamState {
+  is_running: boolean
+  strategies: Record<string, StrategyState>
+}
+
+// Apply the changed fields of a stream update (removed fields arrive as null)
+function mergeChanges(base: any, changes: any): any {
+  const merged = { ...base }
+  for (const [key, value] of Object.entries(changes)) {
+    const previous = merged[key]
+    if (value && typeof value === 'object' && !Array.isArray(value) &&
+        previous && typeof previous === 'object' && !Array.isArray(previous)) {
+      merged[key] = mergeChanges(previous, value)
+    } else {
+      merged[key] = value
+    }
+  }
+  return merged
 }
 
 export const apiService = {
@@ -53,6 +106,21 @@ export const apiService = {
     const response = await api.get('/api/v1/strategy/positions')
     return response.data
   },
+
+  // Follow strategy state pushed by the server; returns a function that closes the stream
+  subscribeState(onState: (state: StreamState) => void): () => void {
+    const source = new EventSource(`${API_URL}/api/v1/strategy/stream`)
+    let state: StreamState = { is_running: false, strategies: {} }
+    source.addEventListener('snapshot', (event) => {
+      state = JSON.parse((event as MessageEvent).data)
+      onState(state)
+    })
+    source.addEventListener('update', (event) => {
+      state = mergeChanges(state, JSON.parse((event as MessageEvent).data))
+      onState(state)
+    })
+    return () => source.close()
+  },
 }
 
 export default api
@@ -0,0 +1,122 @@
+"""Per-module import times, for profiling startup without ``python -X importtime``."""
+
+import logging
+import sys
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ImportTime(NamedTuple):
+    """Time spent importing one module."""
+    module: str
+    self_seconds: float  # Without the modules it imported
+    cumulative_seconds: float
+
+
+class _TimedLoader:
+    """Loader wrapper that times a module from its creation to the end of its execution."""
+
+    def __init__(self, loader, profile: 'ImportProfile'):
+        self.loader = loader
+        self.profile = profile
+
+    def create_module(self, spec):
+        # Extension modules are loaded here, so timing starts before execution
+        self.profile._enter(spec.name)
+        try:
+            create = getattr(self.loader, 'create_module', None)
+            return create(spec) if create is not None else None
+        except BaseException:
+            self.profile._exit(spec.name)
+            raise
+
+    def exec_module(self, module):
+        # The module keeps its own loader, not this wrapper
+        module.__loader__ = module.__spec__.loader = self.loader
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profile._exit(module.__spec__.name)
+
+    def __getattr__(self, name: str):
+        return getattr(self.loader, name)
+
+
+class ImportProfile:
+    """Records how long each module imported while it is installed takes.
+
+    Installed first on ``sys.meta_path``, it lets the other finders locate
+    each module and wraps the loader they return. A module's cumulative time
+    runs from loading it to the end of its execution; its self time excludes
+    the modules it imported meanwhile, as in ``python -X importtime``. Only
+    modules not yet in ``sys.modules`` are seen.
+    """
+
+    def __init__(self):
+        self.times: Dict[str, ImportTime] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self) -> 'ImportProfile':
+        """Install the profile; returns it for chaining."""
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def stop(self):
+        """Uninstall the profile, keeping the times recorded so far."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name: str, path=None, target=None):
+        """Find ``name`` with the finders after this one and wrap its loader."""
+        for finder in sys.meta_path[sys.meta_path.index(self) + 1:]:
+            find_spec = getattr(finder, 'find_spec', None)
+            spec = find_spec(name, path, target) if find_spec is not None else None
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def slowest(self, limit: Optional[int] = 20) -> List[ImportTime]:
+        """Recorded imports, slowest cumulative time first."""
+        with self._lock:
+            times = sorted(self.times.values(), key=lambda t: t.cumulative_seconds, reverse=True)
+        return times[:limit] if limit is not None else times
+
+    def total(self) -> float:
+        """Seconds spent in imports made directly while installed."""
+        with self._lock:
+            return sum(t.self_seconds for t in self.times.values())
+
+    def log(self, limit: int = 20, level: int = logging.INFO):
+        """Log the total import time and the ``limit`` slowest modules."""
+        logger.log(level, f"Imported {len(self.times)} modules in {self.total():.3f}s; slowest:")
+        for t in self.slowest(limit):
+            logger.log(level, f"  {t.cumulative_seconds * 1000:8.1f} ms cumulative "
+                              f"{t.self_seconds * 1000:8.1f} ms self  {t.module}")
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, name: str):
+        # [module, started, seconds spent in nested imports]
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str):
+        stack = self._stack()
+        if not stack or stack[-1][0] != name:
+            return
+        _, started, nested = stack.pop()
+        cumulative = time.perf_counter() - started
+        if stack:
+            stack[-1][2] += cumulative
+        with self._lock:
+            self.times[name] = ImportTime(name, cumulative - nested, cumulative)
@@ -1,8 +1,9 @@
 """Main entry point for VWAP trading strategy."""
 
+import asyncio
 import logging
 import config
-from vwap_strategy import VWAPStrategy
+from import_profile import ImportProfile
 
 # Optionally load environment variables from .env file (if it exists)
 # Environment variables can also be set directly in the system
@@ -23,23 +24,89 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Main entry point."""
+    journal = None
     try:
+        # The strategy modules load numpy; imported here so they can be profiled
+        profile = ImportProfile().start() if config.STARTUP_PROFILE else None
+        from async_strategy import AsyncVWAPStrategy
+        from bar_store import BarStore
+        from client_manager import ClientManager
+        from feeds import create_feed
+        from journal import JournalWriter
+        from strategy_engine import StrategyEngine, parse_strategy_configs
+        from vwap_strategy import VWAPStrategy
+        if profile is not None:
+            profile.stop()
+            profile.log()
+        
+        bar_store = BarStore(config.BAR_STORE_DIR) if config.BAR_STORE_DIR else None
+        journal = JournalWriter(config.JOURNAL_DIR) if config.JOURNAL_DIR else None
+        # Keeps the session token fresh for as long as the strategy runs
+        clients = ClientManager(token_ttl=config.CLIENT_TOKEN_TTL,
+                                keepalive_interval=config.CLIENT_KEEPALIVE_INTERVAL,
+                                cache_ttl=config.CLIENT_CACHE_TTL, rate_limit=config.RATE_LIMIT,
+                                history_rate_limit=config.HISTORY_RATE_LIMIT,
+                                read_timeout=config.READ_TIMEOUT, hedge_after=config.HEDGE_AFTER,
+                                breaker_failures=config.BREAKER_FAILURES,
+                                breaker_reset=config.BREAKER_RESET)
+        configs = parse_strategy_configs(config.STRATEGIES, {
+            'vwap_deviation': config.VWAP_DEVIATION,
+            'band_mode': config.BAND_MODE,
+            'anchor': config.VWAP_ANCHOR,
+            'anchor_time': config.VWAP_ANCHOR_TIME or None,
+            'timer_interval': config.TIMER_INTERVAL,
+            'contract_size': config.CONTRACT_SIZE,
+            'instrument': config.INSTRUMENT,
+        })
+        if len(configs) > 1 or config.MARKET_FEED:
+            # Run every configured strategy on one shared client, re-evaluating
+            # on market events when a feed is configured
+            client = clients.get()
+            feed = create_feed(config.MARKET_FEED, client, config.FEED_POLL_INTERVAL)
+            StrategyEngine(configs, client=client, feed=feed,
+                           min_event_interval=config.EVENT_MIN_INTERVAL,
+                           bar_store=bar_store,
+                           journal=journal,
+                           order_reconcile_interval=config.ORDER_RECONCILE_INTERVAL,
+                           order_price_tolerance=config.ORDER_PRICE_TOLERANCE,
+                           position_reconcile_interval=config.POSITION_RECONCILE_INTERVAL,
+                           iteration_budget=config.ITERATION_BUDGET).run_forever()
+            return
+        
         # Create strategy instance with configuration
-        strategy = VWAPStrategy(
+        strategy_class = AsyncVWAPStrategy if config.ASYNC_EXECUTION else VWAPStrategy
+        strategy = strategy_class(
             vwap_deviation=config.VWAP_DEVIATION,
+            band_mode=config.BAND_MODE,
+            anchor=config.VWAP_ANCHOR,
+            anchor_time=config.VWAP_ANCHOR_TIME or None,
             timer_interval=config.TIMER_INTERVAL,
             contract_size=config.CONTRACT_SIZE,
-            instrument=config.INSTRUMENT
+            instrument=config.INSTRUMENT,
+            client=clients.get(),
+            bar_store=bar_store,
+            journal=journal,
+            order_reconcile_interval=config.ORDER_RECONCILE_INTERVAL,
+            order_price_tolerance=config.ORDER_PRICE_TOLERANCE,
+            position_reconcile_interval=config.POSITION_RECONCILE_INTERVAL,
+            iteration_budget=config.ITERATION_BUDGET
         )
         
         # Run the strategy
-        strategy.run()
+        if config.ASYNC_EXECUTION:
+            asyncio.run(strategy.run_async())
+        else:
+            strategy.run()
         
     except KeyboardInterrupt:
         logger.info("Program interrupted by user")
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         raise
+    finally:
+        if journal is not None:
+            # Write out the batched records before exiting
+            journal.close()
 
 
 if __name__ == '__main__':
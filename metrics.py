@@ -0,0 +1,167 @@
+"""Prometheus metrics for the strategy loop and its ProjectX calls."""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+
+try:
+    from prometheus_client import Counter, Histogram
+except ImportError:
+    # prometheus-client is optional for the standalone strategy; metrics become no-ops
+    Counter = Histogram = None
+
+# Client methods whose calls are timed
+CLIENT_METHODS = ('get_historical_data', 'get_market_data', 'get_positions',
+                  'get_orders', 'place_order', 'modify_order', 'cancel_order')
+
+# Network round trips, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# In-process computation, in seconds
+COMPUTE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                   0.0025, 0.005, 0.01, 0.025, 0.1)
+
+
+class _NullMetric:
+    """Stand-in used when prometheus-client is not installed."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+
+def _histogram(name, documentation, labelnames, buckets):
+    if Histogram is None:
+        return _NullMetric()
+    return Histogram(name, documentation, labelnames, buckets=buckets)
+
+
+def _counter(name, documentation, labelnames):
+    if Counter is None:
+        return _NullMetric()
+    return Counter(name, documentation, labelnames)
+
+
+CLIENT_REQUEST_SECONDS = _histogram(
+    'projectx_request_duration_seconds', 'Latency of ProjectX client calls',
+    ['method'], LATENCY_BUCKETS)
+CLIENT_REQUEST_ERRORS = _counter(
+    'projectx_request_errors', 'ProjectX client calls that raised', ['method'])
+CLIENT_SHARED_READS = _counter(
+    'projectx_shared_reads', 'Client reads served from the cache or a call already in flight',
+    ['method', 'source'])
+RATE_LIMIT_WAIT_SECONDS = _histogram(
+    'projectx_rate_limit_wait_seconds', 'Time client calls waited for rate budget',
+    ['endpoint'], LATENCY_BUCKETS)
+CLIENT_HEDGED_CALLS = _counter(
+    'projectx_hedged_calls', 'Slow client reads that were sent a second time', ['method'])
+CLIENT_DEADLINE_EXCEEDED = _counter(
+    'projectx_deadline_exceeded', 'Client calls abandoned at their deadline', ['method'])
+CLIENT_CIRCUIT_REJECTIONS = _counter(
+    'projectx_circuit_rejections', 'Client reads refused by an open circuit breaker', ['method'])
+STRATEGY_DEGRADED = _counter(
+    'strategy_degraded_inputs', 'Iterations that fell back to cached state, by input',
+    ['instrument', 'input'])
+CLIENT_AUTHENTICATIONS = _counter(
+    'projectx_authentications', 'ProjectX client authentications by reason (connect or refresh)',
+    ['reason'])
+VWAP_SECONDS = _histogram(
+    'strategy_vwap_duration_seconds', 'Time to update the VWAP from fetched bars',
+    ['instrument'], COMPUTE_BUCKETS)
+ITERATION_SECONDS = _histogram(
+    'strategy_iteration_duration_seconds', 'Duration of one strategy iteration',
+    ['instrument'], LATENCY_BUCKETS)
+DECISION_TO_ORDER_SECONDS = _histogram(
+    'strategy_decision_to_order_seconds',
+    'Time from an entry decision until the order is acknowledged',
+    ['instrument'], LATENCY_BUCKETS)
+TIME_TO_FIRST_DECISION_SECONDS = _histogram(
+    'strategy_time_to_first_decision_seconds',
+    'Time from a start request until a strategy makes its first decision',
+    ['instrument'], LATENCY_BUCKETS)
+SCHEDULE_LATENESS = _histogram(
+    'strategy_schedule_lateness_seconds',
+    'How late timed waits of the strategy scheduler return', [], COMPUTE_BUCKETS)
+DECISIONS = _counter(
+    'strategy_decisions', 'Entry decisions by action (BUY, SELL or none)',
+    ['instrument', 'action'])
+
+
+@contextmanager
+def timed(histogram, *labels):
+    """Observe the duration of a block in a histogram, also when it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - started)
+
+
+class InstrumentedClient:
+    """Client proxy that times every call of ``CLIENT_METHODS``.
+
+    Each call is observed in ``CLIENT_REQUEST_SECONDS`` and counted in
+    ``CLIENT_REQUEST_ERRORS`` when it raises. Coroutine methods are timed
+    until they complete. Everything else passes through to the client.
+    """
+
+    instrumented = True
+
+    def __init__(self, client):
+        """
+        Initialize the proxy.
+
+        Args:
+            client: Underlying ProjectX client
+        """
+        self._client = client
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if name not in CLIENT_METHODS or not callable(attr):
+            return attr
+        wrapper = _timed_call(attr, CLIENT_REQUEST_SECONDS.labels(name),
+                              CLIENT_REQUEST_ERRORS.labels(name))
+        # Cache the wrapper so later lookups skip __getattr__
+        self.__dict__[name] = wrapper
+        return wrapper
+
+
+def instrument_client(client):
+    """Wrap a client in ``InstrumentedClient`` unless it is already instrumented."""
+    if getattr(client, 'instrumented', False):
+        return client
+    return InstrumentedClient(client)
+
+
+def _timed_call(func, histogram, errors):
+    """Wrap a client method so its calls are timed and its failures counted."""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def timed_coroutine(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return timed_coroutine
+
+    @functools.wraps(func)
+    def timed_function(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - started)
+    return timed_function
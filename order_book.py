@@ -0,0 +1,106 @@
+"""Local book of the strategy's working orders."""
+
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class WorkingOrder(NamedTuple):
+    """A limit order believed to be working at the broker."""
+    order_id: str
+    instrument: str
+    side: str  # 'BUY' or 'SELL'
+    price: float
+    quantity: int
+
+
+class OrderBook:
+    """Working orders tracked from our own placement, amend and cancel responses.
+
+    Orders are indexed by instrument so lookups do not need a ``get_orders``
+    round trip. The book only drifts from the broker through events it cannot
+    see (fills, expiries, manual changes), so it is replaced with the broker's
+    view every ``reconcile_interval`` seconds, or sooner after ``mark_stale``.
+    A new book is stale until its first reconcile.
+    """
+
+    def __init__(self, reconcile_interval: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the order book.
+
+        Args:
+            reconcile_interval: Seconds after which the book is reconciled
+                with the broker again
+            clock: Monotonic time source
+        """
+        self.reconcile_interval = reconcile_interval
+        self._clock = clock
+        self._orders: Dict[str, Dict[str, WorkingOrder]] = {}
+        self._reconciled_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(orders) for orders in self._orders.values())
+
+    def for_instrument(self, instrument: str) -> List[WorkingOrder]:
+        """Working orders of an instrument, oldest first."""
+        with self._lock:
+            return list(self._orders.get(instrument, {}).values())
+
+    def add(self, order: WorkingOrder):
+        """Record a placed or amended order."""
+        with self._lock:
+            self._orders.setdefault(order.instrument, {})[order.order_id] = order
+
+    def remove(self, order_id: str) -> Optional[WorkingOrder]:
+        """Forget an order, e.g. after cancelling it; returns it if it was known."""
+        with self._lock:
+            for orders in self._orders.values():
+                if order_id in orders:
+                    return orders.pop(order_id)
+        return None
+
+    def mark_stale(self):
+        """Force a reconcile before the book is trusted again."""
+        with self._lock:
+            self._reconciled_at = None
+
+    def needs_reconcile(self) -> bool:
+        """Whether the book is due to be replaced with the broker's orders."""
+        with self._lock:
+            return (self._reconciled_at is None
+                    or self._clock() - self._reconciled_at >= self.reconcile_interval)
+
+    def reconcile(self, instrument: str, orders: List[Dict]):
+        """
+        Replace an instrument's orders with the broker's open orders.
+
+        Args:
+            instrument: Instrument the orders were filtered for
+            orders: Open orders from ``get_orders``, any instrument
+        """
+        working = {}
+        for order in orders or []:
+            parsed = parse_order(order)
+            if parsed is not None and parsed.instrument == instrument:
+                working[parsed.order_id] = parsed
+        with self._lock:
+            self._orders[instrument] = working
+            self._reconciled_at = self._clock()
+
+
+def parse_order(order: Dict) -> Optional[WorkingOrder]:
+    """WorkingOrder from a get_orders entry, or None if it lacks an ID."""
+    order_id = order.get('id') or order.get('order_id')
+    if not order_id:
+        return None
+    price = order.get('price', order.get('limit_price'))
+    return WorkingOrder(
+        order_id=order_id,
+        instrument=order.get('instrument') or order.get('symbol'),
+        side=order.get('side'),
+        price=float(price) if price is not None else float('nan'),
+        quantity=order.get('quantity', order.get('size', 0)),
+    )
@@ -0,0 +1,146 @@
+"""Local tracker of open positions per instrument."""
+
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class Position(NamedTuple):
+    """Net position in one instrument."""
+    instrument: str
+    quantity: int  # Signed: positive long, negative short
+    side: Optional[str]  # 'LONG', 'SHORT' or None when flat
+    average_price: Optional[float]
+
+    @property
+    def is_open(self) -> bool:
+        return self.quantity != 0
+
+
+def flat(instrument: str) -> Position:
+    """A flat position."""
+    return Position(instrument, 0, None, None)
+
+
+def apply_fill(position: Position, side: str, quantity: int, price: float) -> Position:
+    """
+    Net a fill into a position.
+
+    Adding to a position averages the fill price in, reducing it keeps the
+    average price, and going through flat opens the remainder at the fill
+    price.
+
+    Args:
+        position: Position before the fill
+        side: 'BUY' or 'SELL'
+        quantity: Filled contracts
+        price: Fill price
+
+    Returns:
+        Position after the fill
+    """
+    signed = quantity if side == 'BUY' else -quantity
+    current = position.quantity
+    new_quantity = current + signed
+
+    if new_quantity == 0:
+        average_price = None
+    elif current == 0 or (current > 0) == (signed > 0):
+        total = abs(current) * (position.average_price or 0.0) + abs(signed) * price
+        average_price = total / abs(new_quantity)
+    elif (new_quantity > 0) != (current > 0):
+        average_price = price
+    else:
+        average_price = position.average_price
+
+    side = None if new_quantity == 0 else ('LONG' if new_quantity > 0 else 'SHORT')
+    return Position(position.instrument, new_quantity, side, average_price)
+
+
+class PositionTracker:
+    """Open positions kept up to date from our own fills.
+
+    Lookups are a dict access, so the strategy hot path and the API do not
+    call ``get_positions``. Fills the tracker does not see (manual trades,
+    fills of orders that vanished from the order book) are picked up by
+    replacing the tracker's state with the broker's positions every
+    ``reconcile_interval`` seconds, or sooner after ``mark_stale``. A new
+    tracker is stale until its first reconcile.
+    """
+
+    def __init__(self, reconcile_interval: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the position tracker.
+
+        Args:
+            reconcile_interval: Seconds after which positions are reconciled
+                with the broker again
+            clock: Monotonic time source
+        """
+        self.reconcile_interval = reconcile_interval
+        self._clock = clock
+        self._positions: Dict[str, Position] = {}
+        self._reconciled_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self, instrument: str) -> Position:
+        """Position in an instrument (flat if none is known)."""
+        position = self._positions.get(instrument)
+        return position if position is not None else flat(instrument)
+
+    def open_positions(self) -> List[Position]:
+        """All non-flat positions."""
+        with self._lock:
+            return [position for position in self._positions.values() if position.is_open]
+
+    def apply_fill(self, instrument: str, side: str, quantity: int, price: float) -> Position:
+        """Record a fill of one of our orders and return the new position."""
+        with self._lock:
+            position = apply_fill(self.get(instrument), side, quantity, price)
+            self._positions[instrument] = position
+            return position
+
+    def mark_stale(self):
+        """Force a reconcile before positions are trusted again."""
+        with self._lock:
+            self._reconciled_at = None
+
+    def needs_reconcile(self) -> bool:
+        """Whether positions are due to be replaced with the broker's."""
+        reconciled_at = self._reconciled_at
+        return reconciled_at is None or self._clock() - reconciled_at >= self.reconcile_interval
+
+    def reconcile(self, positions: List[Dict]):
+        """
+        Replace all positions with a get_positions response.
+
+        Args:
+            positions: Broker positions, any instrument
+        """
+        parsed = {}
+        for entry in positions or []:
+            position = parse_position(entry)
+            if position is not None:
+                parsed[position.instrument] = position
+        with self._lock:
+            self._positions = parsed
+            self._reconciled_at = self._clock()
+
+
+def parse_position(entry: Dict) -> Optional[Position]:
+    """Position from a get_positions entry, or None if it has no instrument."""
+    instrument = entry.get('instrument') or entry.get('symbol')
+    if not instrument:
+        return None
+
+    quantity = entry.get('quantity', 0) or entry.get('size', 0) or 0
+    side = str(entry.get('side') or '').upper()
+    if quantity > 0 and side in ('SHORT', 'SELL'):
+        quantity = -quantity
+    price = entry.get('average_price', entry.get('avg_price', entry.get('price')))
+
+    if quantity == 0:
+        return flat(instrument)
+    return Position(instrument, quantity, 'LONG' if quantity > 0 else 'SHORT',
+                    float(price) if price is not None else None)
@@ -0,0 +1,133 @@
+"""Timer heap for strategy runs, aligned to bar closes on a monotonic clock."""
+
+import heapq
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import metrics
+
+# Upper bound for the wake-up lateness compensated by waking early, in seconds
+MAX_COMPENSATION = 0.05
+
+
+class Scheduler:
+    """Named jobs due at monotonic times, kept in one heap.
+
+    Run times are aligned to bar closes: a job that should run again
+    ``interval`` seconds after a run is scheduled for the first bar close
+    (plus ``close_delay``, so the closed bar is available) at or after that
+    time. Bar closes are multiples of ``bar_seconds`` in wall-clock time,
+    mapped onto the monotonic clock each time a run is scheduled, so clock
+    adjustments do not stretch or shrink waits. Repeating runs are scheduled from the time
+    they were due rather than the time they ran, so late wake-ups and run
+    durations do not accumulate as drift, and waits end slightly early by
+    the typical wake-up lateness of the platform.
+    """
+
+    def __init__(self, bar_seconds: float = 60.0, close_delay: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time):
+        """
+        Initialize the scheduler.
+
+        Args:
+            bar_seconds: Bar length that runs are aligned to; 0 disables alignment
+            close_delay: Seconds after a bar close at which runs are scheduled
+            clock: Monotonic time source that due times refer to
+            wall_clock: Wall-clock time source that bar closes refer to
+        """
+        self.bar_seconds = bar_seconds
+        self.close_delay = close_delay
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}
+        self._order: Dict[str, int] = {}
+        # Moving average of how late timed waits return
+        self.lateness = 0.0
+
+    def now(self) -> float:
+        """Current monotonic time."""
+        return self._clock()
+
+    def to_wall(self, due: float) -> float:
+        """Wall-clock time of a monotonic time."""
+        return due + self._wall_clock() - self._clock()
+
+    def schedule(self, name: str, due: float):
+        """Set a job's due time, replacing any earlier one."""
+        # Jobs due together pop in the order they were first scheduled
+        order = self._order.setdefault(name, len(self._order))
+        self._due[name] = due
+        heapq.heappush(self._heap, (due, order, name))
+
+    def due(self, name: str) -> Optional[float]:
+        """Due time of a job, or None if it is not scheduled."""
+        return self._due.get(name)
+
+    def next_due(self, base: float, interval: float) -> float:
+        """
+        Aligned time of the run ``interval`` seconds after ``base``.
+
+        Args:
+            base: Monotonic time the previous run was due (or ran, for
+                runs triggered outside the schedule)
+            interval: Minimum seconds between the runs
+
+        Returns:
+            First bar close plus ``close_delay`` at or after ``base + interval``,
+            and not in the past
+        """
+        earliest = max(base + interval, self._clock())
+        if self.bar_seconds <= 0:
+            return earliest
+        offset = self._wall_clock() - self._clock()
+        wall = earliest + offset - self.close_delay
+        aligned = math.ceil(round(wall / self.bar_seconds, 9)) * self.bar_seconds
+        return aligned + self.close_delay - offset
+
+    def pop_due(self, now: float) -> List[Tuple[float, str]]:
+        """
+        Remove and return the jobs due at ``now``.
+
+        Returns:
+            (due time, name) of each due job, earliest first
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, name = heapq.heappop(self._heap)
+            if self._due.get(name) == when:
+                del self._due[name]
+                due.append((when, name))
+        return due
+
+    def next_wakeup(self) -> Optional[float]:
+        """Earliest due time, or None if no job is scheduled."""
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def wait(self, event: threading.Event, until: float) -> bool:
+        """
+        Wait until a monotonic time or until an event is set.
+
+        Args:
+            event: Event that interrupts the wait (e.g. stop or new work)
+            until: Monotonic time to wake up at
+
+        Returns:
+            True if the event was set
+        """
+        timeout = until - self._clock()
+        if timeout <= self.lateness:
+            return event.wait(max(0.0, timeout))
+        # Wake early by the usual oversleep and measure it
+        target = until - self.lateness
+        if event.wait(target - self._clock()):
+            return True
+        late = max(0.0, self._clock() - target)
+        metrics.SCHEDULE_LATENESS.observe(late)
+        self.lateness = min(MAX_COMPENSATION, 0.8 * self.lateness + 0.2 * late)
+        return False
@@ -0,0 +1,154 @@
+"""Exchange session calendar for anchoring VWAP at session boundaries."""
+
+import datetime
+from typing import FrozenSet, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+# VWAP anchors: a sliding lookback window, or the start of the current
+# Globex session, regular trading hours session, trading week or a custom time
+ANCHORS = ('rolling', 'globex', 'rth', 'weekly', 'custom')
+
+
+class ExchangeHours(NamedTuple):
+    """Session opening times of an exchange, in its local time zone."""
+    timezone: str
+    globex_open: datetime.time  # Electronic session open, the evening before the trade date
+    rth_open: datetime.time  # Regular trading hours open
+
+
+EXCHANGE_HOURS = {
+    'CME': ExchangeHours('America/Chicago', datetime.time(17, 0), datetime.time(8, 30)),
+    'CBOT': ExchangeHours('America/Chicago', datetime.time(17, 0), datetime.time(8, 30)),
+    'NYMEX': ExchangeHours('America/Chicago', datetime.time(17, 0), datetime.time(8, 0)),
+    'COMEX': ExchangeHours('America/Chicago', datetime.time(17, 0), datetime.time(7, 20)),
+}
+
+# Product root -> exchange; unknown products use CME hours
+PRODUCT_EXCHANGES = {
+    'ES': 'CME', 'MES': 'CME', 'NQ': 'CME', 'MNQ': 'CME', 'RTY': 'CME', 'M2K': 'CME',
+    '6E': 'CME', 'M6E': 'CME', '6J': 'CME', '6B': 'CME',
+    'YM': 'CBOT', 'MYM': 'CBOT', 'ZB': 'CBOT', 'ZN': 'CBOT', 'ZF': 'CBOT', 'ZT': 'CBOT',
+    'CL': 'NYMEX', 'MCL': 'NYMEX', 'NG': 'NYMEX', 'QM': 'NYMEX',
+    'GC': 'COMEX', 'MGC': 'COMEX', 'SI': 'COMEX', 'SIL': 'COMEX', 'HG': 'COMEX',
+}
+
+# Trade dates on which CME Group markets are closed all day
+HOLIDAYS: FrozenSet[datetime.date] = frozenset(datetime.date.fromisoformat(day) for day in (
+    '2024-01-01', '2024-03-29', '2024-12-25',
+    '2025-01-01', '2025-04-18', '2025-12-25',
+    '2026-01-01', '2026-04-03', '2026-12-25',
+    '2027-01-01', '2027-03-26', '2027-12-24',
+))
+
+_FRIDAY, _SATURDAY, _SUNDAY = 4, 5, 6
+
+
+def exchange_hours(instrument: str) -> ExchangeHours:
+    """Session hours for an instrument symbol such as 'MGC' or 'MESZ4'."""
+    symbol = instrument.upper()
+    for length in range(len(symbol), 0, -1):
+        exchange = PRODUCT_EXCHANGES.get(symbol[:length])
+        if exchange is not None:
+            return EXCHANGE_HOURS[exchange]
+    return EXCHANGE_HOURS['CME']
+
+
+class SessionAnchor:
+    """Start of the VWAP session containing a time.
+
+    Times are naive UTC like the bars in ``BarCache``; session boundaries are
+    computed in the exchange's time zone, so they follow daylight saving
+    time. Globex sessions open the evening before their trade date (Sunday
+    evening for Monday) and sessions whose trade date is a holiday are
+    skipped, so a holiday folds into the preceding session.
+    """
+
+    def __init__(self, anchor: str, instrument: str, anchor_time: Optional[str] = None,
+                 holidays: FrozenSet[datetime.date] = HOLIDAYS):
+        """
+        Initialize the session anchor.
+
+        Args:
+            anchor: One of ``ANCHORS`` other than 'rolling'
+            instrument: Instrument whose exchange hours apply
+            anchor_time: For 'custom', a daily time ('HH:MM') or a fixed
+                date and time ('YYYY-MM-DDTHH:MM'), in exchange time
+            holidays: Trade dates on which the exchange is closed
+        """
+        if anchor not in ANCHORS or anchor == 'rolling':
+            raise ValueError(f"Unknown session anchor: {anchor!r} (expected one of {ANCHORS[1:]})")
+        self.anchor = anchor
+        self.hours = exchange_hours(instrument)
+        self.timezone = ZoneInfo(self.hours.timezone)
+        self.holidays = holidays
+        self._daily_time: Optional[datetime.time] = None
+        self._fixed_start: Optional[datetime.datetime] = None
+
+        if anchor == 'custom':
+            if not anchor_time:
+                raise ValueError("A custom session anchor needs an anchor time")
+            if 'T' in anchor_time or '-' in anchor_time:
+                fixed = datetime.datetime.fromisoformat(anchor_time).replace(tzinfo=self.timezone)
+                self._fixed_start = _to_utc(fixed)
+            else:
+                self._daily_time = datetime.time.fromisoformat(anchor_time)
+
+    def session_start(self, timestamp: datetime.datetime) -> datetime.datetime:
+        """
+        Start of the session a time belongs to.
+
+        Args:
+            timestamp: Time in naive UTC
+
+        Returns:
+            Session start in naive UTC
+        """
+        if self._fixed_start is not None:
+            return self._fixed_start
+
+        local = timestamp.replace(tzinfo=datetime.timezone.utc).astimezone(self.timezone)
+        if self.anchor == 'globex':
+            return self._globex_start(local)
+        if self.anchor == 'weekly':
+            # The week opens with Sunday's Globex session
+            start = self._at(local.date() - datetime.timedelta(days=(local.weekday() - _SUNDAY) % 7),
+                             self.hours.globex_open)
+            if start > local:
+                start = self._at(start.date() - datetime.timedelta(days=7), self.hours.globex_open)
+            return _to_utc(start)
+
+        open_time = self.hours.rth_open if self.anchor == 'rth' else self._daily_time
+        day = local.date()
+        if self._at(day, open_time) > local:
+            day -= datetime.timedelta(days=1)
+        while day.weekday() in (_SATURDAY, _SUNDAY) or day in self.holidays:
+            day -= datetime.timedelta(days=1)
+        return _to_utc(self._at(day, open_time))
+
+    def _globex_start(self, local: datetime.datetime) -> datetime.datetime:
+        """Opening of the Globex session trading at a local time."""
+        day = local.date()
+        if self._at(day, self.hours.globex_open) > local:
+            day -= datetime.timedelta(days=1)
+        # No session opens on Friday or Saturday evening, or before a holiday
+        while (day.weekday() in (_FRIDAY, _SATURDAY)
+               or day + datetime.timedelta(days=1) in self.holidays):
+            day -= datetime.timedelta(days=1)
+        return _to_utc(self._at(day, self.hours.globex_open))
+
+    def _at(self, day: datetime.date, time: datetime.time) -> datetime.datetime:
+        """Exchange-local datetime of a time on a day."""
+        return datetime.datetime.combine(day, time, tzinfo=self.timezone)
+
+
+def create_session_anchor(anchor: str, instrument: str,
+                          anchor_time: Optional[str] = None) -> Optional[SessionAnchor]:
+    """Session anchor for a configured anchor mode, or None for a rolling window."""
+    if not anchor or anchor == 'rolling':
+        return None
+    return SessionAnchor(anchor, instrument, anchor_time)
+
+
+def _to_utc(local: datetime.datetime) -> datetime.datetime:
+    """Naive UTC time of an aware datetime."""
+    return local.astimezone(datetime.timezone.utc).replace(tzinfo=None)
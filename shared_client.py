@@ -0,0 +1,335 @@
+"""Client proxy that coalesces identical reads and keeps calls within a rate budget."""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import metrics
+from deadlines import DeadlineExceeded, remaining
+
+logger = logging.getLogger(__name__)
+
+# Reads that are shared between identical concurrent calls and cached
+READ_METHODS = ('get_historical_data', 'get_market_data', 'get_positions', 'get_orders')
+# Calls that take priority in the rate budget
+ORDER_METHODS = ('place_order', 'modify_order', 'cancel_order')
+# Reads whose results an order call makes stale
+ORDER_STATE_READS = ('get_positions', 'get_orders')
+# Rate budget of each method; methods not listed use 'default'
+ENDPOINT_CLASSES = {'get_historical_data': 'history'}
+
+# Share of a bucket that only priority calls may use
+PRIORITY_RESERVE = 0.1
+# Cached reads above which expired ones are dropped
+PRUNE_SIZE = 64
+
+
+class RateLimitExceeded(RuntimeError):
+    """A call could not get a token from its rate budget in time."""
+
+
+def parse_rate(spec: str) -> Optional[Tuple[float, float]]:
+    """
+    Parse a rate limit of the form 'calls/seconds' (e.g. '200/60').
+
+    Returns:
+        (calls, seconds), or None for an empty or zero limit
+    """
+    spec = (spec or '').strip()
+    if not spec:
+        return None
+    calls, _, seconds = spec.partition('/')
+    calls, seconds = float(calls), float(seconds or 1)
+    if calls <= 0:
+        return None
+    if seconds <= 0:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return calls, seconds
+
+
+class TokenBucket:
+    """Token bucket holding up to ``calls`` tokens, refilled over ``seconds``.
+
+    A ``reserve`` of the tokens is only available to priority callers, and
+    priority callers that wait are served before other waiters, so order
+    calls keep their budget while reads are throttled.
+    """
+
+    def __init__(self, calls: float, seconds: float, reserve: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a full bucket.
+
+        Args:
+            calls: Bucket capacity, i.e. calls allowed in a burst
+            seconds: Time to refill the whole bucket
+            reserve: Tokens kept for priority calls (default: PRIORITY_RESERVE
+                of the capacity, rounded down)
+            clock: Monotonic time source
+        """
+        self.capacity = float(calls)
+        self.rate = calls / seconds
+        self.reserve = float(int(calls * PRIORITY_RESERVE)) if reserve is None else reserve
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._priority_waiters = 0
+        self._condition = threading.Condition()
+
+    def try_acquire(self, priority: bool = False) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0.0 if a token was taken, otherwise the seconds until one may be
+        """
+        with self._condition:
+            return self._take(priority)
+
+    def acquire(self, priority: bool = False, timeout: Optional[float] = None) -> float:
+        """
+        Take a token, waiting for one if necessary.
+
+        Args:
+            priority: Whether the call may use the reserve and goes before
+                waiting non-priority calls
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitExceeded: If no token became available within ``timeout``
+        """
+        started = self._clock()
+        with self._condition:
+            if priority:
+                self._priority_waiters += 1
+            try:
+                while True:
+                    delay = self._take(priority)
+                    if not delay:
+                        return self._clock() - started
+                    if timeout is not None:
+                        remaining = started + timeout - self._clock()
+                        if remaining <= 0:
+                            raise RateLimitExceeded(f"No rate budget within {timeout}s")
+                        delay = min(delay, remaining)
+                    self._condition.wait(delay)
+            finally:
+                if priority:
+                    self._priority_waiters -= 1
+                    self._condition.notify_all()
+
+    def _take(self, priority: bool) -> float:
+        """Take a token or return the wait for one; caller holds the condition."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        floor = 1.0 if priority else 1.0 + self.reserve
+        # Other callers wait while a priority call is waiting
+        blocked = not priority and self._priority_waiters > 0
+        if self._tokens >= floor and not blocked:
+            self._tokens -= 1.0
+            return 0.0
+        return max((floor - self._tokens) / self.rate, 0.001)
+
+
+class _Flight:
+    """A read in progress whose result is shared by identical calls."""
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SharedClient:
+    """Client proxy shared by the strategy thread and the API handlers.
+
+    Identical reads (same method and arguments) that overlap are sent once
+    and every caller gets the result; results are then served from a cache
+    for ``cache_ttl`` seconds. Order calls drop cached position and order
+    reads. Every call that reaches the client first takes a token from the
+    rate budget of its endpoint class, with order placement, amends and
+    cancels going before reads; the wait for budget is bounded by
+    ``max_wait`` and the caller's ``deadline``. Calls are timed by an
+    ``InstrumentedClient`` underneath, so client metrics count only real
+    round trips. Coroutine methods pass through unchanged.
+    """
+
+    instrumented = True
+    shared = True
+
+    def __init__(self, client, cache_ttl: float = 1.0,
+                 limits: Optional[Dict[str, TokenBucket]] = None,
+                 max_wait: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the proxy.
+
+        Args:
+            client: Underlying ProjectX client
+            cache_ttl: Seconds a read result is reused; 0 only shares calls in flight
+            limits: Token bucket per endpoint class ('default', 'history');
+                classes without one are not limited
+            max_wait: Maximum seconds a call waits for rate budget
+            clock: Monotonic time source of the cache
+        """
+        self._client = metrics.instrument_client(client)
+        self.cache_ttl = cache_ttl
+        self.limits = limits or {}
+        self.max_wait = max_wait
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._in_flight: Dict[Tuple, _Flight] = {}
+        self._generation = 0
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if (name not in READ_METHODS and name not in ORDER_METHODS) or not callable(attr) \
+                or asyncio.iscoroutinefunction(attr):
+            return attr
+        if name in READ_METHODS:
+            wrapper = functools.partial(self._read, name, attr)
+        else:
+            wrapper = functools.partial(self._order, name, attr)
+        # Cache the wrapper so later lookups skip __getattr__
+        self.__dict__[name] = wrapper
+        return wrapper
+
+    def clear(self):
+        """Drop all cached reads."""
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+
+    def _read(self, name: str, func: Callable, *args, **kwargs):
+        """Serve a read from the cache or a call in flight, or make the call."""
+        key = _call_key(name, args, kwargs)
+        if key is None:
+            return self._call(name, func, args, kwargs)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > self._clock():
+                metrics.CLIENT_SHARED_READS.labels(name, 'cache').inc()
+                return _copy(cached[1])
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight(self._generation)
+
+        if not leader:
+            metrics.CLIENT_SHARED_READS.labels(name, 'in_flight').inc()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _copy(flight.value)
+
+        try:
+            flight.value = self._call(name, func, args, kwargs)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+                # Results that an order call made stale while in flight are not cached
+                if flight.error is None and self.cache_ttl > 0 and flight.generation == self._generation:
+                    now = self._clock()
+                    if len(self._cache) >= PRUNE_SIZE:
+                        self._prune(now)
+                    self._cache[key] = (now + self.cache_ttl, flight.value)
+            flight.done.set()
+        return _copy(flight.value)
+
+    def _prune(self, now: float):
+        """Drop expired reads (e.g. bar requests, whose end time changes every call); caller holds the lock."""
+        for key in [key for key, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[key]
+
+    def _order(self, name: str, func: Callable, *args, **kwargs):
+        """Make an order call with priority, then drop stale position and order reads."""
+        try:
+            return self._call(name, func, args, kwargs, priority=True)
+        finally:
+            with self._lock:
+                self._generation += 1
+                for key in [key for key in self._cache if key[0] in ORDER_STATE_READS]:
+                    del self._cache[key]
+                # Later reads must not join calls that started before the order
+                for key in [key for key in self._in_flight if key[0] in ORDER_STATE_READS]:
+                    del self._in_flight[key]
+
+    def _call(self, name: str, func: Callable, args, kwargs, priority: bool = False):
+        """Take a token from the method's rate budget and make the call."""
+        endpoint = ENDPOINT_CLASSES.get(name, 'default')
+        bucket = self.limits.get(endpoint)
+        if bucket is not None:
+            # The wait counts against the caller's deadline
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded(f"No time left to wait for {endpoint} rate budget")
+            timeout = self.max_wait if left is None else min(left, self.max_wait)
+            try:
+                waited = bucket.acquire(priority, timeout=timeout)
+            except RateLimitExceeded as e:
+                if timeout < self.max_wait:
+                    metrics.CLIENT_DEADLINE_EXCEEDED.labels(name).inc()
+                    raise DeadlineExceeded(f"{name} did not get {endpoint} rate budget "
+                                           f"within its deadline") from e
+                raise
+            metrics.RATE_LIMIT_WAIT_SECONDS.labels(endpoint).observe(waited)
+            if waited > 1.0:
+                logger.warning(f"{name} waited {waited:.1f}s for {endpoint} rate budget")
+        return func(*args, **kwargs)
+
+
+def share_client(client, cache_ttl: float = 1.0, rate_limit: str = '',
+                 history_rate_limit: str = '') -> SharedClient:
+    """
+    Wrap a client in ``SharedClient`` unless it is already shared.
+
+    Args:
+        client: Underlying ProjectX client
+        cache_ttl: Seconds a read result is reused
+        rate_limit: 'calls/seconds' budget of all calls without their own
+            class (empty: unlimited)
+        history_rate_limit: 'calls/seconds' budget of historical bar requests
+
+    Returns:
+        The shared client
+    """
+    if getattr(client, 'shared', False):
+        return client
+    limits = {}
+    for endpoint, spec in (('default', rate_limit), ('history', history_rate_limit)):
+        rate = parse_rate(spec)
+        if rate is not None:
+            limits[endpoint] = TokenBucket(*rate)
+    return SharedClient(client, cache_ttl=cache_ttl, limits=limits)
+
+
+def _call_key(name: str, args, kwargs) -> Optional[Tuple]:
+    """Hashable key of a call, or None if its arguments are not hashable."""
+    key = (name, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _copy(value):
+    """Copy of a shared list or dict result, so callers cannot change each other's."""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
@@ -0,0 +1,422 @@
+"""In-process ProjectX exchange simulator for offline runs and benchmarks."""
+
+import argparse
+import datetime
+import itertools
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from metrics import CLIENT_METHODS
+from positions import Position, apply_fill, flat
+
+logger = logging.getLogger(__name__)
+
+_BAR = datetime.timedelta(minutes=1)
+
+
+class SimulatedExchange:
+    """Fake ProjectX client backed by generated 1-minute bars.
+
+    Bars are a seeded random walk per instrument, generated from
+    ``history_start`` up to the current minute as time passes, so the same
+    seed always produces the same market. Working limit orders fill at their
+    limit price on the first completed bar that trades through it (or at once
+    if marketable when placed), and fills update a net position per
+    instrument. Every call sleeps for a configurable latency plus uniform
+    jitter, drawn from a separately seeded generator, to stand in for the
+    network round trip.
+
+    Pass an instance as ``client`` to ``VWAPStrategy`` or ``StrategyEngine``.
+    """
+
+    def __init__(self, instruments=('MGC',), seed: int = 0, start_price: float = 2000.0,
+                 volatility: float = 0.5, mean_volume: float = 150.0,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 latencies: Optional[Dict[str, float]] = None,
+                 history: datetime.timedelta = datetime.timedelta(days=1),
+                 clock: Callable[[], datetime.datetime] = datetime.datetime.utcnow,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the simulator.
+
+        Args:
+            instruments: Instruments with a market
+            seed: Seed of the price, volume and latency generators
+            start_price: Price of the first generated bar
+            volatility: Standard deviation of the close-to-close move per bar
+            mean_volume: Average volume per bar
+            latency: Seconds added to every call
+            jitter: Maximum extra seconds added to every call, uniformly drawn
+            latencies: Per-method latency overriding ``latency``, keyed by
+                names in ``metrics.CLIENT_METHODS``
+            history: How far before the first call bars exist
+            clock: Returns the current time as naive UTC
+            sleep: Used to wait out the injected latency
+
+        Raises:
+            ValueError: If ``latencies`` names a method that is not a client method
+        """
+        self.seed = seed
+        self.start_price = start_price
+        self.volatility = volatility
+        self.mean_volume = mean_volume
+        self.latency = latency
+        self.jitter = jitter
+        self.latencies = dict(latencies or {})
+        unknown = sorted(set(self.latencies) - set(CLIENT_METHODS))
+        if unknown:
+            raise ValueError(f"Latencies set for unknown client methods: {', '.join(unknown)}")
+        self.clock = clock
+        self._sleep = sleep
+        self.history_start = _minute_floor(clock()) - history
+
+        self._markets = {instrument: _Market(start_price, np.random.default_rng([seed, index]))
+                         for index, instrument in enumerate(instruments)}
+        self._latency_rng = np.random.default_rng([seed, len(self._markets)])
+        self._orders: Dict[str, Dict] = {}
+        self._positions: Dict[str, Position] = {}
+        self.fills: List[Dict] = []
+        self._order_ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+        self.calls: Counter = Counter()
+        self.call_time: Counter = Counter()
+
+    def get_historical_data(self, instrument: Optional[str] = None, start=None, end=None,
+                            interval: str = '1m', symbol: Optional[str] = None) -> List[Dict]:
+        """1-minute bars with timestamps in ``[start, end]``, forming bar included."""
+        with self._call('get_historical_data'):
+            if interval != '1m':
+                raise ValueError(f"Unsupported interval: {interval}")
+            market = self._market(instrument or symbol)
+            start = max(_parse_time(start), self.history_start) if start is not None else self.history_start
+            end = min(_parse_time(end), self.clock()) if end is not None else self.clock()
+            first = _index_at(self.history_start, start, ceil=True)
+            last = _index_at(self.history_start, end)
+            if last < first:
+                return []
+
+            market.extend(last + 1, self.volatility, self.mean_volume)
+            return [
+                {
+                    'timestamp': (self.history_start + i * _BAR).isoformat(),
+                    'open': float(market.open[i]),
+                    'high': float(market.high[i]),
+                    'low': float(market.low[i]),
+                    'close': float(market.close[i]),
+                    'volume': float(market.volume[i]),
+                }
+                for i in range(first, last + 1)
+            ]
+
+    def get_market_data(self, instrument: str) -> Dict:
+        """Latest trade price, the close of the forming bar."""
+        with self._call('get_market_data'):
+            price = self._last_price(instrument)
+            return {'instrument': instrument, 'last_price': price,
+                    'timestamp': self.clock().isoformat()}
+
+    def get_positions(self) -> List[Dict]:
+        """Open positions, one per instrument."""
+        with self._call('get_positions'):
+            self._match_orders()
+            return [position._asdict() for position in self._positions.values() if position.is_open]
+
+    def get_orders(self, status: Optional[str] = None) -> List[Dict]:
+        """Orders, optionally only those with a status such as 'OPEN'."""
+        with self._call('get_orders'):
+            self._match_orders()
+            return [_public(order) for order in self._orders.values()
+                    if status is None or order['status'] == status]
+
+    def place_order(self, instrument: Optional[str] = None, symbol: Optional[str] = None,
+                    order_type: Optional[str] = None, type: Optional[str] = None,
+                    side: str = 'BUY', quantity: int = 1, price: Optional[float] = None,
+                    time_in_force: str = 'GTC') -> Dict:
+        """Place a limit order; fills immediately if marketable."""
+        with self._call('place_order'):
+            instrument = instrument or symbol
+            self._market(instrument)
+            if (order_type or type or 'LIMIT').upper() != 'LIMIT' or price is None:
+                raise ValueError("Only limit orders with a price are supported")
+            if side not in ('BUY', 'SELL'):
+                raise ValueError(f"Invalid side: {side}")
+
+            self._match_orders()
+            order_id = str(next(self._order_ids))
+            order = {
+                'id': order_id,
+                'instrument': instrument,
+                'side': side,
+                'quantity': quantity,
+                'price': float(price),
+                'status': 'OPEN',
+                'time_in_force': time_in_force,
+                'placed_at': self.clock().isoformat(),
+            }
+            self._orders[order_id] = order
+            # Only bars that complete after placement can fill the order
+            order['_from_bar'] = _index_at(self.history_start, self.clock())
+
+            last_price = self._last_price(instrument)
+            if (side == 'BUY' and last_price <= price) or (side == 'SELL' and last_price >= price):
+                self._fill(order, last_price)
+            return _public(order)
+
+    def modify_order(self, order_id: str, price: Optional[float] = None,
+                     quantity: Optional[int] = None) -> Dict:
+        """Change the price or quantity of a working order."""
+        with self._call('modify_order'):
+            self._match_orders()
+            order = self._orders.get(order_id)
+            if order is None:
+                raise ValueError(f"Unknown order: {order_id}")
+            if order['status'] != 'OPEN':
+                raise ValueError(f"Order {order_id} is {order['status']}")
+            if price is not None:
+                order['price'] = float(price)
+            if quantity is not None:
+                order['quantity'] = quantity
+            order['_from_bar'] = _index_at(self.history_start, self.clock())
+
+            last_price = self._last_price(order['instrument'])
+            if ((order['side'] == 'BUY' and last_price <= order['price'])
+                    or (order['side'] == 'SELL' and last_price >= order['price'])):
+                self._fill(order, last_price)
+            return _public(order)
+
+    def cancel_order(self, order_id: str) -> Dict:
+        """Cancel a working order."""
+        with self._call('cancel_order'):
+            self._match_orders()
+            order = self._orders.get(order_id)
+            if order is None:
+                raise ValueError(f"Unknown order: {order_id}")
+            if order['status'] == 'OPEN':
+                order['status'] = 'CANCELLED'
+            # A fill that beat the cancel is reported like any other
+            return _public(order)
+
+    def call_stats(self) -> Dict[str, Dict[str, float]]:
+        """Number of calls and mean injected latency per method."""
+        return {
+            method: {'calls': self.calls[method],
+                     'mean_latency': self.call_time[method] / self.calls[method]}
+            for method in self.calls
+        }
+
+    def _call(self, method: str):
+        """Context for one client call: counts it and injects its latency."""
+        return _SimulatedCall(self, method)
+
+    def _delay(self, method: str) -> float:
+        delay = self.latencies.get(method, self.latency)
+        if self.jitter:
+            with self._lock:
+                delay += float(self._latency_rng.uniform(0.0, self.jitter))
+        return delay
+
+    def _market(self, instrument: Optional[str]) -> '_Market':
+        market = self._markets.get(instrument)
+        if market is None:
+            raise ValueError(f"Unknown instrument: {instrument}")
+        return market
+
+    def _last_price(self, instrument: str) -> float:
+        market = self._market(instrument)
+        current = _index_at(self.history_start, self.clock())
+        market.extend(current + 1, self.volatility, self.mean_volume)
+        return float(market.close[current])
+
+    def _match_orders(self):
+        """Fill working orders on the bars completed since they were placed."""
+        completed = _index_at(self.history_start, self.clock())  # Bars before this are complete
+        for order in self._orders.values():
+            if order['status'] != 'OPEN' or order['_from_bar'] >= completed:
+                continue
+            market = self._market(order['instrument'])
+            market.extend(completed, self.volatility, self.mean_volume)
+            bars = slice(order['_from_bar'], completed)
+            if order['side'] == 'BUY':
+                touched = (market.low[bars] <= order['price']).any()
+            else:
+                touched = (market.high[bars] >= order['price']).any()
+            if touched:
+                self._fill(order, order['price'])
+            else:
+                order['_from_bar'] = completed
+
+    def _fill(self, order: Dict, price: float):
+        """Fill an order completely and update the instrument's position."""
+        order['status'] = 'FILLED'
+        order['fill_price'] = price
+        instrument = order['instrument']
+        position = apply_fill(self._positions.get(instrument) or flat(instrument),
+                              order['side'], order['quantity'], price)
+        self._positions[instrument] = position
+
+        self.fills.append({'order_id': order['id'], 'instrument': order['instrument'],
+                           'side': order['side'], 'quantity': order['quantity'], 'price': price,
+                           'timestamp': self.clock().isoformat()})
+        logger.debug(f"Simulated fill: {order['side']} {order['quantity']} "
+                     f"{order['instrument']} at {price}")
+
+
+def random_walk_bars(n: int, seed: int = 0, volatility: float = 0.6, wick: float = 0.8,
+                     max_volume: int = 300) -> Dict[str, np.ndarray]:
+    """
+    Seeded random-walk 1-minute bars, for tests and benchmarks.
+
+    Args:
+        n: Number of bars
+        seed: Seed of the generator; the same seed gives the same bars
+        volatility: Standard deviation of the close-to-close move per bar
+        wick: Maximum extent of the high and low beyond the open and close
+        max_volume: Volumes are drawn uniformly from ``[0, max_volume)``
+
+    Returns:
+        Open, high, low, close and volume column arrays without timestamps,
+        oldest bar first
+    """
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, volatility, n))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    return {
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.uniform(0, wick, n),
+        'low': np.minimum(open_, close) - rng.uniform(0, wick, n),
+        'close': close,
+        'volume': rng.integers(0, max_volume, n).astype(float),
+    }
+
+
+class _SimulatedCall:
+    """Counts a simulator call and waits out its latency before it runs."""
+
+    def __init__(self, exchange: SimulatedExchange, method: str):
+        self.exchange = exchange
+        self.method = method
+
+    def __enter__(self):
+        delay = self.exchange._delay(self.method)
+        if delay > 0:
+            # Sleep outside the lock so concurrent calls overlap like real I/O
+            self.exchange._sleep(delay)
+        self.exchange._lock.acquire()
+        self.exchange.calls[self.method] += 1
+        self.exchange.call_time[self.method] += delay
+        return self
+
+    def __exit__(self, *exc_info):
+        self.exchange._lock.release()
+        return False
+
+
+class _Market:
+    """Generated bar columns of one instrument, grown on demand."""
+
+    _CHUNK = 1440
+
+    def __init__(self, start_price: float, rng: np.random.Generator):
+        self.rng = rng
+        self.last_close = start_price
+        self.open = np.empty(0)
+        self.high = np.empty(0)
+        self.low = np.empty(0)
+        self.close = np.empty(0)
+        self.volume = np.empty(0)
+
+    def extend(self, n_bars: int, volatility: float, mean_volume: float):
+        """Generate bars until at least ``n_bars`` exist."""
+        if n_bars <= len(self.close):
+            return
+        count = max(n_bars - len(self.close), self._CHUNK)
+        close = self.last_close + np.cumsum(self.rng.normal(0.0, volatility, count))
+        open_ = np.concatenate(([self.last_close], close[:-1]))
+        wick = np.abs(self.rng.normal(0.0, volatility / 2, (2, count)))
+        volume = self.rng.poisson(mean_volume, count).astype(float)
+
+        self.open = np.concatenate((self.open, open_))
+        self.high = np.concatenate((self.high, np.maximum(open_, close) + wick[0]))
+        self.low = np.concatenate((self.low, np.minimum(open_, close) - wick[1]))
+        self.close = np.concatenate((self.close, close))
+        self.volume = np.concatenate((self.volume, volume))
+        self.last_close = float(close[-1])
+
+
+def _public(order: Dict) -> Dict:
+    """Copy of an order without simulator bookkeeping fields."""
+    return {key: value for key, value in order.items() if not key.startswith('_')}
+
+
+def _parse_time(value) -> datetime.datetime:
+    """Naive UTC datetime from a datetime or ISO string."""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _index_at(origin: datetime.datetime, timestamp: datetime.datetime, ceil: bool = False) -> int:
+    """Index of the bar containing ``timestamp`` (or the first starting at/after it)."""
+    offset = (timestamp - origin) / _BAR
+    index = int(offset // 1)
+    if ceil and index != offset:
+        index += 1
+    return index
+
+
+def _minute_floor(timestamp: datetime.datetime) -> datetime.datetime:
+    return timestamp.replace(second=0, microsecond=0)
+
+
+def main():
+    """Time strategy iterations against the simulator."""
+    from vwap_strategy import VWAPStrategy
+
+    parser = argparse.ArgumentParser(description="Run the VWAP strategy against a simulated exchange")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds per API call")
+    parser.add_argument('--jitter', type=float, default=0.02, help="Maximum extra seconds per call")
+    parser.add_argument('--deviation', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Use the asyncio execution path")
+    args = parser.parse_args()
+
+    exchange = SimulatedExchange(seed=args.seed, latency=args.latency, jitter=args.jitter)
+    if args.use_async:
+        import asyncio
+        from async_strategy import AsyncVWAPStrategy
+        strategy = AsyncVWAPStrategy(vwap_deviation=args.deviation, client=exchange)
+        iterate = lambda: asyncio.run(strategy.execute_strategy_async())
+    else:
+        strategy = VWAPStrategy(vwap_deviation=args.deviation, client=exchange)
+        iterate = strategy.execute_strategy
+
+    durations = []
+    for _ in range(args.iterations):
+        started = time.perf_counter()
+        iterate()
+        durations.append(time.perf_counter() - started)
+
+    durations = np.array(durations) * 1000
+    print(f"iterations: {len(durations)}  mean: {durations.mean():.1f} ms  "
+          f"p50: {np.percentile(durations, 50):.1f} ms  p95: {np.percentile(durations, 95):.1f} ms  "
+          f"max: {durations.max():.1f} ms")
+    for method, stats in sorted(exchange.call_stats().items()):
+        print(f"  {method:<20} calls: {stats['calls']:>5}  mean latency: {stats['mean_latency'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    main()
@@ -0,0 +1,166 @@
+"""Immutable strategy snapshots served to API readers."""
+
+import datetime
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StrategySnapshot(NamedTuple):
+    """State of a strategy as of one evaluation."""
+    instrument: str
+    vwap: Optional[float]
+    current_price: Optional[float]
+    deviation: float
+    band_mode: str
+    band_width: Optional[float]
+    std: Optional[float]
+    long_entry: Optional[float]
+    short_entry: Optional[float]
+    anchor: str
+    session_start: Optional[datetime.datetime]  # Naive UTC, None for a rolling window
+    # 'BUY', 'SELL' or 'none', or why no decision was made:
+    # 'position_open', 'no_vwap' or 'no_price'
+    decision: str
+    timestamp: float  # Seconds since the epoch
+
+
+def snapshot_payload(snapshot: StrategySnapshot) -> Dict[str, Any]:
+    """JSON-serializable form of a snapshot, as returned by the VWAP endpoint."""
+    payload = snapshot._asdict()
+    if snapshot.session_start is not None:
+        payload['session_start'] = snapshot.session_start.isoformat()
+    payload['timestamp'] = datetime.datetime.fromtimestamp(
+        snapshot.timestamp, datetime.timezone.utc).isoformat()
+    return payload
+
+
+def snapshot_etag(snapshot: StrategySnapshot) -> str:
+    """
+    Weak entity tag of a snapshot.
+
+    The timestamp is left out, so re-evaluations that change nothing keep
+    the tag and readers holding it get a 304.
+    """
+    content = snapshot_payload(snapshot)
+    del content['timestamp']
+    digest = hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+    return f'W/"{digest[:16]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an entity tag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith('W/') else tag) == opaque:
+            return True
+    return False
+
+
+class CachedSnapshot(NamedTuple):
+    """A snapshot with its payload and entity tag, built once per snapshot."""
+    snapshot: StrategySnapshot
+    payload: Dict[str, Any]
+    etag: str
+
+
+class _Refresh:
+    """One in-flight refresh that concurrent readers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[Exception] = None
+
+
+class SnapshotCache:
+    """Serves the snapshots strategies publish, refreshing stale ones on demand.
+
+    Readers get the strategy's latest snapshot while it is younger than
+    ``ttl``. When it is older (e.g. between the timer runs of a strategy
+    without a market feed), the first reader refreshes it and concurrent
+    readers of the same key wait for that refresh instead of starting
+    their own, so broker traffic does not grow with the number of readers.
+    A failed refresh falls back to the stale snapshot if there is one.
+    """
+
+    def __init__(self, ttl: float = 5.0, clock: Callable[[], float] = time.time,
+                 refresh_timeout: float = 30.0):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Age in seconds after which a snapshot is refreshed
+            clock: Wall-clock time source matching ``StrategySnapshot.timestamp``
+            refresh_timeout: Seconds a reader waits for another reader's refresh
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self.refresh_timeout = refresh_timeout
+        self._entries: Dict[str, CachedSnapshot] = {}
+        self._refreshing: Dict[str, _Refresh] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, current: Callable[[], Optional[StrategySnapshot]],
+            refresh: Callable[[], Any]) -> Optional[CachedSnapshot]:
+        """
+        Latest snapshot for a key, refreshed first if it is stale.
+
+        Args:
+            key: Strategy name
+            current: Returns the strategy's latest published snapshot
+            refresh: Makes the strategy publish a new snapshot
+
+        Returns:
+            The cached snapshot, or None if none has been published
+
+        Raises:
+            Exception: The refresh error, if there is no snapshot to fall back to
+        """
+        snapshot = current()
+        if snapshot is None or self._clock() - snapshot.timestamp >= self.ttl:
+            error = self._refresh(key, refresh)
+            snapshot = current()
+            if error is not None:
+                if snapshot is None:
+                    raise error
+                logger.warning(f"Snapshot refresh for {key} failed, serving a stale one: {error}")
+        return None if snapshot is None else self._entry(key, snapshot)
+
+    def _refresh(self, key: str, refresh: Callable[[], Any]) -> Optional[Exception]:
+        """Run a refresh, or wait for the one already running; returns its error."""
+        with self._lock:
+            flight = self._refreshing.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._refreshing[key] = _Refresh()
+        if not leader:
+            flight.done.wait(self.refresh_timeout)
+            return flight.error
+
+        try:
+            refresh()
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                del self._refreshing[key]
+            flight.done.set()
+        return flight.error
+
+    def _entry(self, key: str, snapshot: StrategySnapshot) -> CachedSnapshot:
+        """Payload and entity tag of a snapshot, reused while it stays current."""
+        entry = self._entries.get(key)
+        if entry is None or entry.snapshot is not snapshot:
+            entry = CachedSnapshot(snapshot, snapshot_payload(snapshot), snapshot_etag(snapshot))
+            self._entries[key] = entry
+        return entry
@@ -0,0 +1,442 @@
+"""Multi-instrument strategy engine sharing one client and one scheduler."""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from feeds import MarketEvent, MarketFeed
+from metrics import TIME_TO_FIRST_DECISION_SECONDS, instrument_client
+from positions import PositionTracker
+from scheduler import Scheduler
+from vwap_strategy import VWAPStrategy, create_client
+
+logger = logging.getLogger(__name__)
+
+# Fields of a strategy config passed through to VWAPStrategy
+STRATEGY_PARAMS = ('vwap_deviation', 'timer_interval', 'contract_size', 'instrument', 'band_mode',
+                   'anchor', 'anchor_time')
+
+
+def parse_strategy_configs(spec: str, defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Parse the strategy list from configuration.
+
+    Args:
+        spec: Either a JSON list of objects with any of ``name``,
+            ``instrument``, ``vwap_deviation``, ``band_mode``, ``anchor``,
+            ``anchor_time``, ``timer_interval`` and ``contract_size``, or a
+            comma-separated list of instruments. Empty means a single
+            strategy built from ``defaults``.
+        defaults: Parameter values used where a config omits them
+
+    Returns:
+        One dict per strategy with every parameter and a unique ``name``
+
+    Raises:
+        ValueError: If two strategies have the same name or instrument;
+            orders and positions are tracked per instrument, so strategies
+            on one instrument would manage each other's orders
+    """
+    spec = (spec or '').strip()
+    if not spec:
+        entries = [{}]
+    elif spec.startswith('['):
+        entries = json.loads(spec)
+    else:
+        entries = [{'instrument': item.strip()} for item in spec.split(',') if item.strip()]
+
+    configs = []
+    names = set()
+    instruments = set()
+    for entry in entries:
+        config = {key: entry.get(key, defaults.get(key)) for key in STRATEGY_PARAMS}
+        config['name'] = entry.get('name') or config['instrument']
+        if config['name'] in names:
+            raise ValueError(f"Duplicate strategy name: {config['name']}")
+        if config['instrument'] in instruments:
+            raise ValueError(f"More than one strategy for instrument {config['instrument']}")
+        names.add(config['name'])
+        instruments.add(config['instrument'])
+        configs.append(config)
+    return configs
+
+
+class BatchedClient:
+    """Client proxy that shares position and order reads within an engine tick.
+
+    While a tick is active on the calling thread, the first ``get_positions``
+    and ``get_orders`` results are reused by every strategy in the tick, so the
+    number of those calls does not grow with the number of instruments. Each
+    strategy only touches its own instrument's orders, so the order snapshot
+    stays valid after other strategies place orders; cancelled orders are
+    removed from it. Calls from other threads (e.g. API handlers) go straight
+    to the client.
+    """
+
+    def __init__(self, client):
+        """
+        Initialize the proxy.
+
+        Args:
+            client: Underlying ProjectX client
+        """
+        self._client = client
+        self._local = threading.local()
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+    def begin_tick(self):
+        """Start sharing reads on the calling thread."""
+        self._local.positions = None
+        self._local.orders = {}
+        self._local.active = True
+
+    def end_tick(self):
+        """Stop sharing reads on the calling thread."""
+        self._local.active = False
+        self._local.positions = None
+        self._local.orders = {}
+
+    def _in_tick(self) -> bool:
+        return getattr(self._local, 'active', False)
+
+    def get_positions(self, *args, **kwargs):
+        if not self._in_tick():
+            return self._client.get_positions(*args, **kwargs)
+        if self._local.positions is None:
+            self._local.positions = self._client.get_positions(*args, **kwargs)
+        return self._local.positions
+
+    def get_orders(self, *args, **kwargs):
+        if not self._in_tick():
+            return self._client.get_orders(*args, **kwargs)
+        key = (args, tuple(sorted(kwargs.items())))
+        if key not in self._local.orders:
+            self._local.orders[key] = list(self._client.get_orders(*args, **kwargs) or [])
+        return self._local.orders[key]
+
+    def cancel_order(self, order_id, *args, **kwargs):
+        response = self._client.cancel_order(order_id, *args, **kwargs)
+        if self._in_tick():
+            for orders in self._local.orders.values():
+                orders[:] = [order for order in orders
+                             if (order.get('id') or order.get('order_id')) != order_id]
+        return response
+
+
+class StrategyEngine:
+    """Runs several strategy configurations on one client and one thread.
+
+    Strategies are kept in one ``Scheduler`` heap ordered by their next run
+    time on a monotonic clock, aligned to bar closes. Strategies that come
+    due together run in one tick and share position and order reads through
+    ``BatchedClient``. ``stop`` interrupts the wait for the next run at once.
+
+    With a market feed, bar closes and quotes outside a strategy's VWAP bands
+    wake the engine and re-evaluate that strategy right away; its timer then
+    only fires if no event triggered a run for ``timer_interval`` seconds.
+    """
+
+    def __init__(self, configs: List[Dict[str, Any]], client=None,
+                 strategy_factory=VWAPStrategy, feed: Optional[MarketFeed] = None,
+                 min_event_interval: float = 1.0, position_reconcile_interval: float = 60.0,
+                 scheduler: Optional[Scheduler] = None, **strategy_kwargs):
+        """
+        Initialize the engine.
+
+        Args:
+            configs: Strategy configs as returned by ``parse_strategy_configs``
+            client: Shared ProjectX client; created from the environment if omitted
+            strategy_factory: Strategy class to instantiate per config
+            feed: Market feed whose events trigger re-evaluation
+            min_event_interval: Minimum seconds between event-triggered runs
+                of one strategy
+            position_reconcile_interval: Seconds between reconciles of the
+                shared position tracker with the broker's positions
+            scheduler: Timer heap for the strategies' runs (default: aligned
+                to 1-minute bar closes)
+            **strategy_kwargs: Extra arguments for every strategy (e.g. bar_store)
+        """
+        if not configs:
+            raise ValueError("At least one strategy config is required")
+
+        self.client = BatchedClient(instrument_client(client if client is not None else create_client()))
+        # One tracker for all strategies, so the API and every instrument
+        # read positions without a get_positions call
+        self.positions = PositionTracker(position_reconcile_interval)
+        self.strategies: Dict[str, VWAPStrategy] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        for config in configs:
+            name = config.get('name') or config['instrument']
+            params = {key: config[key] for key in STRATEGY_PARAMS if config.get(key) is not None}
+            self.strategies[name] = strategy_factory(client=self.client, position_tracker=self.positions,
+                                                      **params, **strategy_kwargs)
+            self._status[name] = {
+                "iterations": 0,
+                "last_run": None,
+                "last_duration": None,
+                "last_error": None,
+                "next_run": None,
+                "last_trigger": None,
+                "events": 0,
+                "time_to_first_decision": None,
+            }
+
+        # Flushed when the engine stops; closed by ``close``
+        self.journal = strategy_kwargs.get('journal')
+        self.feed = feed
+        self.min_event_interval = min_event_interval
+        self._instrument_names: Dict[str, List[str]] = {}
+        for name, strategy in self.strategies.items():
+            self._instrument_names.setdefault(strategy.instrument, []).append(name)
+
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        # Monotonic time of each strategy's last run, for event rate limiting
+        self._last_run: Dict[str, float] = {}
+        self._schedule_all()
+        # Event-triggered runs waiting for the engine thread: name -> (trigger, price)
+        self._pending: Dict[str, Any] = {}
+        self._pending_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+        # perf_counter time of the last start request, until each strategy's first decision
+        self._start_requested: Optional[float] = None
+        self._awaiting_decision: set = set()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def start(self, requested_at: Optional[float] = None):
+        """
+        Run the engine in a background thread.
+
+        Args:
+            requested_at: ``time.perf_counter()`` when the start was requested,
+                from which the time to each strategy's first decision is
+                measured (default: now)
+        """
+        with self._lock:
+            if self.is_running:
+                return
+            self._start_requested = time.perf_counter() if requested_at is None else requested_at
+            self._awaiting_decision = set(self.strategies)
+            if self._thread is not None:
+                # Let a stopping run finish its iteration before restarting
+                self._thread.join()
+            self._stop_event.clear()
+            self._schedule_all()
+            self._thread = threading.Thread(target=self.run_forever, daemon=True)
+            self._thread.start()
+            logger.info(f"Strategy engine started with {len(self.strategies)} strategies")
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """Call ``callback(name)`` on the engine thread after every strategy run."""
+        self._listeners.append(callback)
+
+    def stop(self):
+        """Stop the engine; takes effect between strategy iterations."""
+        self._stop_event.set()
+        self._wake.set()
+        logger.info("Strategy engine stop requested")
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Stop the engine for good, e.g. when the process exits.
+
+        Waits up to ``timeout`` seconds for the running iteration to finish,
+        then closes the journal so no batched records are lost.
+        """
+        self.stop()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        if self.journal is not None:
+            self.journal.close()
+
+    def run_forever(self):
+        """Run due and event-triggered strategies until stopped."""
+        if self.feed is not None:
+            self.feed.subscribe(self._instrument_names, self.on_event)
+            self.feed.start()
+        try:
+            while not self._stop_event.is_set():
+                # Clear first so events arriving during the runs are not lost
+                self._wake.clear()
+                self.run_due()
+                wake_at = self.run_pending()
+                next_due = self.scheduler.next_wakeup()
+                if next_due is not None:
+                    wake_at = min(wake_at, next_due)
+                if wake_at == float('inf'):
+                    break
+                self.scheduler.wait(self._wake, wake_at)
+        finally:
+            if self.feed is not None:
+                self.feed.unsubscribe(self.on_event)
+                self.feed.stop()
+            if self.journal is not None:
+                # Records of the last runs are on disk once the engine stops
+                self.journal.flush()
+
+    def _schedule_all(self):
+        """Make every strategy due immediately."""
+        now = self.scheduler.now()
+        for name in self.strategies:
+            self.scheduler.schedule(name, now)
+
+    def _reschedule(self, name: str, base: float):
+        """Schedule a strategy's next timer run one interval after ``base``."""
+        next_run = self.scheduler.next_due(base, self.strategies[name].timer_interval)
+        self.scheduler.schedule(name, next_run)
+        self._status[name]["next_run"] = self.scheduler.to_wall(next_run)
+
+    def on_event(self, event: MarketEvent):
+        """
+        Queue re-evaluation of the strategies an event may affect.
+
+        Called on the feed's thread. Bar closes queue every strategy of the
+        instrument; quotes only queue strategies whose bands they are outside.
+
+        Args:
+            event: Market event from the feed
+        """
+        queued = False
+        with self._pending_lock:
+            for name in self._instrument_names.get(event.instrument, ()):
+                self._status[name]["events"] += 1
+                if event.kind == 'quote':
+                    if event.price is None or not self.strategies[name].needs_evaluation(event.price):
+                        continue
+                    self._pending[name] = ('quote', event.price)
+                elif name not in self._pending:
+                    self._pending[name] = (event.kind, None)
+                queued = True
+        if queued:
+            self._wake.set()
+
+    def run_pending(self, now: Optional[float] = None) -> float:
+        """
+        Run strategies queued by market events, in one tick.
+
+        Strategies that ran less than ``min_event_interval`` ago stay queued.
+
+        Args:
+            now: Current monotonic time (default: the scheduler's clock)
+
+        Returns:
+            Time at which a still-queued strategy becomes runnable, or
+            infinity if none is queued
+        """
+        now = self.scheduler.now() if now is None else now
+        wake_at = float('inf')
+        runnable = []
+        with self._pending_lock:
+            for name, (trigger, price) in list(self._pending.items()):
+                last_run = self._last_run.get(name)
+                ready_at = now if last_run is None else last_run + self.min_event_interval
+                if ready_at > now:
+                    wake_at = min(wake_at, ready_at)
+                    continue
+                del self._pending[name]
+                runnable.append((name, trigger, price))
+        if not runnable:
+            return wake_at
+
+        self.client.begin_tick()
+        try:
+            for name, trigger, price in runnable:
+                if self._stop_event.is_set():
+                    break
+                self._run_one(name, trigger, now, price)
+                # The fallback timer restarts from the event-triggered run
+                self._reschedule(name, now)
+        finally:
+            self.client.end_tick()
+        return wake_at
+
+    def run_due(self, now: Optional[float] = None) -> List[str]:
+        """
+        Run every strategy whose next run time has passed, in one tick.
+
+        Args:
+            now: Current monotonic time (default: the scheduler's clock)
+
+        Returns:
+            Names of the strategies that ran
+        """
+        now = self.scheduler.now() if now is None else now
+        due = self.scheduler.pop_due(now)
+        if not due:
+            return []
+
+        self.client.begin_tick()
+        try:
+            for due_at, name in due:
+                if self._stop_event.is_set():
+                    self.scheduler.schedule(name, now)
+                    continue
+                self._run_one(name, 'timer', now)
+                # From the due time, not the run time, so lateness does not drift
+                self._reschedule(name, due_at)
+        finally:
+            self.client.end_tick()
+        return [name for _, name in due]
+
+    def _run_one(self, name: str, trigger: str, now: float, price: Optional[float] = None):
+        """Execute one strategy iteration started at monotonic ``now`` and record its status."""
+        strategy = self.strategies[name]
+        status = self._status[name]
+        started = time.perf_counter()
+        try:
+            strategy.execute_strategy(current_price=price)
+            status["last_error"] = None
+            if name in self._awaiting_decision:
+                self._first_decision(name)
+        except Exception as e:
+            logger.error(f"Error in strategy execution for {name}: {e}", exc_info=True)
+            status["last_error"] = str(e)
+        status["iterations"] += 1
+        self._last_run[name] = now
+        status["last_run"] = self.scheduler.to_wall(now)
+        status["last_duration"] = time.perf_counter() - started
+        status["last_trigger"] = trigger
+        for listener in self._listeners:
+            try:
+                listener(name)
+            except Exception as e:
+                logger.error(f"Error in engine listener after {name}: {e}")
+
+    def _first_decision(self, name: str):
+        """Report the time from the start request to a strategy's first decision."""
+        self._awaiting_decision.discard(name)
+        if self._start_requested is None:
+            return
+        elapsed = time.perf_counter() - self._start_requested
+        self._status[name]["time_to_first_decision"] = elapsed
+        TIME_TO_FIRST_DECISION_SECONDS.labels(self.strategies[name].instrument).observe(elapsed)
+        logger.info(f"{name} made its first decision {elapsed:.2f}s after the start request")
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-strategy configuration and run status."""
+        result = {}
+        for name, strategy in self.strategies.items():
+            result[name] = {
+                "instrument": strategy.instrument,
+                "vwap_deviation": strategy.vwap_deviation,
+                "band_mode": strategy.band_mode,
+                "anchor": strategy.anchor,
+                "timer_interval": strategy.timer_interval,
+                "contract_size": strategy.contract_size,
+                "vwap": strategy.vwap_accumulator.vwap,
+                "current_order_id": strategy.current_order_id,
+                "degraded": list(strategy.degraded),
+                **self._status[name],
+            }
+        return result
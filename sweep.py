@@ -0,0 +1,196 @@
+"""Parallel parameter sweep of the VWAP strategy over stored bars."""
+
+import argparse
+import csv
+import datetime
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from backtest import rolling_vwap, run_backtest, summarize
+from bar_store import BarStore
+
+logger = logging.getLogger(__name__)
+
+# Columns copied into shared memory, one row each
+SHARED_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Per-worker state set up by _init_worker
+_worker_bars: Dict[str, Dict[str, np.ndarray]] = {}
+_worker_segments: List[shared_memory.SharedMemory] = []
+_worker_vwap: Dict[Tuple[str, int], np.ndarray] = {}
+
+
+def share_bars(bars: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, int]:
+    """
+    Copy bar columns into one shared memory block.
+
+    Args:
+        bars: Column arrays as returned by ``BarStore.read``
+
+    Returns:
+        The shared memory block (the caller must unlink it) and the bar count
+    """
+    n_bars = len(bars['close'])
+    size = max(1, len(SHARED_COLUMNS) * n_bars * 8)
+    segment = shared_memory.SharedMemory(create=True, size=size)
+    block = np.ndarray((len(SHARED_COLUMNS), n_bars), dtype=np.float64, buffer=segment.buf)
+    for row, name in enumerate(SHARED_COLUMNS):
+        block[row] = bars[name]
+    return segment, n_bars
+
+
+def _init_worker(shared: Dict[str, Tuple[str, int]]):
+    """Attach to the shared bar blocks as read-only arrays."""
+    for instrument, (segment_name, n_bars) in shared.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _worker_segments.append(segment)
+        block = np.ndarray((len(SHARED_COLUMNS), n_bars), dtype=np.float64, buffer=segment.buf)
+        block.flags.writeable = False
+        _worker_bars[instrument] = {name: block[row] for row, name in enumerate(SHARED_COLUMNS)}
+
+
+def _run_task(task: Tuple[str, float, int, int, int]) -> Dict:
+    """Backtest one parameter combination in a worker."""
+    instrument, deviation, interval, lookback, contract_size = task
+    bars = _worker_bars[instrument]
+    key = (instrument, lookback)
+    if key not in _worker_vwap:
+        # Tasks arrive grouped by lookback, so keep only the latest window
+        _worker_vwap.clear()
+        _worker_vwap[key] = rolling_vwap(bars['high'], bars['low'], bars['close'],
+                                         bars['volume'], lookback)
+    trades = run_backtest(bars, deviation, interval, lookback, contract_size,
+                          vwap=_worker_vwap[key])
+    result = {
+        "instrument": instrument,
+        "deviation": deviation,
+        "interval": interval,
+        "lookback": lookback,
+    }
+    result.update(summarize(trades))
+    return result
+
+
+def run_sweep(bars_by_instrument: Dict[str, Dict[str, np.ndarray]], deviations: List[float],
+              intervals: List[int], lookbacks: List[int], contract_size: int = 1,
+              workers: Optional[int] = None, rank_by: str = 'total_pnl') -> List[Dict]:
+    """
+    Backtest every parameter combination across a process pool.
+
+    Bars are copied once into shared memory and every worker maps the same
+    read-only block, so nothing is pickled per task.
+
+    Args:
+        bars_by_instrument: Bar column arrays per instrument
+        deviations: VWAP deviations to try
+        intervals: Timer intervals in seconds to try
+        lookbacks: VWAP windows in bars to try
+        contract_size: Contracts per trade
+        workers: Worker processes (default: CPU count)
+        rank_by: Summary field to rank results by, highest first (lowest
+            first for max_drawdown)
+
+    Returns:
+        One summary dict per combination, best first
+    """
+    tasks = [
+        (instrument, deviation, interval, lookback, contract_size)
+        for instrument, lookback, deviation, interval in itertools.product(
+            bars_by_instrument, lookbacks, deviations, intervals)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    segments = []
+    try:
+        shared = {}
+        for instrument, bars in bars_by_instrument.items():
+            segment, n_bars = share_bars(bars)
+            segments.append(segment)
+            shared[instrument] = (segment.name, n_bars)
+
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared,)) as executor:
+            results = list(executor.map(_run_task, tasks, chunksize=chunksize))
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    results.sort(key=lambda result: result[rank_by], reverse=rank_by != 'max_drawdown')
+    return results
+
+
+def format_table(results: List[Dict]) -> str:
+    """Render sweep results as a ranked text table."""
+    header = (f"{'rank':>4}  {'instrument':<10} {'deviation':>9} {'interval':>8} {'lookback':>8} "
+              f"{'trades':>7} {'total_pnl':>11} {'win_rate':>8} {'avg_pnl':>9} {'max_dd':>10}")
+    lines = [header, '-' * len(header)]
+    for rank, result in enumerate(results, start=1):
+        lines.append(
+            f"{rank:>4}  {result['instrument']:<10} {result['deviation']:>9.2f} "
+            f"{result['interval']:>8d} {result['lookback']:>8d} {result['trades']:>7d} "
+            f"{result['total_pnl']:>11.2f} {result['win_rate']:>8.1%} "
+            f"{result['avg_pnl']:>9.3f} {result['max_drawdown']:>10.2f}"
+        )
+    return '\n'.join(lines)
+
+
+def _parse_list(cast):
+    return lambda value: [cast(item) for item in value.split(',') if item]
+
+
+def main():
+    """Run a parameter sweep over bars from the local bar store."""
+    parser = argparse.ArgumentParser(description="Sweep VWAP strategy parameters on stored bars")
+    parser.add_argument('--store', default=config.BAR_STORE_DIR, help="Bar store directory")
+    parser.add_argument('--instruments', type=_parse_list(str), default=[config.INSTRUMENT])
+    parser.add_argument('--start', type=datetime.datetime.fromisoformat, required=True)
+    parser.add_argument('--end', type=datetime.datetime.fromisoformat, required=True)
+    parser.add_argument('--deviations', type=_parse_list(float), default=[2.0, 3.0])
+    parser.add_argument('--intervals', type=_parse_list(int), default=[config.TIMER_INTERVAL])
+    parser.add_argument('--lookbacks', type=_parse_list(int), default=[240])
+    parser.add_argument('--contract-size', type=int, default=config.CONTRACT_SIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank-by', default='total_pnl',
+                        choices=['total_pnl', 'avg_pnl', 'win_rate', 'trades', 'max_drawdown'])
+    parser.add_argument('--top', type=int, default=None, help="Only print the best N rows")
+    parser.add_argument('--csv', default=None, help="Also write all results to this CSV file")
+    args = parser.parse_args()
+
+    if not args.store:
+        parser.error("--store or BAR_STORE_DIR is required")
+
+    store = BarStore(args.store)
+    bars_by_instrument = {}
+    for instrument in args.instruments:
+        bars = store.read(instrument, args.start, args.end)
+        if len(bars['close']) == 0:
+            logger.warning(f"No stored bars for {instrument}, skipping")
+            continue
+        bars_by_instrument[instrument] = bars
+
+    results = run_sweep(bars_by_instrument, args.deviations, args.intervals, args.lookbacks,
+                        args.contract_size, args.workers, args.rank_by)
+    print(format_table(results[:args.top] if args.top else results))
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]) if results else [])
+            writer.writeheader()
+            writer.writerows(results)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    main()
@@ -0,0 +1,65 @@
+"""Tests for the asyncio execution path against the simulated exchange."""
+
+import asyncio
+import datetime
+import threading
+
+from async_strategy import AsyncVWAPStrategy
+from journal import JournalWriter, decisions, decode, orders, read_journals
+from simulator import SimulatedExchange
+from vwap_strategy import VWAPStrategy
+
+
+def make_exchange(now, **kwargs):
+    """Exchange frozen at ``now`` whose bars all fall inside the strategy's lookback window."""
+    return SimulatedExchange(seed=5, clock=lambda: now, history=datetime.timedelta(minutes=90), **kwargs)
+
+
+def test_async_iterations_match_sync(tmp_path):
+    """Both execution paths make the same decisions, publish snapshots and journal."""
+    now = datetime.datetime.utcnow().replace(second=30, microsecond=0)
+    sync_journal = JournalWriter(str(tmp_path / 'sync'))
+    async_journal = JournalWriter(str(tmp_path / 'async'))
+    sync = VWAPStrategy(vwap_deviation=0.5, client=make_exchange(now), journal=sync_journal)
+    concurrent = AsyncVWAPStrategy(vwap_deviation=0.5, client=make_exchange(now),
+                                   journal=async_journal, iteration_budget=5.0)
+
+    for _ in range(3):
+        sync.execute_strategy()
+        asyncio.run(concurrent.execute_strategy_async())
+        assert concurrent.snapshot is not None
+        assert concurrent.snapshot.decision == sync.snapshot.decision
+        assert concurrent.snapshot.vwap == sync.snapshot.vwap
+        assert concurrent.get_position() == sync.get_position()
+    assert concurrent.iteration == sync.iteration == 3 and concurrent.degraded == []
+    sync_journal.close()
+    async_journal.close()
+
+    sync_records = read_journals(str(tmp_path / 'sync'))
+    async_records = read_journals(str(tmp_path / 'async'))
+    for select, field in ((decisions, 'decision'), (orders, 'action')):
+        assert list(decode(select(async_records), field)) == list(decode(select(sync_records), field))
+    assert len(orders(async_records)) > 0
+
+
+def test_replacement_cancels_are_sent_in_parallel():
+    """The working orders are cancelled concurrently, then the new order is placed."""
+    # Each cancel waits for the other inside the exchange, so cancels sent
+    # one after another break the barrier
+    both_cancelling = threading.Barrier(2)
+    exchange = make_exchange(datetime.datetime.utcnow().replace(second=30, microsecond=0),
+                             latencies={'cancel_order': 1.0},
+                             sleep=lambda seconds: both_cancelling.wait(timeout=5.0))
+    strategy = AsyncVWAPStrategy(client=exchange, iteration_budget=10.0)
+    price = exchange.get_market_data('MGC')['last_price']
+    for offset in (100.0, 101.0):
+        exchange.place_order(instrument='MGC', order_type='LIMIT', side='BUY', quantity=1,
+                             price=price - offset)
+    strategy.order_book.reconcile('MGC', exchange.get_orders(status='OPEN'))
+    strategy.position_tracker.reconcile([])
+
+    assert asyncio.run(strategy._call(strategy.place_limit_order, 'SELL', price + 100.0))
+    assert exchange.calls['cancel_order'] == 2
+    assert [(order['side'], order['price']) for order in exchange.get_orders(status='OPEN')] == [
+        ('SELL', price + 100.0)]
+    assert [order.side for order in strategy.order_book.for_instrument('MGC')] == ['SELL']
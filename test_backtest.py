@@ -0,0 +1,77 @@
+"""Tests for the vectorized backtest engine (doesn't require API client)."""
+
+import numpy as np
+
+from backtest import replay_backtest, rolling_vwap, run_backtest, summarize
+from simulator import random_walk_bars
+
+
+def assert_same_trades(vectorized, replayed):
+    assert len(vectorized) == len(replayed)
+    for a, b in zip(vectorized, replayed):
+        assert (a.side, a.order_index, a.entry_index, a.exit_index, a.reason) == \
+            (b.side, b.order_index, b.entry_index, b.exit_index, b.reason)
+        assert np.isclose(a.entry_price, b.entry_price)
+        assert np.isclose(a.exit_price, b.exit_price)
+
+
+def test_rolling_vwap_matches_window_sum():
+    """Rolling VWAP equals the direct VWAP of each trailing window."""
+    bars = random_walk_bars(500)
+    vwap = rolling_vwap(bars['high'], bars['low'], bars['close'], bars['volume'], 60)
+    typical_price = (bars['high'] + bars['low'] + bars['close']) / 3.0
+    for i in (0, 59, 60, 250, 499):
+        window = slice(max(0, i - 59), i + 1)
+        expected = (typical_price[window] * bars['volume'][window]).sum() / bars['volume'][window].sum()
+        assert np.isclose(vwap[i], expected, rtol=0, atol=1e-9)
+
+
+def test_matches_bar_by_bar_replay():
+    """The vectorized engine produces the same trades as the replay."""
+    params = [
+        dict(vwap_deviation=2.0, timer_interval=1800, lookback=240),
+        dict(vwap_deviation=1.0, timer_interval=60, lookback=30),
+        dict(vwap_deviation=0.5, timer_interval=120, lookback=60, take_profit=0.3, stop_loss=5.0),
+    ]
+    for seed in range(3):
+        bars = random_walk_bars(5000, seed)
+        for kwargs in params:
+            trades = run_backtest(bars, **kwargs)
+            assert trades
+            assert_same_trades(trades, replay_backtest(bars, **kwargs))
+
+
+def test_long_entry_and_target():
+    """A close below the lower band buys at the band and exits at the target."""
+    n = 8
+    close = np.array([100.0, 100.0, 100.0, 97.0, 98.5, 99.0, 99.0, 99.0])
+    bars = {
+        'open': close.copy(),
+        'high': close + 0.25,
+        'low': close - 0.25,
+        'close': close,
+        'volume': np.full(n, 10.0),
+    }
+    trades = run_backtest(bars, vwap_deviation=1.0, timer_interval=60, lookback=4,
+                          take_profit=1.0, stop_loss=5.0)
+
+    assert len(trades) == 1
+    trade = trades[0]
+    # VWAP of bars 0-3 is 99.25, so the BUY limit sits at 98.25
+    assert (trade.side, trade.order_index, trade.entry_index) == ('BUY', 3, 4)
+    assert np.isclose(trade.entry_price, 98.25)
+    assert (trade.exit_index, trade.reason) == (5, 'target')
+    assert np.isclose(trade.exit_price, 99.25)
+    assert np.isclose(trade.pnl, 1.0)
+    assert_same_trades(trades, replay_backtest(bars, vwap_deviation=1.0, timer_interval=60,
+                                               lookback=4, take_profit=1.0, stop_loss=5.0))
+
+
+def test_summarize():
+    """Summary statistics over trade P&L."""
+    trades = run_backtest(random_walk_bars(3000), vwap_deviation=1.0, timer_interval=60, lookback=30)
+    summary = summarize(trades)
+    assert summary['trades'] == len(trades)
+    assert np.isclose(summary['total_pnl'], sum(trade.pnl for trade in trades))
+    assert summary['max_drawdown'] >= 0
+    assert summarize([])['trades'] == 0
@@ -0,0 +1,95 @@
+"""Tests for the delta-fetch bar cache (doesn't require API client)."""
+
+import datetime
+
+import pandas as pd
+
+from bar_cache import BarCache
+
+
+def make_bars(start, n, close=2000.0):
+    """Flat 1-minute OHLCV bars starting at a naive UTC time."""
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=n, freq='1min'),
+        'open': [close] * n,
+        'high': [close + 1] * n,
+        'low': [close - 1] * n,
+        'close': [close] * n,
+        'volume': [100.0] * n,
+    })
+
+
+def test_fetch_start_after_full_fetch():
+    """Once the window is covered, fetches resume from the last cached bar."""
+    window_start = datetime.datetime(2024, 1, 2, 10, 0)
+    cache = BarCache()
+    assert cache.fetch_start(window_start) == window_start
+
+    cache.merge(make_bars(window_start, 240), window_start)
+    assert len(cache) == 240
+    assert cache.fetch_start(window_start) == datetime.datetime(2024, 1, 2, 13, 59)
+
+    # A longer window than was fetched needs a full fetch again
+    earlier = window_start - datetime.timedelta(minutes=30)
+    assert cache.fetch_start(earlier) == earlier
+
+
+def test_merge_revises_forming_bar():
+    """Refetching the last bar overwrites it instead of duplicating it."""
+    start = datetime.datetime(2024, 1, 2, 10, 0)
+    cache = BarCache()
+    cache.merge(make_bars(start, 3), start)
+
+    delta = make_bars(start + datetime.timedelta(minutes=2), 2, close=2005.0)
+    changed = cache.merge(delta, start + datetime.timedelta(minutes=2))
+
+    frame = cache.to_frame()
+    assert changed == 2
+    assert len(frame) == 4
+    assert list(frame['close']) == [2000.0, 2000.0, 2005.0, 2005.0]
+    assert frame['timestamp'].is_monotonic_increasing
+
+
+def test_unchanged_merge_keeps_frame():
+    """Merging identical bars reports no change and reuses the frame."""
+    start = datetime.datetime(2024, 1, 2, 10, 0)
+    cache = BarCache()
+    cache.merge(make_bars(start, 5), start)
+    frame = cache.to_frame()
+
+    assert cache.merge(make_bars(start, 5), start) == 0
+    assert cache.to_frame() is frame
+
+
+def test_evict_before_window():
+    """Bars that fall outside the window are evicted."""
+    start = datetime.datetime(2024, 1, 2, 10, 0)
+    cache = BarCache()
+    cache.merge(make_bars(start, 10), start)
+
+    assert cache.evict_before(start + datetime.timedelta(minutes=4)) == 4
+    assert cache.first_timestamp == pd.Timestamp(start + datetime.timedelta(minutes=4))
+    assert len(cache.to_frame()) == 6
+
+
+def test_capacity_and_out_of_order_bars():
+    """Late bars are sorted into place and capacity drops the oldest."""
+    start = datetime.datetime(2024, 1, 2, 10, 0)
+    cache = BarCache(capacity=5)
+    bars = make_bars(start, 6)
+    cache.merge(bars.iloc[[0, 1, 3, 4, 5]], start)
+    cache.merge(bars.iloc[[2]], start)
+
+    frame = cache.to_frame()
+    assert len(frame) == 5
+    assert list(frame['timestamp']) == list(bars['timestamp'].iloc[1:])
+
+
+def test_timezone_aware_timestamps():
+    """Timezone-aware bars are stored as naive UTC."""
+    start = datetime.datetime(2024, 1, 2, 10, 0)
+    bars = make_bars(start, 3)
+    bars['timestamp'] = bars['timestamp'].dt.tz_localize('UTC').dt.tz_convert('America/Chicago')
+    cache = BarCache()
+    cache.merge(bars, start)
+    assert cache.first_timestamp == pd.Timestamp(start)
@@ -0,0 +1,138 @@
+"""Tests for the memory-mapped bar store (doesn't require API client)."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore
+from simulator import SimulatedExchange
+from vwap_strategy import VWAPStrategy
+
+
+def make_bars(start, n):
+    """1-minute OHLCV bars with distinct closes."""
+    close = 2000.0 + np.arange(n, dtype=float)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=n, freq='1min'),
+        'open': close,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': np.full(n, 10.0),
+    })
+
+
+class OutageClient:
+    """Simulator proxy that records bar requests and returns no bars while down."""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.requests = []
+        self.down = True
+
+    def __getattr__(self, name):
+        return getattr(self.exchange, name)
+
+    def get_historical_data(self, instrument=None, start=None, end=None, interval='1m'):
+        self.requests.append((datetime.datetime.fromisoformat(start), datetime.datetime.fromisoformat(end)))
+        if self.down:
+            return []
+        return self.exchange.get_historical_data(instrument=instrument, start=start,
+                                                 end=end, interval=interval)
+
+
+def test_append_and_read_single_day(tmp_path):
+    """Bars read back within one day are views into the memory map."""
+    store = BarStore(str(tmp_path))
+    bars = make_bars('2024-01-02 10:00', 120)
+    assert store.append('MGC', bars) == 120
+
+    start = datetime.datetime(2024, 1, 2, 10, 30)
+    end = datetime.datetime(2024, 1, 2, 11, 0)
+    result = store.read('MGC', start, end)
+
+    assert len(result['close']) == 30
+    assert result['close'][0] == 2030.0
+    assert isinstance(result['close'], np.memmap)
+    assert not result['close'].flags.writeable
+
+
+def test_append_is_idempotent(tmp_path):
+    """Re-appending stored bars writes nothing new."""
+    store = BarStore(str(tmp_path))
+    bars = make_bars('2024-01-02 10:00', 10)
+    store.append('MGC', bars)
+    assert store.append('MGC', bars) == 0
+    assert store.append('MGC', make_bars('2024-01-02 10:05', 10)) == 5
+    assert store.last_timestamp('MGC') == pd.Timestamp('2024-01-02 10:14')
+
+
+def test_read_across_days(tmp_path):
+    """Ranges spanning day partitions are returned in order."""
+    store = BarStore(str(tmp_path))
+    bars = make_bars('2024-01-02 23:00', 180)
+    store.append('MGC', bars)
+
+    days = [day for day, _ in store.read_days('MGC', datetime.datetime(2024, 1, 2),
+                                              datetime.datetime(2024, 1, 4))]
+    assert days == [datetime.date(2024, 1, 2), datetime.date(2024, 1, 3)]
+
+    frame = store.read_frame('MGC', datetime.datetime(2024, 1, 2, 23, 30),
+                             datetime.datetime(2024, 1, 3, 0, 30))
+    assert len(frame) == 60
+    assert frame['timestamp'].is_monotonic_increasing
+    assert list(frame['close']) == list(bars['close'].iloc[30:90])
+
+
+def test_missing_ranges(tmp_path):
+    """Coverage tracks fetched ranges, including ones without bars."""
+    store = BarStore(str(tmp_path))
+    start = datetime.datetime(2024, 1, 2, 10, 0)
+    end = datetime.datetime(2024, 1, 2, 14, 0)
+    assert store.missing_ranges('MGC', start, end) == [(start, end)]
+
+    store.mark_covered('MGC', start, datetime.datetime(2024, 1, 2, 11, 0))
+    store.mark_covered('MGC', datetime.datetime(2024, 1, 2, 12, 0), datetime.datetime(2024, 1, 2, 13, 0))
+    assert store.missing_ranges('MGC', start, end) == [
+        (datetime.datetime(2024, 1, 2, 11, 0), datetime.datetime(2024, 1, 2, 12, 0)),
+        (datetime.datetime(2024, 1, 2, 13, 0), end),
+    ]
+
+    # Coverage survives reopening the store
+    store.mark_covered('MGC', start, end)
+    assert BarStore(str(tmp_path)).missing_ranges('MGC', start, end) == []
+
+
+def test_interrupted_append_is_repaired(tmp_path):
+    """Columns left at unequal lengths are trimmed before the next append."""
+    store = BarStore(str(tmp_path))
+    store.append('MGC', make_bars('2024-01-02 10:00', 5))
+    with open(tmp_path / 'MGC' / '2024-01-02' / 'close.bin', 'ab') as f:
+        f.write(np.float64(1.0).tobytes())
+
+    store.append('MGC', make_bars('2024-01-02 10:05', 5))
+    frame = BarStore(str(tmp_path)).read_frame('MGC', datetime.datetime(2024, 1, 2),
+                                               datetime.datetime(2024, 1, 3))
+    assert len(frame) == 10
+    assert list(frame['close']) == [2000.0 + i for i in range(5)] * 2
+
+
+def test_only_the_span_of_fetched_bars_is_covered(tmp_path):
+    """Ranges that returned no bars are asked for again on the next fetch."""
+    client = OutageClient(SimulatedExchange(seed=5, history=datetime.timedelta(minutes=90)))
+    store = BarStore(str(tmp_path))
+    strategy = VWAPStrategy(client=client, instrument='MGC', bar_store=store)
+
+    strategy.fetch_market_data()
+    window_start, closed_end = client.requests[0]
+    assert store.missing_ranges('MGC', window_start, closed_end) == [(window_start, closed_end)]
+
+    client.down = False
+    requests = len(client.requests)
+    data = strategy.fetch_market_data()
+    window_start, closed_end = client.requests[requests]
+    # Bars only exist for the simulator's last 90 minutes of the window
+    first_bar = data['timestamp'][0].astype('datetime64[us]').item()
+    assert first_bar > window_start
+    assert store.missing_ranges('MGC', window_start, closed_end) == [(window_start, first_bar)]
@@ -0,0 +1,63 @@
+"""Tests for bar normalization into column arrays (doesn't require API client)."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from bars import BarNormalizer, frame_to_bars, resolve_schema
+
+
+def records(n=3, start=datetime.datetime(2024, 1, 2, 10, 0), timestamp=lambda t: t.isoformat()):
+    return [{'timestamp': timestamp(start + datetime.timedelta(minutes=i)),
+             'open': 100.0 + i, 'high': 101.0 + i, 'low': 99.0 + i, 'close': 100.5 + i, 'volume': 10 * (i + 1)}
+            for i in range(n)]
+
+
+def test_normalize_matches_pandas():
+    """Records become the same columns pandas would produce."""
+    data = records(5)
+    bars = BarNormalizer().normalize(data)
+
+    frame = pd.DataFrame(data)
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'])
+    expected = frame_to_bars(frame)
+    assert set(bars) == set(expected)
+    for name, column in expected.items():
+        assert bars[name].dtype == column.dtype
+        assert np.array_equal(bars[name], column)
+
+
+def test_timestamp_formats_parse_to_naive_utc():
+    """ISO with Z or an offset, epoch seconds and milliseconds all land on UTC."""
+    utc = datetime.datetime(2024, 1, 2, 16, 0)
+    expected = np.array(['2024-01-02T16:00', '2024-01-02T16:01'], dtype='datetime64[ns]')
+    formats = [
+        lambda t: t.isoformat() + 'Z',
+        lambda t: (t - datetime.timedelta(hours=6)).isoformat() + '-06:00',
+        lambda t: t.replace(tzinfo=datetime.timezone.utc).timestamp(),
+        lambda t: int(t.replace(tzinfo=datetime.timezone.utc).timestamp() * 1000),
+        lambda t: t.replace(tzinfo=datetime.timezone.utc),
+    ]
+    for timestamp in formats:
+        bars = BarNormalizer().normalize(records(2, utc, timestamp))
+        assert np.array_equal(bars['timestamp'], expected), timestamp(utc)
+
+
+def test_schema_is_resolved_once_and_again_on_change():
+    """The schema is reused across responses and re-resolved when they change shape."""
+    normalizer = BarNormalizer()
+    normalizer.normalize(records(2))
+    schema = normalizer.schema
+    normalizer.normalize(records(3))
+    assert normalizer.schema is schema
+
+    short = [{'t': '2024-01-02T10:00:00Z', 'o': 1, 'h': 2, 'l': 0.5, 'c': 1.5, 'v': 7}]
+    bars = normalizer.normalize(short)
+    assert normalizer.schema.keys['close'] == 'c' and normalizer.schema.timestamp_format == 'iso_z'
+    assert bars['close'].tolist() == [1.5]
+
+    assert resolve_schema({'open': 1, 'high': 1, 'low': 1, 'close': 1}) is None
+    assert BarNormalizer().normalize([{'open': 1, 'close': 1}])['close'].size == 0
+    untimed = BarNormalizer().normalize([{'open': 1, 'high': 1, 'low': 1, 'close': 1, 'volume': 1}])
+    assert 'timestamp' not in untimed and untimed['volume'].tolist() == [1.0]
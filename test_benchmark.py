@@ -0,0 +1,34 @@
+"""Tests for the benchmark harness (doesn't require API client)."""
+
+from benchmark import compare, load_baseline, missing_from_baseline, run_benchmarks, save_baseline
+
+
+def test_compare_flags_regressions():
+    """Only runs slower than the baseline by more than the threshold fail."""
+    baseline = {'a': {'median': 1.0}, 'b': {'median': 1.0}, 'c': {'median': 1.0}}
+    results = {'a': {'median': 1.2}, 'b': {'median': 1.3}, 'c': {'median': 0.5}, 'new': {'median': 9.0}}
+
+    regressions = compare(results, baseline, threshold=0.25)
+
+    assert len(regressions) == 1 and regressions[0].startswith('b:')
+    assert missing_from_baseline(results, baseline) == ['new']
+    assert missing_from_baseline(results, {}) == list(results)
+
+
+def test_baseline_round_trip(tmp_path):
+    """Saved timings are merged into the existing baseline."""
+    path = str(tmp_path / 'baseline.json')
+    assert load_baseline(path) == {}
+
+    save_baseline(path, {'a': {'median': 1.0}})
+    save_baseline(path, {'b': {'median': 2.0}})
+
+    assert load_baseline(path) == {'a': {'median': 1.0}, 'b': {'median': 2.0}}
+
+
+def test_run_selected_benchmarks():
+    """Benchmarks can be filtered by name and report per-call timings."""
+    results = run_benchmarks(['calculate_vwap[240]', 'execute_strategy'], repeat=2, min_time=0.001)
+
+    assert set(results) == {'calculate_vwap[240]', 'execute_strategy[no signal]'}
+    assert all(result['median'] > 0 and result['ops_per_sec'] > 0 for result in results.values())
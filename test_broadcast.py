@@ -0,0 +1,56 @@
+"""Tests for the state change fan-out of the push stream."""
+
+import asyncio
+
+from broadcast import SNAPSHOT, UPDATE, Broadcaster, diff_state, merge_changes
+
+
+def state(price, quantity=0, orders=()):
+    return {'is_running': True, 'strategies': {'MGC': {
+        'vwap': {'vwap': 100.0, 'current_price': price},
+        'position': {'quantity': quantity, 'side': 'LONG' if quantity else None},
+        'orders': list(orders),
+    }}}
+
+
+def test_diff_and_merge_only_carry_changed_fields():
+    """Diffs hold changed leaves; merging them onto the old state gives the new one."""
+    old, new = state(101.0), state(102.0, quantity=1)
+    changes = diff_state(old, new)
+    assert changes == {'strategies': {'MGC': {'vwap': {'current_price': 102.0},
+                                              'position': {'quantity': 1, 'side': 'LONG'}}}}
+    assert merge_changes(old, changes) == new
+    assert old == state(101.0)
+
+    assert diff_state(new, new) == {}
+    assert diff_state({'a': 1, 'b': 2}, {'a': 1}) == {'b': None}
+
+
+def test_slow_subscriber_gets_merged_updates():
+    """A full queue merges updates, so a slow client converges without unbounded memory."""
+    async def scenario():
+        broadcaster = Broadcaster(queue_size=2)
+        broadcaster.publish(state(100.0))
+        fast, slow = broadcaster.subscribe(), broadcaster.subscribe()
+
+        kind, data = await fast.get()
+        assert kind == SNAPSHOT and data == state(100.0)
+        for price in (101.0, 102.0, 103.0, 104.0):
+            broadcaster.publish(state(price))
+            kind, data = await fast.get()
+            assert kind == UPDATE and data == {'strategies': {'MGC': {'vwap': {'current_price': price}}}}
+        broadcaster.publish(state(104.0))
+        assert await fast.get(timeout=0.01) is None
+
+        # The slow client holds at most two messages: the snapshot and all merged updates
+        assert len(slow) == 2 and slow.merged == 3
+        kind, data = await slow.get()
+        assert kind == SNAPSHOT and data == state(100.0)
+        kind, data = await slow.get()
+        assert kind == UPDATE and merge_changes(state(100.0), data) == state(104.0)
+
+        broadcaster.unsubscribe(slow)
+        broadcaster.publish(state(105.0, orders=[{'order_id': '1'}]))
+        assert len(slow) == 0 and len(broadcaster) == 1
+
+    asyncio.run(scenario())
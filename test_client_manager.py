@@ -0,0 +1,57 @@
+"""Tests for the process-wide authenticated client (uses stub clients)."""
+
+from client_manager import ClientManager
+
+
+class StubClient:
+    """Stub client that counts its authentications."""
+
+    def __init__(self, number, can_authenticate=True):
+        self.number = number
+        self.authentications = 1
+        if not can_authenticate:
+            self.authenticate = None
+
+    def authenticate(self):
+        self.authentications += 1
+
+    def get_positions(self):
+        return [{'client': self.number}]
+
+
+def test_client_is_authenticated_once_and_shared():
+    """Every get returns the same client until the manager is closed."""
+    created = []
+
+    def factory():
+        created.append(StubClient(len(created) + 1))
+        return created[-1]
+
+    manager = ClientManager(factory, keepalive_interval=0)
+    assert not manager.connected and created == []
+    client = manager.get()
+    assert manager.get() is client and len(created) == 1
+
+    manager.refresh()
+    assert created[0].authentications == 2 and len(created) == 1
+    assert client.get_positions() == [{'client': 1}]
+
+    manager.close()
+    assert manager.get() is not client and len(created) == 2
+    manager.close()
+
+
+def test_refresh_replaces_a_client_that_cannot_reauthenticate():
+    """Without authenticate, a refresh swaps in a new client behind the shared one."""
+    created = []
+
+    def factory():
+        created.append(StubClient(len(created) + 1, can_authenticate=False))
+        return created[-1]
+
+    manager = ClientManager(factory, cache_ttl=0, keepalive_interval=0)
+    client = manager.get()
+    assert client.get_positions() == [{'client': 1}]
+    manager.refresh()
+    assert manager.get() is client and client.get_positions() == [{'client': 2}]
+    manager.close()
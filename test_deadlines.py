@@ -0,0 +1,153 @@
+"""Tests for deadline-bounded client calls and degraded strategy iterations."""
+
+import threading
+import time
+
+import pytest
+
+from deadlines import CircuitBreaker, CircuitOpen, DeadlineClient, DeadlineExceeded, deadline
+from shared_client import TokenBucket, share_client
+from simulator import SimulatedExchange
+from vwap_strategy import VWAPStrategy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class HangingClient:
+    """The first ``hangs`` quote requests block until released; later ones answer at once."""
+
+    def __init__(self, hangs=1):
+        self.hangs = hangs
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def get_market_data(self, instrument):
+        with self._lock:
+            self.calls += 1
+            hang = self.calls <= self.hangs
+        if hang:
+            self.release.wait(5)
+        return {'last_price': 100.0 + self.calls}
+
+    def get_positions(self):
+        raise ConnectionError("gateway down")
+
+
+def test_slow_read_is_hedged_and_hung_read_gives_up():
+    """A hedge answers for a hung read; with every attempt hung the caller's deadline wins."""
+    stub = HangingClient(hangs=1)
+    client = DeadlineClient(stub, read_timeout=2.0, hedge_after=0.05)
+    started = time.perf_counter()
+    assert client.get_market_data('MGC') == {'last_price': 102.0}
+    assert time.perf_counter() - started < 1.0
+
+    stub.calls, stub.hangs = 0, 2
+    started = time.perf_counter()
+    with deadline(0.2):
+        with pytest.raises(DeadlineExceeded):
+            client.get_market_data('MGC')
+    assert time.perf_counter() - started < 1.0 and stub.calls == 2
+    stub.release.set()
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Repeated failures open the breaker; after the reset timeout one trial call decides."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    clock.now += 30.0
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 30.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+
+    stub = HangingClient()
+    client = DeadlineClient(stub, failure_threshold=2, clock=clock)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            client.get_positions()
+    with pytest.raises(CircuitOpen):
+        client.get_positions()
+
+
+class FlakyExchange(SimulatedExchange):
+    """Simulated exchange whose reads can be switched to fail."""
+
+    failing = False
+
+    def get_historical_data(self, **params):
+        if self.failing:
+            raise DeadlineExceeded("get_historical_data did not finish")
+        return super().get_historical_data(**params)
+
+    def get_market_data(self, instrument):
+        if self.failing:
+            raise CircuitOpen("get_market_data is failing")
+        return super().get_market_data(instrument)
+
+    def get_positions(self):
+        if self.failing:
+            raise ConnectionError("gateway down")
+        return super().get_positions()
+
+
+def test_iteration_degrades_to_cached_state():
+    """Failed reads fall back to cached bars, the last close and the tracked position."""
+    exchange = FlakyExchange(seed=3)
+    strategy = VWAPStrategy(client=exchange, instrument='MGC', vwap_deviation=1e9, iteration_budget=5.0)
+    strategy.execute_strategy()
+    assert strategy.degraded == [] and strategy.snapshot.decision == 'none'
+    vwap = strategy.snapshot.vwap
+
+    exchange.failing = True
+    strategy.position_tracker.mark_stale()
+    strategy.execute_strategy()
+    assert strategy.degraded == ['position', 'bars', 'price']
+    assert strategy.snapshot.decision == 'none' and strategy.snapshot.vwap == vwap
+    assert strategy.snapshot.current_price == float(strategy.bar_cache.to_bars()['close'][-1])
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get_orders(self, status=None):
+        self.calls += 1
+        return []
+
+
+def test_rate_budget_wait_is_bounded_by_deadline():
+    """A call short of rate budget gives up at the caller's deadline, or at once if it is spent."""
+    stub = CountingClient()
+    client = share_client(stub, cache_ttl=0, rate_limit='1/60')
+    client.get_orders(status='OPEN')
+
+    started = time.perf_counter()
+    with deadline(0.2):
+        with pytest.raises(DeadlineExceeded):
+            client.get_orders(status='OPEN')
+    assert 0.15 < time.perf_counter() - started < 1.0
+
+    client.limits['default'] = TokenBucket(10, 1.0)
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            client.get_orders(status='OPEN')
+    assert stub.calls == 1
+    # Without a deadline only max_wait applies
+    client.get_orders(status='OPEN')
+    assert stub.calls == 2
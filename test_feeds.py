@@ -0,0 +1,149 @@
+"""Tests for market feeds and event-driven execution (uses a stub client)."""
+
+import datetime
+import time
+
+import pandas as pd
+
+from feeds import MarketEvent, PollingQuoteFeed, ReplayFeed
+from strategy_engine import StrategyEngine, parse_strategy_configs
+
+
+class StubClient:
+    """Serves flat bars around 100 and a settable quote; counts calls."""
+
+    def __init__(self, price=100.0):
+        self.price = price
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def get_historical_data(self, instrument, start, end, interval):
+        self._count('get_historical_data')
+        timestamps = pd.date_range(pd.Timestamp(start).ceil('1min'), pd.Timestamp(end).floor('1min'), freq='1min')
+        return [{'timestamp': t.isoformat(), 'open': 100.0, 'high': 101.0, 'low': 99.0,
+                 'close': 100.0, 'volume': 10.0} for t in timestamps]
+
+    def get_market_data(self, instrument):
+        self._count('get_market_data')
+        return {'last_price': self.price}
+
+    def get_positions(self):
+        self._count('get_positions')
+        return []
+
+    def get_orders(self, status=None):
+        self._count('get_orders')
+        return []
+
+    def cancel_order(self, order_id):
+        self._count('cancel_order')
+
+    def place_order(self, **params):
+        self._count('place_order')
+        return {'id': f"order-{self.calls['place_order']}"}
+
+
+DEFAULTS = {'vwap_deviation': 2.0, 'timer_interval': 1800, 'contract_size': 1, 'instrument': 'MGC'}
+
+
+def make_bars(start, closes):
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=len(closes), freq='1min'),
+        'open': closes, 'high': [c + 1 for c in closes], 'low': [c - 1 for c in closes],
+        'close': closes, 'volume': [10.0] * len(closes),
+    })
+
+
+def test_replay_feed_is_deterministic():
+    """Events are merged in time order, bar closes before the next bar's quotes."""
+    bars = {'MGC': make_bars('2024-01-02 14:00', [100.0, 101.0]),
+            'MES': make_bars('2024-01-02 14:01', [5000.0])}
+    events = ReplayFeed(bars).events()
+
+    assert events == ReplayFeed(bars).events()
+    assert len(events) == 3 * 5
+    assert [e.timestamp for e in events] == sorted(e.timestamp for e in events)
+    first_close = events[4]
+    assert (first_close.kind, first_close.instrument, first_close.price) == ('bar', 'MGC', 100.0)
+    assert first_close.timestamp == datetime.datetime(2024, 1, 2, 14, 1)
+    assert first_close.bar['high'] == 101.0
+    # The next bars open at the same time; MGC was given first
+    assert [(e.kind, e.instrument) for e in events[5:7]] == [('quote', 'MGC'), ('quote', 'MES')]
+
+    received = []
+    feed = ReplayFeed(bars, quotes=False)
+    feed.subscribe(['MES'], received.append)
+    assert feed.replay() == 3
+    assert [e.instrument for e in received] == ['MES']
+
+
+def test_events_trigger_evaluation():
+    """Out-of-band quotes and bar closes re-run the strategy; in-band quotes do not."""
+    client = StubClient(price=100.0)
+    engine = StrategyEngine(parse_strategy_configs('', DEFAULTS), client=client)
+    start = engine.scheduler.next_wakeup()
+    engine.run_due(now=start)
+    assert engine.get_status()['MGC']['vwap'] == 100.0
+    now = start + 10
+
+    engine.on_event(MarketEvent('quote', 'MGC', datetime.datetime.utcnow(), 101.0))
+    assert engine.run_pending(now=now) == float('inf')
+    assert engine.get_status()['MGC']['iterations'] == 1
+
+    quotes_before = client.calls['get_market_data']
+    engine.on_event(MarketEvent('quote', 'MGC', datetime.datetime.utcnow(), 97.5))
+    engine.run_pending(now=now)
+    status = engine.get_status()['MGC']
+    assert (status['iterations'], status['last_trigger']) == (2, 'quote')
+    assert client.calls['place_order'] == 1
+    # The event's price is used instead of another quote request
+    assert client.calls['get_market_data'] == quotes_before
+    # The fallback timer restarts from the event-triggered run
+    assert now + 1800 <= engine.scheduler.due('MGC') <= now + 1800 + 60
+    assert engine.run_due(now=start + 1800) == []
+
+    engine.on_event(MarketEvent('bar', 'MGC', datetime.datetime.utcnow(), 100.0))
+    assert engine.run_pending(now=now + 0.5) == now + 1.0
+    engine.run_pending(now=now + 1.0)
+    assert engine.get_status()['MGC']['last_trigger'] == 'bar'
+
+
+def test_event_wakes_running_engine():
+    """A running engine reacts to an event without waiting for its timer."""
+    client = StubClient(price=100.0)
+    feed = ReplayFeed({})  # events are published by the test
+    engine = StrategyEngine(parse_strategy_configs('', DEFAULTS), client=client, feed=feed,
+                            min_event_interval=0.0)
+    engine.start()
+    try:
+        deadline = time.time() + 5
+        while engine.get_status()['MGC']['iterations'] < 1 and time.time() < deadline:
+            time.sleep(0.005)
+        published = time.time()
+        feed.publish(MarketEvent('bar', 'MGC', datetime.datetime.utcnow(), 100.0))
+        while engine.get_status()['MGC']['iterations'] < 2 and time.time() < deadline:
+            time.sleep(0.001)
+        assert engine.get_status()['MGC']['last_trigger'] == 'bar'
+        assert time.time() - published < 1.0
+    finally:
+        engine.stop()
+        engine._thread.join(5)
+    assert not engine._thread.is_alive()
+
+
+def test_polling_feed_publishes_changes():
+    """Polling emits quotes on price changes and a bar event per new minute."""
+    client = StubClient(price=100.0)
+    feed = PollingQuoteFeed(client)
+    received = []
+    feed.subscribe(['MGC'], received.append)
+
+    feed.poll(datetime.datetime(2024, 1, 2, 14, 0, 10))
+    feed.poll(datetime.datetime(2024, 1, 2, 14, 0, 20))
+    client.price = 100.5
+    feed.poll(datetime.datetime(2024, 1, 2, 14, 1, 0))
+
+    assert [(e.kind, e.price) for e in received] == [('quote', 100.0), ('bar', 100.5), ('quote', 100.5)]
+    assert received[1].timestamp == datetime.datetime(2024, 1, 2, 14, 1)
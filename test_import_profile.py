@@ -0,0 +1,39 @@
+"""Tests for startup import profiling and lazily imported strategy modules."""
+
+import os
+import subprocess
+import sys
+
+from import_profile import ImportProfile
+
+
+def test_profile_times_nested_imports(tmp_path, monkeypatch):
+    """Each new module gets its time; a parent's self time excludes the modules it imports."""
+    (tmp_path / 'profiled_child.py').write_text("import time\ntime.sleep(0.05)\n")
+    (tmp_path / 'profiled_parent.py').write_text("import time\nimport profiled_child\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profile = ImportProfile().start()
+    try:
+        import profiled_parent
+    finally:
+        profile.stop()
+        sys.modules.pop('profiled_parent', None)
+        sys.modules.pop('profiled_child', None)
+    assert profile not in sys.meta_path
+
+    parent, child = profile.times['profiled_parent'], profile.times['profiled_child']
+    assert child.self_seconds >= 0.05 and child.cumulative_seconds == child.self_seconds
+    assert parent.cumulative_seconds >= parent.self_seconds + child.cumulative_seconds - 1e-9
+    assert 0.02 <= parent.self_seconds < 0.05
+    assert [t.module for t in profile.slowest(2)] == ['profiled_parent', 'profiled_child']
+    # Modules keep their real loader
+    assert type(profiled_parent.__loader__).__name__ == 'SourceFileLoader'
+
+
+def test_main_defers_strategy_imports():
+    """Importing main loads neither numpy nor the strategy modules."""
+    code = "import sys, main; print(sorted({'numpy', 'pandas', 'vwap_strategy'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.stdout.strip() == '[]'
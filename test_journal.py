@@ -0,0 +1,149 @@
+"""Tests for the binary decision and order journal."""
+
+import datetime
+import time
+
+import numpy as np
+
+from backtest import compare_decisions, rolling_vwap
+from journal import (HEADER_SIZE, JournalWriter, bars_fingerprint, decisions, decode,
+                     orders, read_journal, read_journals)
+from simulator import SimulatedExchange
+from strategy_engine import StrategyEngine, parse_strategy_configs
+from vwap_strategy import VWAPStrategy
+
+# 2024-01-02 15:00:00 UTC
+START = 1704207600.0
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_records_round_trip_across_days(tmp_path):
+    """Records land in the file of their UTC day and read back unchanged."""
+    clock = FakeClock(START)
+    writer = JournalWriter(str(tmp_path), batch_size=4, clock=clock)
+    for i in range(10):
+        writer.record_decision('MGC', i, 'BUY' if i % 2 else 'none', vwap=100.0 + i,
+                               band_width=2.0, price=99.0, position=-1, bars_hash=2 ** 63 + i,
+                               bar_count=240, total_seconds=0.5)
+        clock.now += 3600
+    writer.record_order('MGC', 9, 'place', True, side='SELL', price=101.5, quantity=2,
+                        order_id='abc', seconds=0.25)
+    writer.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['2024-01-02.journal', '2024-01-03.journal']
+    records = read_journals(str(tmp_path))
+    assert len(records) == 11
+    assert np.all(np.diff(records['timestamp']) > 0)
+
+    made = decisions(records)
+    assert made['iteration'].tolist() == list(range(10))
+    assert decode(made, 'decision').tolist() == ['none', 'BUY'] * 5
+    assert made['vwap'][3] == 103.0 and made['position'][0] == -1
+    assert made['bars_hash'][9] == 2 ** 63 + 9
+    assert np.isnan(made['order_seconds']).all()
+
+    (order,) = orders(records)
+    assert decode(order[None], 'action')[0] == 'place' and decode(order[None], 'side')[0] == 'SELL'
+    assert order['order_id'] == b'abc' and order['quantity'] == 2 and order['ok']
+    assert len(read_journals(str(tmp_path), end=datetime.date(2024, 1, 2))) == 9
+
+
+def test_partial_record_is_ignored_and_truncated(tmp_path):
+    """A torn write at the end of a file is skipped on read and cut before the next append."""
+    clock = FakeClock(START)
+    writer = JournalWriter(str(tmp_path), clock=clock)
+    writer.record_decision('MGC', 1, 'none')
+    writer.flush()
+    path = tmp_path / '2024-01-02.journal'
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * 10)
+
+    assert len(read_journal(str(path))) == 1
+    writer.record_decision('MGC', 2, 'SELL')
+    writer.close()
+    records = read_journal(str(path))
+    assert records['iteration'].tolist() == [1, 2]
+    assert path.stat().st_size == HEADER_SIZE + 2 * records.itemsize
+
+
+def test_strategy_journals_decisions_and_orders(tmp_path):
+    """Every iteration records its decision, inputs and timings; order calls are recorded too."""
+    writer = JournalWriter(str(tmp_path))
+    exchange = SimulatedExchange(seed=3)
+    strategy = VWAPStrategy(client=exchange, instrument='MGC', vwap_deviation=0.0, journal=writer)
+    strategy.execute_strategy()
+    strategy.execute_strategy()
+    writer.close()
+
+    records = read_journals(str(tmp_path))
+    made = decisions(records)
+    assert made['iteration'].tolist() == [1, 2]
+    assert set(decode(made, 'decision')) <= {'BUY', 'SELL', 'position_open'}
+    first = made[0]
+    assert first['bar_count'] == 240 and first['bars_hash'] != 0
+    assert not np.isnan(first['vwap']) and first['price'] > 0
+    assert first['total_seconds'] >= first['fetch_seconds'] >= 0
+
+    calls = orders(records)
+    assert 'place' in decode(calls, 'action')
+    placed = calls[decode(calls, 'action') == 'place'][0]
+    assert placed['ok'] and placed['quantity'] == 1 and placed['order_id']
+
+
+def test_engine_writes_journal_on_stop_and_close(tmp_path):
+    """Batched records reach the disk when the engine stops, and close is final and idempotent."""
+    writer = JournalWriter(str(tmp_path), flush_interval=60.0)
+    engine = StrategyEngine(parse_strategy_configs('', {'instrument': 'MGC', 'vwap_deviation': 1e9}),
+                            client=SimulatedExchange(seed=3), journal=writer)
+    engine.start()
+    deadline = time.time() + 5
+    while engine.get_status()['MGC']['iterations'] < 1 and time.time() < deadline:
+        time.sleep(0.005)
+    thread = engine._thread
+    engine.stop()
+    thread.join(5)
+    assert len(decisions(read_journals(str(tmp_path)))) == 1
+
+    engine.close(timeout=5)
+    writer.record_decision('MGC', 2, 'none')
+    writer.flush()
+    writer.close()
+    assert len(read_journals(str(tmp_path))) == 1
+
+
+def test_compare_decisions_with_backtest(tmp_path):
+    """Live decisions are matched to the bar closed at their time and compared."""
+    n = 300
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    bars = {
+        'timestamp': np.datetime64('2024-01-02T10:00') + np.arange(n) * np.timedelta64(60, 's'),
+        'high': close + 0.5, 'low': close - 0.5, 'close': close,
+        'volume': rng.integers(50, 150, n).astype(float),
+    }
+    vwap = rolling_vwap(bars['high'], bars['low'], bars['close'], bars['volume'], 240)
+    assert bars_fingerprint(bars) != bars_fingerprint({k: v[:-1] for k, v in bars.items()})
+
+    clock = FakeClock(0.0)
+    writer = JournalWriter(str(tmp_path), clock=clock)
+    for i, (price, decision) in ((250, (vwap[250] - 3.0, 'BUY')), (260, (vwap[260], 'none')),
+                                 (270, (vwap[270] + 3.0, 'none'))):
+        # One second after the close of bar i
+        clock.now = (bars['timestamp'][i] + np.timedelta64(61, 's')).astype('datetime64[s]').astype(float)
+        writer.record_decision('MGC', i, decision, vwap=vwap[i], price=price)
+    clock.now += 1
+    writer.record_decision('MGC', 300, 'position_open')
+    writer.close()
+
+    result = compare_decisions(bars, read_journals(str(tmp_path)), vwap_deviation=2.0, lookback=240)
+    assert result['bar_index'].tolist() == [250, 260, 270]
+    assert result['backtest_decision'].tolist() == ['BUY', 'none', 'SELL']
+    assert result['vwap_agree'].all()
+    assert result['agree'].tolist() == [True, True, False]
@@ -0,0 +1,67 @@
+"""Tests for strategy and client metrics (doesn't require API client)."""
+
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from metrics import InstrumentedClient, instrument_client
+from simulator import SimulatedExchange
+from strategy_engine import BatchedClient
+from vwap_strategy import VWAPStrategy
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class FailingClient:
+    def get_orders(self, status=None):
+        raise ConnectionError("down")
+
+    async def get_positions(self):
+        return [{'instrument': 'MGC', 'quantity': 1}]
+
+
+def test_client_calls_are_timed_and_errors_counted():
+    """Every client call is observed; failures are also counted."""
+    client = instrument_client(FailingClient())
+    calls = sample('projectx_request_duration_seconds_count', method='get_orders')
+    errors = sample('projectx_request_errors_total', method='get_orders')
+    async_calls = sample('projectx_request_duration_seconds_count', method='get_positions')
+
+    try:
+        client.get_orders(status='OPEN')
+    except ConnectionError:
+        pass
+    assert asyncio.run(client.get_positions())[0]['quantity'] == 1
+
+    assert sample('projectx_request_duration_seconds_count', method='get_orders') == calls + 1
+    assert sample('projectx_request_errors_total', method='get_orders') == errors + 1
+    assert sample('projectx_request_duration_seconds_count', method='get_positions') == async_calls + 1
+
+
+def test_clients_are_wrapped_once():
+    """Already instrumented clients, also behind other proxies, are not wrapped again."""
+    client = InstrumentedClient(SimulatedExchange())
+    assert instrument_client(client) is client
+    batched = BatchedClient(client)
+    assert instrument_client(batched) is batched
+
+
+def test_strategy_iteration_metrics():
+    """An iteration records its duration, the VWAP update, the decision and the order latency."""
+    exchange = SimulatedExchange(seed=1)
+    strategy = VWAPStrategy(vwap_deviation=0.0, client=exchange, instrument='MGC')
+    iterations = sample('strategy_iteration_duration_seconds_count', instrument='MGC')
+    vwap_updates = sample('strategy_vwap_duration_seconds_count', instrument='MGC')
+    orders = sample('strategy_decision_to_order_seconds_count', instrument='MGC')
+    historical = sample('projectx_request_duration_seconds_count', method='get_historical_data')
+
+    strategy.execute_strategy()
+
+    assert sample('strategy_iteration_duration_seconds_count', instrument='MGC') == iterations + 1
+    assert sample('strategy_vwap_duration_seconds_count', instrument='MGC') == vwap_updates + 1
+    assert sample('strategy_decision_to_order_seconds_count', instrument='MGC') == orders + 1
+    assert sample('projectx_request_duration_seconds_count', method='get_historical_data') == historical + 1
+    side = exchange.get_orders()[0]['side']
+    assert sample('strategy_decisions_total', instrument='MGC', action=side) >= 1
@@ -0,0 +1,230 @@
+"""Tests for the local order book and order reuse (uses a stub client)."""
+
+from order_book import OrderBook, WorkingOrder, parse_order
+from vwap_strategy import VWAPStrategy
+
+
+class StubClient:
+    """Records order calls; broker orders and positions are kept in ``orders`` and ``positions``."""
+
+    def __init__(self):
+        self.calls = []
+        self.orders = []
+        self.positions = []
+
+    def get_positions(self):
+        self.calls.append('get_positions')
+        return [dict(position) for position in self.positions]
+
+    def get_orders(self, status=None):
+        self.calls.append('get_orders')
+        return [dict(order) for order in self.orders]
+
+    def place_order(self, **params):
+        self.calls.append('place_order')
+        order = {'id': str(len(self.orders) + 1), **params}
+        self.orders.append(order)
+        return order
+
+    def cancel_order(self, order_id):
+        self.calls.append('cancel_order')
+        self.orders = [order for order in self.orders if order['id'] != order_id]
+
+
+class AmendingClient(StubClient):
+    fail = False
+
+    def modify_order(self, order_id, price=None):
+        self.calls.append('modify_order')
+        if self.fail:
+            raise ConnectionError("gateway timeout")
+        for order in self.orders:
+            if order['id'] == order_id:
+                order['price'] = price
+                return order
+        raise ValueError(f"Unknown order: {order_id}")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_strategy(client):
+    strategy = VWAPStrategy(client=client, instrument='MGC')
+    strategy.order_book = OrderBook(60.0, clock=FakeClock())
+    return strategy
+
+
+def test_order_book_tracks_and_reconciles():
+    """Orders are indexed by instrument and replaced on reconcile."""
+    clock = FakeClock()
+    book = OrderBook(60.0, clock=clock)
+    assert book.needs_reconcile()
+
+    book.reconcile('MGC', [{'id': 'a', 'instrument': 'MGC', 'side': 'BUY', 'price': 10, 'quantity': 1},
+                           {'order_id': 'b', 'symbol': 'MES', 'side': 'SELL', 'price': 20, 'size': 2}])
+    assert book.for_instrument('MGC') == [WorkingOrder('a', 'MGC', 'BUY', 10.0, 1)]
+    assert book.for_instrument('MES') == []
+    assert not book.needs_reconcile()
+
+    book.add(WorkingOrder('c', 'MGC', 'SELL', 12.0, 1))
+    assert book.remove('a').order_id == 'a' and book.remove('a') is None
+    assert [order.order_id for order in book.for_instrument('MGC')] == ['c']
+
+    clock.now = 60.0
+    assert book.needs_reconcile()
+    book.reconcile('MGC', [])
+    book.mark_stale()
+    assert book.needs_reconcile() and len(book) == 0
+    assert parse_order({'symbol': 'MGC'}) is None
+
+
+def test_unchanged_price_is_not_resent():
+    """A second order at the same price costs no round trips."""
+    client = StubClient()
+    strategy = make_strategy(client)
+
+    assert strategy.place_limit_order('BUY', 100.0)
+    assert client.calls == ['get_orders', 'get_positions', 'place_order']
+    assert strategy.place_limit_order('BUY', 100.0)
+    assert client.calls == ['get_orders', 'get_positions', 'place_order']
+    assert strategy.current_order_id == '1'
+
+
+def test_moved_price_is_replaced_without_get_orders():
+    """Without amend support positions are checked, then the working order is replaced."""
+    client = StubClient()
+    strategy = make_strategy(client)
+    strategy.place_limit_order('BUY', 100.0)
+    client.calls.clear()
+
+    strategy.place_limit_order('BUY', 99.5)
+
+    assert client.calls == ['get_positions', 'cancel_order', 'place_order']
+    assert [order.price for order in strategy.order_book.for_instrument('MGC')] == [99.5]
+    assert [order['price'] for order in client.orders] == [99.5]
+
+
+def test_moved_price_is_amended():
+    """With amend support the working order keeps its ID."""
+    client = AmendingClient()
+    strategy = make_strategy(client)
+    strategy.place_limit_order('SELL', 101.0)
+    client.calls.clear()
+
+    strategy.place_limit_order('SELL', 101.5)
+    assert client.calls == ['modify_order']
+    assert strategy.order_book.for_instrument('MGC')[0] == WorkingOrder('1', 'MGC', 'SELL', 101.5, 1)
+
+    # The other side replaces the order instead
+    strategy.place_limit_order('BUY', 99.0)
+    assert client.calls == ['modify_order', 'get_positions', 'cancel_order', 'place_order']
+
+
+def test_failed_amend_reconciles_and_replaces_open_order():
+    """A failed amend replaces the order only if it is still working after a reconcile."""
+    client = AmendingClient()
+    strategy = make_strategy(client)
+    strategy.place_limit_order('SELL', 101.0)
+    client.fail = True
+    client.calls.clear()
+
+    assert strategy.place_limit_order('SELL', 101.5)
+    assert client.calls == ['modify_order', 'get_orders', 'get_positions', 'cancel_order', 'place_order']
+    assert [order.price for order in strategy.order_book.for_instrument('MGC')] == [101.5]
+
+    client.orders.clear()  # e.g. filled and flattened by hand
+    client.calls.clear()
+    assert not strategy.place_limit_order('SELL', 102.0)
+    assert client.calls == ['modify_order', 'get_orders', 'get_positions']
+    assert strategy.order_book.for_instrument('MGC') == []
+
+
+def test_periodic_reconcile_picks_up_broker_changes():
+    """The book is reconciled with get_orders once the interval has passed."""
+    client = StubClient()
+    strategy = make_strategy(client)
+    strategy.place_limit_order('BUY', 100.0)
+    client.orders.clear()
+    client.calls.clear()
+
+    strategy.order_book._clock.now = 30.0
+    strategy.place_limit_order('BUY', 100.0)
+    assert client.calls == []
+
+    strategy.order_book._clock.now = 61.0
+    strategy.place_limit_order('BUY', 100.0)
+    assert client.calls == ['get_orders', 'get_positions', 'place_order']
+
+
+class FillingClient(AmendingClient):
+    """Working orders fill before they can be amended."""
+
+    def modify_order(self, order_id, price=None):
+        self.calls.append('modify_order')
+        for order in self.orders:
+            self.positions.append({'instrument': order['instrument'], 'quantity': order['quantity'],
+                                   'side': 'LONG' if order['side'] == 'BUY' else 'SHORT',
+                                   'average_price': order['price']})
+        self.orders.clear()
+        raise ValueError(f"Order {order_id} already filled")
+
+
+def test_fill_during_amend_is_not_entered_twice():
+    """An order that filled between iterations is not followed by a second entry."""
+    client = FillingClient()
+    strategy = make_strategy(client)
+    strategy.place_limit_order('BUY', 98.0)
+    client.calls.clear()
+
+    assert not strategy.place_limit_order('BUY', 99.0)
+    assert client.calls == ['modify_order', 'get_orders', 'get_positions']
+    assert strategy.get_position().quantity == 1
+    assert len(client.orders) == 0 and strategy.order_book.for_instrument('MGC') == []
+
+    # The same holds when the fill is found by the periodic reconcile
+    client.positions.clear()
+    strategy.position_tracker.reconcile([])
+    strategy.place_limit_order('BUY', 98.0)
+    client.orders.clear()
+    client.positions.append({'instrument': 'MGC', 'quantity': 1, 'side': 'LONG', 'average_price': 98.0})
+    client.calls.clear()
+    strategy.order_book._clock.now = 61.0
+    assert not strategy.place_limit_order('BUY', 98.0)
+    assert client.calls == ['get_orders', 'get_positions']
+
+
+class CancelFillingClient(StubClient):
+    """Working orders fill before they can be cancelled, as the cancel response reports."""
+
+    def cancel_order(self, order_id):
+        self.calls.append('cancel_order')
+        order = next(order for order in self.orders if order['id'] == order_id)
+        self.orders.remove(order)
+        self.positions.append({'instrument': order['instrument'], 'quantity': order['quantity'],
+                               'side': 'LONG' if order['side'] == 'BUY' else 'SHORT',
+                               'average_price': order['price']})
+        return {**order, 'status': 'FILLED', 'fill_price': order['price']}
+
+
+def test_fill_during_cancel_is_not_followed_by_new_order():
+    """An order that filled before its cancel is applied, and no replacement is placed."""
+    client = CancelFillingClient()
+    strategy = make_strategy(client)
+    strategy.position_tracker.reconcile([])
+    strategy.place_limit_order('BUY', 98.0)
+    client.calls.clear()
+
+    assert not strategy.place_limit_order('SELL', 102.0)
+    assert client.calls == ['get_positions', 'cancel_order']
+    assert strategy.position_tracker.get('MGC').quantity == 1
+    assert strategy.order_book.for_instrument('MGC') == [] and strategy.current_order_id is None
+
+    # The tracker is confirmed with the broker before it is trusted again
+    assert strategy.position_tracker.needs_reconcile()
+    assert strategy.get_position().quantity == 1
+    assert client.calls == ['get_positions', 'cancel_order', 'get_positions']
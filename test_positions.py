@@ -0,0 +1,118 @@
+"""Tests for the local position tracker (uses a stub client)."""
+
+from positions import Position, PositionTracker, apply_fill, flat, parse_position
+from vwap_strategy import VWAPStrategy
+
+
+class StubClient:
+    """Broker positions are kept in ``positions``; orders fill as ``fill_status`` says."""
+
+    def __init__(self, fill_status='OPEN'):
+        self.calls = []
+        self.positions = []
+        self.fill_status = fill_status
+
+    def get_positions(self):
+        self.calls.append('get_positions')
+        return [dict(position) for position in self.positions]
+
+    def get_orders(self, status=None):
+        self.calls.append('get_orders')
+        return []
+
+    def place_order(self, **params):
+        self.calls.append('place_order')
+        return {'id': str(self.calls.count('place_order')), 'status': self.fill_status,
+                'fill_price': params['price'], **params}
+
+    def cancel_order(self, order_id):
+        self.calls.append('cancel_order')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_apply_fill_nets_quantity_and_average_price():
+    """Adding averages in, reducing keeps the average, reversing opens at the fill."""
+    position = apply_fill(flat('MGC'), 'BUY', 1, 100.0)
+    position = apply_fill(position, 'BUY', 3, 104.0)
+    assert position == Position('MGC', 4, 'LONG', 103.0)
+
+    position = apply_fill(position, 'SELL', 1, 110.0)
+    assert position == Position('MGC', 3, 'LONG', 103.0)
+
+    position = apply_fill(position, 'SELL', 5, 90.0)
+    assert position == Position('MGC', -2, 'SHORT', 90.0)
+
+    position = apply_fill(position, 'BUY', 2, 95.0)
+    assert position == flat('MGC') and not position.is_open
+
+
+def test_tracker_reconciles_from_broker_positions():
+    """Broker entries replace the tracked state, whatever their field names."""
+    clock = FakeClock()
+    tracker = PositionTracker(60.0, clock=clock)
+    assert tracker.needs_reconcile()
+    tracker.apply_fill('MES', 'BUY', 1, 5000.0)
+
+    tracker.reconcile([{'instrument': 'MGC', 'quantity': 2, 'side': 'SHORT', 'average_price': 2000.5},
+                       {'symbol': 'MNQ', 'size': 1, 'avg_price': 18000}])
+    assert tracker.get('MGC') == Position('MGC', -2, 'SHORT', 2000.5)
+    assert tracker.get('MNQ') == Position('MNQ', 1, 'LONG', 18000.0)
+    assert tracker.get('MES') == flat('MES')
+    assert [position.instrument for position in tracker.open_positions()] == ['MGC', 'MNQ']
+    assert parse_position({'quantity': 1}) is None
+
+    assert not tracker.needs_reconcile()
+    clock.now = 60.0
+    assert tracker.needs_reconcile()
+
+
+def test_has_open_position_reads_tracker_between_reconciles():
+    """Positions are answered locally between reconciles, but checked before replacing an order."""
+    client = StubClient()
+    clock = FakeClock()
+    strategy = VWAPStrategy(client=client, instrument='MGC',
+                            position_tracker=PositionTracker(60.0, clock=clock))
+    client.positions = [{'instrument': 'MGC', 'quantity': 1, 'side': 'LONG', 'average_price': 10.0}]
+
+    assert strategy.has_open_position()
+    assert strategy.has_open_position()
+    assert client.calls == ['get_positions']
+
+    client.positions = []
+    clock.now = 60.0
+    assert not strategy.has_open_position()
+    assert client.calls == ['get_positions', 'get_positions']
+
+    # A resting order fills at the broker; the tracker does not know until
+    # the next reconcile, but positions are checked before it is replaced
+    strategy.order_book.reconcile('MGC', [])
+    assert strategy.place_limit_order('BUY', 9.0)
+    client.positions = [{'instrument': 'MGC', 'quantity': 1, 'side': 'LONG', 'average_price': 9.0}]
+    clock.now = 90.0
+    assert not strategy.has_open_position()
+    client.calls.clear()
+
+    assert not strategy.place_limit_order('SELL', 11.0)
+    assert client.calls == ['get_positions']
+    assert strategy.has_open_position() and client.calls == ['get_positions']
+
+
+def test_fills_in_order_responses_update_tracker():
+    """A filled order response opens the position without a get_positions call."""
+    client = StubClient(fill_status='FILLED')
+    strategy = VWAPStrategy(client=client, instrument='MGC', contract_size=2)
+    strategy.position_tracker.reconcile([])
+    strategy.order_book.reconcile('MGC', [])
+
+    assert strategy.place_limit_order('BUY', 100.0)
+    assert strategy.get_position() == Position('MGC', 2, 'LONG', 100.0)
+    assert strategy.order_book.for_instrument('MGC') == []
+    assert strategy.has_open_position()
+    assert 'get_positions' not in client.calls
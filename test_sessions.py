@@ -0,0 +1,101 @@
+"""Tests for the session calendar and session-anchored VWAP."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sessions import SessionAnchor, exchange_hours
+from simulator import SimulatedExchange
+from vwap_strategy import VWAPStrategy
+
+
+def utc(text):
+    return datetime.datetime.fromisoformat(text)
+
+
+def test_globex_sessions_open_the_evening_before():
+    """Globex sessions open at 17:00 Chicago time, Sunday evening for Monday."""
+    anchor = SessionAnchor('globex', 'MGC')
+    # Summer (CDT, UTC-5): Tuesday morning belongs to Monday evening's session
+    assert anchor.session_start(utc('2024-07-09T14:00')) == utc('2024-07-08T22:00')
+    assert anchor.session_start(utc('2024-07-08T22:00')) == utc('2024-07-08T22:00')
+    # Winter (CST, UTC-6): Monday morning and the weekend belong to earlier sessions
+    assert anchor.session_start(utc('2024-01-08T15:00')) == utc('2024-01-07T23:00')
+    assert anchor.session_start(utc('2024-01-06T12:00')) == utc('2024-01-04T23:00')
+    # Good Friday 2024-03-29 has no session; Thursday stays in Wednesday's
+    assert anchor.session_start(utc('2024-03-28T23:30')) == utc('2024-03-27T22:00')
+
+
+def test_rth_weekly_and_custom_anchors():
+    """RTH opens per product; weekly opens Sunday evening; custom times are exchange-local."""
+    assert exchange_hours('MESZ4') == exchange_hours('MES') != exchange_hours('MGC')
+
+    rth = SessionAnchor('rth', 'MES')
+    assert rth.session_start(utc('2024-07-09T14:00')) == utc('2024-07-09T13:30')
+    # Overnight trade before Monday's open belongs to Friday's session
+    assert rth.session_start(utc('2024-07-08T12:00')) == utc('2024-07-05T13:30')
+    assert SessionAnchor('rth', 'MGC').session_start(utc('2024-07-09T14:00')) == utc('2024-07-09T12:20')
+
+    weekly = SessionAnchor('weekly', 'MGC')
+    assert weekly.session_start(utc('2024-07-11T14:00')) == utc('2024-07-07T22:00')
+    assert weekly.session_start(utc('2024-07-07T21:00')) == utc('2024-06-30T22:00')
+
+    daily = SessionAnchor('custom', 'MGC', '06:00')
+    assert daily.session_start(utc('2024-07-09T14:00')) == utc('2024-07-09T11:00')
+    fixed = SessionAnchor('custom', 'MGC', '2024-07-01T08:30')
+    assert fixed.session_start(utc('2024-07-09T14:00')) == utc('2024-07-01T13:30')
+
+    with pytest.raises(ValueError):
+        SessionAnchor('custom', 'MGC')
+    with pytest.raises(ValueError):
+        SessionAnchor('monthly', 'MGC')
+
+
+class RecordingClient:
+    """Simulator proxy that records the start of every bar request."""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.starts = []
+
+    def __getattr__(self, name):
+        return getattr(self.exchange, name)
+
+    def get_historical_data(self, instrument=None, start=None, end=None, interval='1m'):
+        self.starts.append(pd.Timestamp(start))
+        return self.exchange.get_historical_data(instrument=instrument, start=start,
+                                                 end=end, interval=interval)
+
+
+def reference_vwap(data):
+    typical_price = (data['high'] + data['low'] + data['close']) / 3.0
+    return float((typical_price * data['volume']).sum() / data['volume'].sum())
+
+
+def test_anchored_vwap_resets_without_refetching():
+    """A new session evicts old bars and fetches only the delta."""
+    client = RecordingClient(SimulatedExchange(seed=5))
+    chicago = exchange_hours('MGC').timezone
+    now = pd.Timestamp(datetime.datetime.now(datetime.timezone.utc)).tz_convert(chicago).tz_localize(None).floor('1min')
+    first_open = (now - pd.Timedelta(minutes=90)).isoformat()
+    strategy = VWAPStrategy(client=client, instrument='MGC', anchor='custom', anchor_time=first_open)
+
+    data = strategy.fetch_market_data()
+    vwap = strategy.update_vwap(data)
+    session_start = strategy.session_start
+    assert client.starts == [pd.Timestamp(session_start)]
+    assert data['timestamp'][0] == np.datetime64(session_start)
+    assert np.isclose(vwap, reference_vwap(data))
+
+    # The next session opens 30 minutes before now
+    strategy.session_anchor = SessionAnchor('custom', 'MGC', (now - pd.Timedelta(minutes=30)).isoformat())
+    data = strategy.fetch_market_data()
+    strategy.update_vwap(data)
+
+    assert strategy.session_start == session_start + datetime.timedelta(minutes=60)
+    assert client.starts[1] > client.starts[0] + datetime.timedelta(minutes=60)
+    assert data['timestamp'][0] == np.datetime64(strategy.session_start)
+    assert len(strategy.vwap_accumulator) == len(data['close'])
+    assert np.isclose(strategy.vwap_accumulator.vwap, reference_vwap(data))
@@ -0,0 +1,147 @@
+"""Tests for read coalescing and the rate budget of the shared client (uses a stub client)."""
+
+import threading
+
+import pytest
+
+from shared_client import RateLimitExceeded, SharedClient, TokenBucket, parse_rate, share_client
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowClient:
+    """Counts calls; reads block until ``release`` is set."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def get_positions(self):
+        self.calls.append('get_positions')
+        self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("broker unavailable")
+        return [{'instrument': 'MGC', 'quantity': len(self.calls)}]
+
+    def get_orders(self, status=None):
+        self.calls.append('get_orders')
+        return [{'id': str(len(self.calls)), 'status': status}]
+
+    def get_historical_data(self, **params):
+        self.calls.append('get_historical_data')
+        return []
+
+    def cancel_order(self, order_id):
+        self.calls.append('cancel_order')
+
+
+def read_concurrently(func, n=5):
+    results, errors = [], []
+
+    def read():
+        try:
+            results.append(func())
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=read) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_identical_reads_share_one_call_and_cache():
+    """Overlapping identical reads make one call; later reads use the cache until the TTL."""
+    stub, clock = SlowClient(), FakeClock()
+    client = SharedClient(stub, cache_ttl=1.0, clock=clock)
+
+    stub.release.clear()
+    threads, results, errors = read_concurrently(client.get_positions)
+    while not stub.calls:
+        pass
+    stub.release.set()
+    for thread in threads:
+        thread.join()
+    assert stub.calls == ['get_positions'] and not errors
+    assert results == [[{'instrument': 'MGC', 'quantity': 1}]] * 5
+    # Each caller gets its own list
+    results[0].append('mine')
+    assert client.get_positions() == [{'instrument': 'MGC', 'quantity': 1}]
+
+    # Different arguments are different reads
+    client.get_orders(status='OPEN')
+    client.get_orders(status='OPEN')
+    client.get_orders(status='FILLED')
+    assert stub.calls.count('get_orders') == 2
+
+    clock.now += 1.0
+    assert client.get_positions() == [{'instrument': 'MGC', 'quantity': 4}]
+
+
+def test_order_calls_drop_stale_reads_and_errors_are_not_cached():
+    """An order call invalidates position and order reads; a failed read is shared but not kept."""
+    stub = SlowClient()
+    client = SharedClient(stub, cache_ttl=60.0, clock=FakeClock())
+
+    client.get_orders(status='OPEN')
+    client.get_historical_data(instrument='MGC')
+    client.cancel_order('1')
+    client.get_orders(status='OPEN')
+    client.get_historical_data(instrument='MGC')
+    assert stub.calls == ['get_orders', 'get_historical_data', 'cancel_order', 'get_orders']
+
+    stub.fail = True
+    stub.release.clear()
+    threads, results, errors = read_concurrently(client.get_positions, n=3)
+    while 'get_positions' not in stub.calls:
+        pass
+    stub.release.set()
+    for thread in threads:
+        thread.join()
+    assert not results and len(errors) == 3 and stub.calls.count('get_positions') == 1
+
+    stub.fail = False
+    assert client.get_positions()[0]['quantity'] == len(stub.calls)
+
+
+def test_token_bucket_keeps_reserve_for_priority_calls():
+    """Reads stop at the reserve; order calls may use it and refill over time."""
+    clock = FakeClock()
+    bucket = TokenBucket(10, 1.0, reserve=2, clock=clock)
+
+    assert all(bucket.try_acquire() == 0.0 for _ in range(8))
+    assert bucket.try_acquire() == pytest.approx(0.1)
+    assert bucket.try_acquire(priority=True) == 0.0
+    assert bucket.try_acquire(priority=True) == 0.0
+    assert bucket.try_acquire(priority=True) == pytest.approx(0.1)
+
+    clock.now += 0.3
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() > 0
+    with pytest.raises(RateLimitExceeded):
+        bucket.acquire(timeout=0)
+
+
+def test_share_client_applies_rate_budgets():
+    """Historical bars have their own budget; exhausted budgets fail after the maximum wait."""
+    assert parse_rate('') is None and parse_rate('0') is None
+    assert parse_rate('50/30') == (50.0, 30.0) and parse_rate('5') == (5.0, 1.0)
+
+    stub = SlowClient()
+    client = share_client(stub, cache_ttl=0, rate_limit='100/1', history_rate_limit='2/60')
+    assert share_client(client) is client
+    client.max_wait = 0
+
+    client.get_historical_data(instrument='MGC', end=1)
+    client.get_historical_data(instrument='MGC', end=2)
+    with pytest.raises(RateLimitExceeded):
+        client.get_historical_data(instrument='MGC', end=3)
+    client.get_orders(status='OPEN')
+    assert stub.calls == ['get_historical_data'] * 2 + ['get_orders']
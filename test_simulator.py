@@ -0,0 +1,118 @@
+"""Tests for the simulated ProjectX exchange."""
+
+import datetime
+
+import pytest
+
+from simulator import SimulatedExchange
+from vwap_strategy import VWAPStrategy
+
+
+class ManualClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += datetime.timedelta(**kwargs)
+
+
+def make_exchange(**kwargs):
+    clock = ManualClock(datetime.datetime(2024, 1, 2, 15, 0, 30))
+    return SimulatedExchange(clock=clock, history=datetime.timedelta(hours=6), **kwargs), clock
+
+
+def test_bars_are_reproducible():
+    """The same seed yields the same bars however they are requested."""
+    exchange, clock = make_exchange(seed=7)
+    other, _ = make_exchange(seed=7)
+    start = clock.now - datetime.timedelta(minutes=240)
+
+    full = exchange.get_historical_data(instrument='MGC', start=start.isoformat(),
+                                        end=clock.now.isoformat(), interval='1m')
+    head = other.get_historical_data(instrument='MGC', start=start.isoformat(),
+                                     end=(clock.now - datetime.timedelta(minutes=100)).isoformat())
+    tail = other.get_historical_data(symbol='MGC', start=clock.now - datetime.timedelta(minutes=100),
+                                     end=clock.now)
+
+    assert len(full) == 240
+    assert (full[0]['timestamp'], full[-1]['timestamp']) == ('2024-01-02T11:01:00', '2024-01-02T15:00:00')
+    assert head + tail == full
+    assert exchange.get_market_data('MGC')['last_price'] == full[-1]['close']
+    assert make_exchange(seed=8)[0].get_market_data('MGC')['last_price'] != full[-1]['close']
+
+
+def test_limit_orders_match_and_update_positions():
+    """Resting orders fill when a completed bar trades through them."""
+    exchange, clock = make_exchange()
+    price = exchange.get_market_data('MGC')['last_price']
+
+    order = exchange.place_order(instrument='MGC', order_type='LIMIT', side='BUY',
+                                 quantity=2, price=price - 1000)
+    far = exchange.place_order(symbol='MGC', type='LIMIT', side='SELL', quantity=1,
+                               price=price + 1000, time_in_force='GTC')
+    assert order['status'] == 'OPEN' and '_from_bar' not in order
+    assert exchange.get_positions() == []
+
+    exchange.cancel_order(far['id'])
+    assert [o['id'] for o in exchange.get_orders(status='OPEN')] == [order['id']]
+
+    # A marketable order fills at once at the last price
+    filled = exchange.place_order(instrument='MGC', order_type='LIMIT', side='BUY',
+                                  quantity=1, price=price + 5)
+    assert filled['status'] == 'FILLED' and filled['fill_price'] == price
+    assert exchange.get_positions() == [
+        {'instrument': 'MGC', 'quantity': 1, 'side': 'LONG', 'average_price': price}
+    ]
+
+    # Resting SELL at the forming bar's high fills once that bar completes
+    high = exchange.get_historical_data(instrument='MGC', start=clock.now.replace(second=0),
+                                        end=clock.now)[-1]['high']
+    exchange.place_order(instrument='MGC', order_type='LIMIT', side='SELL', quantity=1, price=high)
+    assert exchange.get_positions()[0]['quantity'] == 1
+    clock.advance(minutes=1)
+    assert exchange.get_positions() == []
+    assert [fill['side'] for fill in exchange.fills] == ['BUY', 'SELL']
+
+
+def test_latency_is_injected_per_call():
+    """Every call waits its latency plus seeded jitter."""
+    slept = []
+    exchange, _ = make_exchange(latency=0.05, jitter=0.01, latencies={'get_positions': 0.2},
+                                sleep=slept.append)
+    exchange.get_market_data('MGC')
+    exchange.get_positions()
+
+    assert 0.05 <= slept[0] <= 0.06 and 0.2 <= slept[1] <= 0.21
+    assert exchange.call_stats()['get_positions']['calls'] == 1
+
+    replayed = []
+    again, _ = make_exchange(latency=0.05, jitter=0.01, latencies={'get_positions': 0.2},
+                             sleep=replayed.append)
+    again.get_market_data('MGC')
+    again.get_positions()
+    assert replayed == slept
+
+    with pytest.raises(ValueError, match='get_position'):
+        make_exchange(latencies={'get_position': 0.2})
+
+
+def test_strategy_runs_against_simulator():
+    """The strategy accepts the simulator as its client and trades on it."""
+    exchange = SimulatedExchange(seed=3)
+    strategy = VWAPStrategy(vwap_deviation=0.0, client=exchange)
+
+    strategy.execute_strategy()
+
+    assert exchange.calls['get_historical_data'] == 1
+    assert exchange.calls['place_order'] == 1
+    assert strategy.current_order_id == '1'
+    # With no deviation the order is marketable and fills at once
+    assert abs(exchange.get_positions()[0]['quantity']) == 1
+
+    strategy.execute_strategy()
+    assert exchange.calls['place_order'] == 1
@@ -0,0 +1,124 @@
+"""Tests for strategy snapshots and the snapshot cache (uses the simulator)."""
+
+import threading
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from simulator import SimulatedExchange
+from snapshots import SnapshotCache, etag_matches, snapshot_etag
+from vwap_strategy import VWAPStrategy
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_strategy_publishes_snapshot_of_each_evaluation():
+    """Every iteration replaces the snapshot with its VWAP, bands and decision."""
+    strategy = VWAPStrategy(client=SimulatedExchange(seed=3), instrument='MGC', vwap_deviation=0.0)
+    assert strategy.snapshot is None
+
+    strategy.execute_strategy(current_price=1e9)
+    first = strategy.snapshot
+    assert first.decision == 'SELL' and first.current_price == 1e9
+    assert first.vwap == strategy.vwap_accumulator.vwap
+    assert first.long_entry == first.short_entry == first.vwap
+
+    strategy.execute_strategy()
+    assert strategy.snapshot is not first
+    assert strategy.snapshot.decision == 'position_open'
+
+    refreshed = strategy.refresh_snapshot()
+    assert refreshed is strategy.snapshot and refreshed.decision == 'position_open'
+    assert snapshot_etag(refreshed) == snapshot_etag(refreshed._replace(timestamp=0.0))
+    assert snapshot_etag(refreshed) != snapshot_etag(refreshed._replace(current_price=1.0))
+
+
+def decisions_counted():
+    """Entry decisions counted so far for MGC, all actions together."""
+    return sum(REGISTRY.get_sample_value('strategy_decisions_total', {'instrument': 'MGC', 'action': action})
+               or 0.0 for action in ('BUY', 'SELL', 'none'))
+
+
+def test_refreshed_snapshot_shows_the_entry_decision():
+    """A refresh publishes the decision decide_entry would make, without counting it."""
+    strategy = VWAPStrategy(client=SimulatedExchange(seed=3), instrument='MGC', vwap_deviation=0.5)
+    strategy.position_tracker.reconcile([])
+    for band in (-3.0, 0.0, 3.0):
+        strategy.band_width = lambda: 1.0
+        strategy.get_current_price = lambda: strategy.vwap_accumulator.vwap + band
+        before = decisions_counted()
+        refreshed = strategy.refresh_snapshot()
+        assert decisions_counted() == before
+
+        order = strategy.decide_entry(refreshed.vwap, refreshed.current_price)
+        assert refreshed.decision == (order[0] if order else 'none')
+        assert refreshed.decision == {-3.0: 'BUY', 0.0: 'none', 3.0: 'SELL'}[band]
+
+
+def test_stale_snapshot_is_refreshed_once_for_concurrent_readers():
+    """Readers share a fresh snapshot; a stale one triggers a single refresh."""
+    strategy = VWAPStrategy(client=SimulatedExchange(seed=3), instrument='MGC')
+    refreshes = []
+    release = threading.Event()
+
+    def refresh():
+        refreshes.append(1)
+        release.wait(5)
+        strategy.refresh_snapshot()
+
+    clock = FakeClock(time.time())
+    cache = SnapshotCache(ttl=5.0, clock=clock)
+    results = []
+    readers = [threading.Thread(target=lambda: results.append(
+        cache.get('MGC', lambda: strategy.snapshot, refresh))) for _ in range(8)]
+    for reader in readers:
+        reader.start()
+    time.sleep(0.05)
+    release.set()
+    for reader in readers:
+        reader.join()
+
+    assert len(refreshes) == 1
+    assert len({id(entry) for entry in results}) == 1
+    entry = results[0]
+    assert entry.snapshot is strategy.snapshot and entry.payload['instrument'] == 'MGC'
+
+    # Fresh: served as is; stale: refreshed again
+    assert cache.get('MGC', lambda: strategy.snapshot, refresh) is entry
+    clock.now += 10.0
+    cache.get('MGC', lambda: strategy.snapshot, refresh)
+    assert len(refreshes) == 2
+
+
+def test_failed_refresh_serves_stale_snapshot():
+    """A refresh error falls back to the last snapshot, or raises without one."""
+    strategy = VWAPStrategy(client=SimulatedExchange(seed=3), instrument='MGC')
+
+    def fail():
+        raise ConnectionError('gateway down')
+
+    cache = SnapshotCache(ttl=5.0)
+    with pytest.raises(ConnectionError):
+        cache.get('MGC', lambda: strategy.snapshot, fail)
+
+    strategy.refresh_snapshot()
+    stale = strategy.snapshot._replace(timestamp=0.0)
+    assert cache.get('MGC', lambda: stale, fail).snapshot is stale
+
+
+def test_etag_matching():
+    """If-None-Match matches weakly, in lists and as a wildcard."""
+    etag = 'W/"abc"'
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"abd"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,192 @@
+"""Tests for the multi-instrument strategy engine (uses a stub client)."""
+
+import datetime
+import time
+
+import pandas as pd
+import pytest
+
+from scheduler import Scheduler
+from strategy_engine import BatchedClient, StrategyEngine, parse_strategy_configs
+
+
+class StubClient:
+    """Counts calls and serves flat bars with a configurable price."""
+
+    def __init__(self, price=100.0):
+        self.price = price
+        self.calls = {}
+        self.orders = []
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def get_historical_data(self, instrument, start, end, interval):
+        self._count('get_historical_data')
+        timestamps = pd.date_range(pd.Timestamp(start).ceil('1min'), pd.Timestamp(end).floor('1min'), freq='1min')
+        return [{'timestamp': t.isoformat(), 'open': 100.0, 'high': 101.0, 'low': 99.0,
+                 'close': 100.0, 'volume': 10.0} for t in timestamps]
+
+    def get_market_data(self, instrument):
+        self._count('get_market_data')
+        return {'last_price': self.price}
+
+    def get_positions(self):
+        self._count('get_positions')
+        return []
+
+    def get_orders(self, status=None):
+        self._count('get_orders')
+        return list(self.orders)
+
+    def cancel_order(self, order_id):
+        self._count('cancel_order')
+        self.orders = [order for order in self.orders if order['id'] != order_id]
+
+    def place_order(self, **params):
+        self._count('place_order')
+        order = {'id': f"order-{len(self.orders) + 1}-{params['instrument']}", **params}
+        self.orders.append(order)
+        return order
+
+
+DEFAULTS = {'vwap_deviation': 2.0, 'timer_interval': 1800, 'contract_size': 1, 'instrument': 'MGC',
+            'band_mode': 'fixed', 'anchor': 'rolling', 'anchor_time': None}
+
+
+def test_parse_strategy_configs():
+    """Configs come from defaults, an instrument list or JSON."""
+    assert parse_strategy_configs('', DEFAULTS) == [dict(DEFAULTS, name='MGC')]
+
+    configs = parse_strategy_configs('MGC, MES,MNQ', DEFAULTS)
+    assert [config['instrument'] for config in configs] == ['MGC', 'MES', 'MNQ']
+    assert all(config['vwap_deviation'] == 2.0 for config in configs)
+
+    configs = parse_strategy_configs(
+        '[{"instrument": "MES", "vwap_deviation": 3.0}, {"name": "gold", "instrument": "MGC"}]',
+        DEFAULTS)
+    assert [config['name'] for config in configs] == ['MES', 'gold']
+    assert configs[0]['vwap_deviation'] == 3.0
+
+    # Orders and positions are per instrument, so strategies cannot share one
+    for spec in ('MES,MES', '[{"instrument": "MES"}, {"name": "MES-wide", "instrument": "MES"}]'):
+        with pytest.raises(ValueError):
+            parse_strategy_configs(spec, DEFAULTS)
+
+
+def test_tick_batches_position_and_order_reads():
+    """One tick over three instruments reads positions and orders once."""
+    client = StubClient(price=90.0)
+    engine = StrategyEngine(parse_strategy_configs('MGC,MES,MNQ', DEFAULTS), client=client)
+
+    ran = engine.run_due(now=datetime.datetime.now().timestamp() + 1)
+
+    assert ran == ['MGC', 'MES', 'MNQ']
+    assert client.calls['get_positions'] == 1
+    assert client.calls['get_orders'] == 1
+    assert client.calls['place_order'] == 3
+    status = engine.get_status()
+    assert all(entry['iterations'] == 1 and entry['last_error'] is None for entry in status.values())
+    assert status['MES']['current_order_id'].endswith('MES')
+
+
+def test_reads_outside_tick_pass_through():
+    """Reads outside a tick are not cached."""
+    client = StubClient()
+    batched = BatchedClient(client)
+    batched.get_positions()
+    batched.get_positions()
+    assert client.calls['get_positions'] == 2
+
+    batched.begin_tick()
+    batched.get_positions()
+    batched.get_positions()
+    batched.end_tick()
+    assert client.calls['get_positions'] == 3
+
+
+def test_cancel_removes_order_from_tick_snapshot():
+    """Orders cancelled within a tick disappear from the shared snapshot."""
+    client = StubClient()
+    client.orders = [{'id': 'a', 'instrument': 'MGC'}, {'id': 'b', 'instrument': 'MES'}]
+    batched = BatchedClient(client)
+    batched.begin_tick()
+    batched.get_orders(status='OPEN')
+    batched.cancel_order('a')
+    assert [order['id'] for order in batched.get_orders(status='OPEN')] == ['b']
+    assert client.calls['get_orders'] == 1
+    batched.end_tick()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_schedule_by_interval():
+    """Strategies run again only once their interval has elapsed, on bar closes."""
+    client = StubClient()
+    configs = parse_strategy_configs(
+        '[{"instrument": "MGC", "timer_interval": 60}, {"instrument": "MES", "timer_interval": 300}]',
+        DEFAULTS)
+    start = 1_700_000_040.0  # A bar close
+    clock = FakeClock(start)
+    engine = StrategyEngine(configs, client=client,
+                            scheduler=Scheduler(close_delay=0.0, clock=clock, wall_clock=clock))
+    runs = []
+    engine.add_listener(runs.append)
+    assert engine.scheduler.next_wakeup() == start
+
+    assert engine.run_due(now=start) == ['MGC', 'MES']
+    assert engine.run_due(now=start + 30) == []
+    # A late wake-up does not delay the following runs
+    clock.now = start + 60.4
+    assert engine.run_due() == ['MGC']
+    assert engine.scheduler.due('MGC') == start + 120
+    assert engine.get_status()['MGC']['next_run'] == start + 120
+    clock.now = start + 300
+    assert engine.run_due() == ['MGC', 'MES']
+    assert runs == ['MGC', 'MES', 'MGC', 'MGC', 'MES']
+
+
+def test_runs_align_to_bar_closes():
+    """An off-boundary start runs at once, then on the bar close after one interval."""
+    clock = FakeClock(1_700_000_057.0)
+    scheduler = Scheduler(close_delay=1.0, clock=clock, wall_clock=lambda: clock.now + 1000.0)
+    engine = StrategyEngine(parse_strategy_configs('[{"instrument": "MGC", "timer_interval": 1800}]', DEFAULTS),
+                            client=StubClient(), scheduler=scheduler)
+
+    assert engine.run_due() == ['MGC']
+    # Wall clock 1_700_001_057 + 1800 rounds up to the 1_700_002_860 bar close, plus the delay
+    assert engine.get_status()['MGC']['next_run'] == 1_700_002_861.0
+    assert scheduler.due('MGC') == 1_700_001_861.0
+    # Runs that overran their interval skip ahead instead of bunching up
+    clock.now = 1_700_006_000.0
+    assert engine.run_due() == ['MGC']
+    assert clock.now < scheduler.due('MGC') <= clock.now + 60
+
+
+def test_stop_interrupts_wait():
+    """Stopping wakes a running engine at once and a restart runs a single thread."""
+    engine = StrategyEngine(parse_strategy_configs('', DEFAULTS), client=StubClient())
+    engine.start(requested_at=time.perf_counter() - 2.0)
+    deadline = time.time() + 5
+    while engine.get_status()['MGC']['iterations'] < 1 and time.time() < deadline:
+        time.sleep(0.005)
+    thread = engine._thread
+    # Measured from the start request, e.g. including authentication
+    assert 2.0 <= engine.get_status()['MGC']['time_to_first_decision'] < 3.0
+
+    started = time.perf_counter()
+    engine.stop()
+    thread.join(5)
+    assert not thread.is_alive() and time.perf_counter() - started < 1.0
+
+    engine.start()
+    assert engine._thread is not thread and engine.is_running
+    engine.stop()
+    engine._thread.join(5)
+    assert engine.get_status()['MGC']['iterations'] == 2
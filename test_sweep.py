@@ -0,0 +1,32 @@
+"""Tests for the parallel parameter sweep (doesn't require API client)."""
+
+import numpy as np
+
+from backtest import run_backtest, summarize
+from simulator import random_walk_bars
+from sweep import format_table, run_sweep
+
+
+def test_sweep_matches_single_backtests():
+    """Every combination is run once and matches a direct backtest."""
+    bars = {'MGC': random_walk_bars(5000, 1), 'MES': random_walk_bars(5000, 2)}
+    results = run_sweep(bars, deviations=[1.0, 2.0], intervals=[60, 300], lookbacks=[30, 120],
+                        workers=2)
+
+    assert len(results) == 16
+    pnl = [result['total_pnl'] for result in results]
+    assert pnl == sorted(pnl, reverse=True)
+
+    for result in results:
+        trades = run_backtest(bars[result['instrument']], result['deviation'],
+                              result['interval'], result['lookback'])
+        assert result['trades'] == summarize(trades)['trades']
+        assert np.isclose(result['total_pnl'], summarize(trades)['total_pnl'])
+
+
+def test_format_table():
+    """The table has a header, a rule and one row per result."""
+    results = run_sweep({'MGC': random_walk_bars(2000)}, [1.0], [60, 120], [30], workers=1)
+    lines = format_table(results).splitlines()
+    assert len(lines) == 4
+    assert lines[2].split()[:2] == ['1', 'MGC']
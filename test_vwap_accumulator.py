@@ -0,0 +1,178 @@
+"""Tests for the streaming VWAP accumulator (doesn't require API client)."""
+
+import numpy as np
+import pandas as pd
+
+from simulator import random_walk_bars
+from vwap_accumulator import VWAPAccumulator
+
+
+def reference_vwap(data):
+    """VWAP computed the same way as VWAPStrategy.calculate_vwap."""
+    typical_price = (data['high'] + data['low'] + data['close']) / 3.0
+    return float((typical_price * data['volume']).sum() / data['volume'].sum())
+
+
+def reference_std(data):
+    """Volume-weighted standard deviation of the typical price, in two passes."""
+    typical_price = (data['high'] + data['low'] + data['close']) / 3.0
+    vwap = reference_vwap(data)
+    return float(np.sqrt(((typical_price - vwap) ** 2 * data['volume']).sum() / data['volume'].sum()))
+
+
+def make_bars(n, start='2024-01-02 14:00', seed=0):
+    """Random-walk 1-minute OHLCV bars starting at ``start``."""
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=n, freq='1min'),
+        **random_walk_bars(n, seed, volatility=0.5, wick=1.0, max_volume=500),
+    })
+
+
+def test_append_matches_reference():
+    """Appending bars gives the same VWAP as the full recompute."""
+    bars = make_bars(240)
+    acc = VWAPAccumulator()
+    for row in bars.itertuples():
+        acc.append(row.high, row.low, row.close, row.volume, row.timestamp)
+
+    assert len(acc) == 240
+    assert np.isclose(acc.vwap, reference_vwap(bars), rtol=0, atol=1e-9)
+
+
+def test_replace_last_bar():
+    """Revising the forming bar replaces its contribution."""
+    bars = make_bars(10)
+    acc = VWAPAccumulator()
+    for row in bars.itertuples():
+        acc.update(row.high, row.low, row.close, row.volume, row.timestamp)
+
+    revised = bars.copy()
+    revised.loc[9, ['high', 'close', 'volume']] = [2100.0, 2099.0, 900.0]
+    last = revised.iloc[9]
+    acc.update(last['high'], last['low'], last['close'], last['volume'], last['timestamp'])
+
+    assert len(acc) == 10
+    assert np.isclose(acc.vwap, reference_vwap(revised), rtol=0, atol=1e-9)
+
+
+def test_sync_sliding_window():
+    """Syncing successive overlapping windows tracks the full recompute."""
+    bars = make_bars(600)
+    acc = VWAPAccumulator()
+    for end in range(240, 600, 7):
+        window = bars.iloc[end - 240:end].reset_index(drop=True)
+        vwap = acc.sync(window)
+        assert len(acc) == 240
+        assert np.isclose(vwap, reference_vwap(window), rtol=0, atol=1e-9)
+
+
+def test_sync_does_not_mutate_frame():
+    """Syncing leaves the caller's frame untouched."""
+    bars = make_bars(20)
+    columns = list(bars.columns)
+    VWAPAccumulator().sync(bars)
+    assert list(bars.columns) == columns
+
+
+def test_sync_without_timestamps():
+    """Frames without timestamps are reloaded in full."""
+    bars = make_bars(30).drop(columns=['timestamp'])
+    acc = VWAPAccumulator()
+    acc.sync(bars)
+    acc.sync(bars)
+    assert len(acc) == 30
+    assert np.isclose(acc.vwap, reference_vwap(bars), rtol=0, atol=1e-9)
+
+
+def test_sync_sorts_unsorted_bars():
+    """Bars out of time order are sorted, so later syncs stay incremental."""
+    full = make_bars(31)
+    bars, later = full.iloc[:30], full.iloc[1:]
+    shuffled = bars.iloc[np.random.default_rng(1).permutation(30)]
+    acc = VWAPAccumulator()
+    acc.sync(shuffled)
+    acc.sync(shuffled)
+    assert len(acc) == 30 and acc.last_timestamp == bars['timestamp'].iloc[-1]
+    assert np.isclose(acc.vwap, reference_vwap(bars), rtol=0, atol=1e-9)
+
+    acc.sync(later)
+    assert len(acc) == 30
+    assert np.isclose(acc.vwap, reference_vwap(later), rtol=0, atol=1e-9)
+
+    # Bars accumulated without timestamps are reloaded, not compared with them
+    acc.sync(bars.drop(columns=['timestamp']))
+    acc.sync(bars)
+    assert len(acc) == 30 and acc.last_timestamp == bars['timestamp'].iloc[-1]
+
+
+def test_zero_volume():
+    """A window without volume has no VWAP."""
+    acc = VWAPAccumulator()
+    acc.append(100, 99, 99.5, 0)
+    assert acc.vwap is None
+
+
+def test_max_bars():
+    """The oldest bar is evicted once max_bars is exceeded."""
+    bars = make_bars(50)
+    acc = VWAPAccumulator(max_bars=20)
+    for row in bars.itertuples():
+        acc.append(row.high, row.low, row.close, row.volume, row.timestamp)
+
+    assert len(acc) == 20
+    assert np.isclose(acc.vwap, reference_vwap(bars.iloc[-20:]), rtol=0, atol=1e-9)
+
+
+def test_std_tracks_sliding_window():
+    """Appends, revisions and evictions keep the running std exact."""
+    bars = make_bars(600)
+    acc = VWAPAccumulator()
+    for end in range(240, 600, 7):
+        window = bars.iloc[end - 240:end].reset_index(drop=True)
+        acc.sync(window)
+        assert np.isclose(acc.std, reference_std(window), rtol=1e-9, atol=0)
+
+    revised = window.copy()
+    revised.loc[239, ['high', 'close', 'volume']] = [2100.0, 2099.0, 900.0]
+    acc.sync(revised)
+    assert np.isclose(acc.std, reference_std(revised), rtol=1e-9, atol=0)
+
+
+def test_std_is_stable_at_high_prices():
+    """A small spread on a large price level does not cancel to zero or NaN."""
+    bars = make_bars(300)
+    for column in ('open', 'high', 'low', 'close'):
+        bars[column] = bars[column] - 2000 + 1e8
+    acc = VWAPAccumulator(max_bars=100)
+    for row in bars.itertuples():
+        acc.append(row.high, row.low, row.close, row.volume, row.timestamp)
+
+    assert np.isclose(acc.std, reference_std(bars.iloc[-100:]), rtol=1e-6, atol=0)
+
+    single = VWAPAccumulator()
+    single.append(101, 99, 100, 5)
+    assert single.std == 0.0
+    single.pop_oldest()
+    assert single.std is None
+
+
+def test_stddev_bands_scale_with_dispersion():
+    """In stddev mode the entry bands sit a multiple of the running std from VWAP."""
+    import pytest
+    from vwap_strategy import VWAPStrategy
+
+    bars = make_bars(240)
+    strategy = VWAPStrategy(vwap_deviation=2.0, client=object(), band_mode='stddev')
+    assert strategy.band_width() is None
+    assert strategy.decide_entry(2000.0, 1000.0) is None
+
+    vwap = strategy.update_vwap(bars)
+    std = reference_std(bars)
+    assert np.isclose(strategy.band_width(), 2.0 * std)
+    assert strategy.decide_entry(vwap, vwap + 1.9 * std) is None
+    side, price = strategy.decide_entry(vwap, vwap + 2.1 * std)
+    assert side == 'SELL' and np.isclose(price, vwap + 2.0 * std)
+    assert not strategy.needs_evaluation(vwap - 1.9 * std)
+
+    with pytest.raises(ValueError):
+        VWAPStrategy(client=object(), band_mode='percent')
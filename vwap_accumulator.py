@@ -0,0 +1,255 @@
+"""Streaming VWAP accumulator with constant-time bar updates."""
+
+import math
+import logging
+from collections import deque
+from typing import Any, Deque, Optional, Tuple
+
+import numpy as np
+
+from bars import bar_count
+
+logger = logging.getLogger(__name__)
+
+
+class VWAPAccumulator:
+    """Running VWAP over a sliding window of bars.
+
+    Holds running sum(price * volume) and sum(volume) so that appending a bar,
+    revising the still-forming last bar and evicting the oldest bar are all
+    O(1). The typical price is (high + low + close) / 3, matching
+    ``VWAPStrategy.calculate_vwap``.
+
+    The volume-weighted variance of the typical price around VWAP is kept
+    alongside with West's weighted form of Welford's algorithm (run in
+    reverse to remove a bar), which avoids the cancellation of
+    sum(p^2 * v) - VWAP^2 * sum(v) when prices are large and spread is small.
+    """
+
+    def __init__(self, max_bars: Optional[int] = None):
+        """
+        Initialize the accumulator.
+
+        Args:
+            max_bars: Optional cap on the number of bars kept; the oldest bar is
+                evicted when the cap is exceeded
+        """
+        self.max_bars = max_bars
+        # (timestamp, pv, volume, typical price) per bar, oldest first
+        self._bars: Deque[Tuple[Any, float, float, float]] = deque()
+        self._sum_pv = 0.0
+        self._sum_volume = 0.0
+        # Running weighted mean and sum of v * (p - mean)^2 for the variance
+        self._mean = 0.0
+        self._m2 = 0.0
+        # Subtractions since the last exact re-sum, used to bound float drift
+        self._removals = 0
+
+    def __len__(self) -> int:
+        return len(self._bars)
+
+    @property
+    def vwap(self) -> Optional[float]:
+        """Current VWAP, or None if there is no volume in the window."""
+        if not self._bars or self._sum_volume == 0:
+            return None
+        return float(self._sum_pv / self._sum_volume)
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Volume-weighted variance of the typical price around VWAP."""
+        if not self._bars or self._sum_volume <= 0:
+            return None
+        return max(self._m2 / self._sum_volume, 0.0)
+
+    @property
+    def std(self) -> Optional[float]:
+        """Volume-weighted standard deviation of the typical price around VWAP."""
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+    @property
+    def total_volume(self) -> float:
+        """Sum of volume over the bars in the window."""
+        return self._sum_volume
+
+    @property
+    def last_timestamp(self) -> Optional[Any]:
+        """Timestamp of the most recent bar, if any."""
+        return self._bars[-1][0] if self._bars else None
+
+    @property
+    def first_timestamp(self) -> Optional[Any]:
+        """Timestamp of the oldest bar, if any."""
+        return self._bars[0][0] if self._bars else None
+
+    def reset(self):
+        """Drop all bars and zero the running sums."""
+        self._bars.clear()
+        self._sum_pv = 0.0
+        self._sum_volume = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._removals = 0
+
+    def append(self, high: float, low: float, close: float, volume: float,
+               timestamp: Any = None):
+        """Append a new bar to the window."""
+        volume = float(volume)
+        price = (float(high) + float(low) + float(close)) / 3.0
+        pv = price * volume
+        self._bars.append((timestamp, pv, volume, price))
+        self._sum_pv += pv
+        self._sum_volume += volume
+        if volume > 0:
+            delta = price - self._mean
+            self._mean += delta * volume / self._sum_volume
+            self._m2 += volume * delta * (price - self._mean)
+
+        if self.max_bars is not None and len(self._bars) > self.max_bars:
+            self.pop_oldest()
+
+    def replace_last(self, high: float, low: float, close: float, volume: float,
+                     timestamp: Any = None):
+        """Replace the most recent bar with a revised version of it."""
+        if not self._bars:
+            self.append(high, low, close, volume, timestamp)
+            return
+
+        old_timestamp, old_pv, old_volume, old_price = self._bars.pop()
+        self._sum_pv -= old_pv
+        self._sum_volume -= old_volume
+        self._remove_variance(old_price, old_volume)
+        self._note_removal()
+        self.append(high, low, close, volume,
+                    old_timestamp if timestamp is None else timestamp)
+
+    def update(self, high: float, low: float, close: float, volume: float,
+               timestamp: Any):
+        """Append a bar, or revise the last bar if it has the same timestamp."""
+        if self._bars and self._bars[-1][0] == timestamp:
+            self.replace_last(high, low, close, volume, timestamp)
+        else:
+            self.append(high, low, close, volume, timestamp)
+
+    def pop_oldest(self):
+        """Evict the oldest bar from the window."""
+        if not self._bars:
+            return
+        _, pv, volume, price = self._bars.popleft()
+        self._sum_pv -= pv
+        self._sum_volume -= volume
+        self._remove_variance(price, volume)
+        self._note_removal()
+
+    def evict_before(self, timestamp: Any) -> int:
+        """
+        Evict bars older than a timestamp.
+
+        Args:
+            timestamp: Bars with a timestamp strictly before this are dropped
+
+        Returns:
+            Number of bars evicted
+        """
+        evicted = 0
+        while self._bars and self._bars[0][0] < timestamp:
+            self.pop_oldest()
+            evicted += 1
+        return evicted
+
+    def sync(self, data) -> Optional[float]:
+        """
+        Bring the window in line with freshly fetched bars.
+
+        Only bars newer than the last accumulated bar are added, the last bar is
+        revised in place and bars that fell out of the frame are evicted, so a
+        refetch of an unchanged window costs O(1) accumulator updates. Bars
+        out of time order are sorted first; bars without timestamps are
+        loaded from scratch.
+
+        Args:
+            data: ``Bars`` column arrays, or a DataFrame, with high, low,
+                close and volume columns and a ``timestamp`` column (or a
+                DatetimeIndex), oldest bar first
+
+        Returns:
+            VWAP after the update, or None if there is no volume
+        """
+        if not bar_count(data):
+            self.reset()
+            return None
+
+        timestamps = _bar_timestamps(data)
+        high = np.asarray(data['high'], dtype=float)
+        low = np.asarray(data['low'], dtype=float)
+        close = np.asarray(data['close'], dtype=float)
+        volume = np.asarray(data['volume'], dtype=float)
+
+        if timestamps is None:
+            self._load(high, low, close, volume, [None] * len(close))
+            return self.vwap
+        if len(timestamps) > 1 and not (timestamps[1:] >= timestamps[:-1]).all():
+            logger.debug("Bar timestamps are not sorted, sorting them")
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, high, low, close, volume = (
+                column[order] for column in (timestamps, high, low, close, volume))
+        if self._bars and self.last_timestamp is None:
+            # Bars loaded without timestamps cannot be lined up with these
+            self.reset()
+
+        self.evict_before(timestamps[0])
+        last = self.last_timestamp
+        start = 0
+        if last is not None:
+            pos = int(np.searchsorted(timestamps, last))
+            if pos < len(timestamps) and timestamps[pos] == last:
+                self.replace_last(high[pos], low[pos], close[pos], volume[pos], last)
+                start = pos + 1
+            else:
+                # Our last bar is not in the frame; the windows do not line up
+                self.reset()
+
+        for i in range(start, len(timestamps)):
+            self.append(high[i], low[i], close[i], volume[i], timestamps[i])
+        return self.vwap
+
+    def _load(self, high, low, close, volume, timestamps):
+        """Reset and load bars from column arrays."""
+        self.reset()
+        for i in range(len(high)):
+            self.append(high[i], low[i], close[i], volume[i], timestamps[i])
+
+    def _remove_variance(self, price: float, volume: float):
+        """Undo a bar's Welford update; ``_sum_volume`` already excludes it."""
+        if volume <= 0:
+            return
+        if self._sum_volume <= 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = price - self._mean
+        self._mean -= delta * volume / self._sum_volume
+        self._m2 -= volume * delta * (price - self._mean)
+
+    def _note_removal(self):
+        """Re-sum exactly once enough subtractions may have accumulated error."""
+        self._removals += 1
+        if self._removals >= max(len(self._bars), 64):
+            self._sum_pv = math.fsum(bar[1] for bar in self._bars)
+            self._sum_volume = math.fsum(bar[2] for bar in self._bars)
+            if self._sum_volume > 0:
+                self._mean = self._sum_pv / self._sum_volume
+                self._m2 = math.fsum(bar[2] * (bar[3] - self._mean) ** 2 for bar in self._bars)
+            else:
+                self._mean = self._m2 = 0.0
+            self._removals = 0
+
+
+def _bar_timestamps(data) -> Optional[np.ndarray]:
+    """Return bar timestamps, or None if the bars have none."""
+    if 'timestamp' in data:
+        return np.asarray(data['timestamp'])
+    if hasattr(data, 'index') and getattr(data.index, 'inferred_type', None) == 'datetime64':
+        return data.index.to_numpy()
+    return None
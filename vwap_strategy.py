@@ -4,9 +4,23 @@ import time
 import datetime
 import os
 import logging
-from typing import Optional
-import pandas as pd
-from project_x_py import ProjectX
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from bar_cache import BarCache
+from bars import Bars, BarNormalizer, bar_count, empty_bars, slice_bars
+from bar_store import BarStore
+from deadlines import deadline
+from journal import JournalWriter, bars_fingerprint
+import metrics
+from order_book import OrderBook, WorkingOrder
+from positions import Position, PositionTracker
+from scheduler import Scheduler
+from sessions import create_session_anchor
+from snapshots import StrategySnapshot
+from vwap_accumulator import VWAPAccumulator
 
 # Configure logging
 logging.basicConfig(
@@ -15,6 +29,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# How vwap_deviation sets the entry bands: a fixed price offset from VWAP, or
+# a multiple of the volume-weighted standard deviation of price around VWAP
+BAND_MODES = ('fixed', 'stddev')
+
+# Bars kept in memory for session-anchored VWAP: a full trading week
+SESSION_CACHE_BARS = 7 * 24 * 60
+
+
+def create_client():
+    """
+    Create a ProjectX client from the environment.
+    
+    Returns:
+        Authenticated ProjectX client
+    """
+    api_key = os.getenv('PROJECT_X_API_KEY')
+    username = os.getenv('PROJECT_X_USERNAME')
+    
+    if not api_key or not username:
+        raise ValueError(
+            "PROJECT_X_API_KEY and PROJECT_X_USERNAME environment variables must be set"
+        )
+    
+    try:
+        # Imported on first use: it is slow to import and only needed when no
+        # client is injected (project-x-py does not install on Windows)
+        from project_x_py import ProjectX
+    except ImportError as e:
+        raise ImportError("project-x-py must be installed to create a ProjectX client") from e
+    
+    try:
+        # Try from_env() method first (common in project-x-py)
+        return ProjectX.from_env()
+    except (AttributeError, TypeError):
+        # Fallback to direct initialization
+        return ProjectX(api_key=api_key, username=username)
+
 
 class VWAPStrategy:
     """VWAP-based automated trading strategy for TopstepX."""
@@ -24,7 +75,18 @@ class VWAPStrategy:
         vwap_deviation: float = 2.0,
         timer_interval: int = 1800,  # 30 minutes in seconds
         contract_size: int = 1,
-        instrument: str = 'MGC'
+        instrument: str = 'MGC',
+        bar_store: Optional[BarStore] = None,
+        client=None,
+        order_reconcile_interval: float = 300.0,
+        order_price_tolerance: float = 0.0,
+        position_tracker: Optional[PositionTracker] = None,
+        position_reconcile_interval: float = 60.0,
+        band_mode: str = 'fixed',
+        anchor: str = 'rolling',
+        anchor_time: Optional[str] = None,
+        journal: Optional[JournalWriter] = None,
+        iteration_budget: Optional[float] = None
     ):
         """
         Initialize the VWAP strategy.
@@ -34,117 +96,222 @@ class VWAPStrategy:
             timer_interval: Time interval between order checks in seconds (default: 1800 = 30 min)
             contract_size: Fixed contract size per trade
             instrument: Trading instrument (default: MGC for Micro Gold Future)
+            bar_store: Optional on-disk bar store read before the API is queried
+            client: ProjectX client to use; a new one is created from the
+                environment if omitted
+            order_reconcile_interval: Seconds between reconciles of the local
+                order book with get_orders
+            order_price_tolerance: Price change up to which a working order
+                is kept instead of being amended or replaced
+            position_tracker: Tracker shared with other strategies on the
+                same client; a private one is created if omitted
+            position_reconcile_interval: Seconds between reconciles of a
+                private position tracker with the broker's positions
+            band_mode: 'fixed' to place the bands ``vwap_deviation`` price
+                points from VWAP, 'stddev' to place them ``vwap_deviation``
+                volume-weighted standard deviations from VWAP
+            anchor: 'rolling' for VWAP over the last ``lookback_minutes``
+                bars, or 'globex', 'rth', 'weekly' or 'custom' for VWAP
+                since the start of the current session
+            anchor_time: Exchange-local anchor for 'custom', either a daily
+                'HH:MM' or a fixed 'YYYY-MM-DDTHH:MM'
+            journal: Optional journal that decisions and order calls are
+                recorded in
+            iteration_budget: Seconds the client calls of one iteration may
+                take in total when the client enforces deadlines (see
+                ``deadlines.DeadlineClient``); None for no budget
         """
+        if band_mode not in BAND_MODES:
+            raise ValueError(f"Unknown band mode: {band_mode!r} (expected one of {BAND_MODES})")
+
         self.vwap_deviation = vwap_deviation
+        self.band_mode = band_mode
         self.timer_interval = timer_interval
         self.contract_size = contract_size
         self.instrument = instrument
         
-        # Initialize ProjectX client
-        api_key = os.getenv('PROJECT_X_API_KEY')
-        username = os.getenv('PROJECT_X_USERNAME')
-        
-        if not api_key or not username:
-            raise ValueError(
-                "PROJECT_X_API_KEY and PROJECT_X_USERNAME environment variables must be set"
-            )
-        
-        try:
-            # Try from_env() method first (common in project-x-py)
-            self.client = ProjectX.from_env()
-        except (AttributeError, TypeError):
-            # Fallback to direct initialization
-            self.client = ProjectX(api_key=api_key, username=username)
+        # Initialize ProjectX client unless a shared one was provided; calls are timed
+        self.client = metrics.instrument_client(client if client is not None else create_client())
         
         self.current_order_id: Optional[str] = None
+        self.order_book = OrderBook(order_reconcile_interval)
+        self.order_price_tolerance = order_price_tolerance
+        self.position_tracker = position_tracker if position_tracker is not None else PositionTracker(position_reconcile_interval)
+        self.bar_store = bar_store
+        self.anchor = anchor
+        self.session_anchor = create_session_anchor(anchor, instrument, anchor_time)
+        self.session_start: Optional[datetime.datetime] = None
+        self.bar_cache = BarCache(SESSION_CACHE_BARS) if self.session_anchor is not None else BarCache()
+        self.bar_normalizer = BarNormalizer()
+        self.vwap_accumulator = VWAPAccumulator()
+        self._vwap_lock = threading.Lock()
+        # Latest published state, replaced (never modified) after each evaluation
+        self.snapshot: Optional[StrategySnapshot] = None
+        self._stop_event = threading.Event()
+        self.journal = journal
+        self.iteration = 0
+        self.iteration_budget = iteration_budget
+        # Inputs the last iteration took from cached state because a read failed
+        self.degraded: List[str] = []
         
-        logger.info(f"Strategy initialized: deviation={vwap_deviation}, "
+        logger.info(f"Strategy initialized: deviation={vwap_deviation} ({band_mode}), "
                    f"interval={timer_interval}s, size={contract_size}, instrument={instrument}")
     
-    def fetch_market_data(self, lookback_minutes: int = 240) -> pd.DataFrame:
+    def fetch_market_data(self, lookback_minutes: int = 240) -> Bars:
         """
         Fetch historical market data for VWAP calculation.
         
+        Bars are kept in ``self.bar_cache`` between calls, so after the first
+        call only bars from the last cached one onward are requested. When a
+        bar store is configured, closed bars are read from and persisted to it
+        and the API is only asked for ranges the store does not cover. The
+        returned arrays are shared with the cache and are read-only.
+        
+        With a session anchor the window starts at the current session's
+        open instead. Bars of a new session are fetched as deltas like any
+        other, and bars of the previous session are evicted from the cache
+        (and from the VWAP accumulator by ``update_vwap``), which resets the
+        session VWAP without refetching the session.
+        
         Args:
             lookback_minutes: Number of minutes of historical data to fetch
+                when VWAP is not session-anchored
             
         Returns:
-            DataFrame with market data
+            ``Bars`` column arrays (timestamp, open, high, low, close, volume),
+            oldest bar first
         """
         try:
             end_time = datetime.datetime.utcnow()
-            start_time = end_time - datetime.timedelta(minutes=lookback_minutes)
+            if self.session_anchor is not None:
+                window_start = self.session_anchor.session_start(end_time)
+                if window_start != self.session_start:
+                    logger.info(f"VWAP session ({self.anchor}) started at {window_start} UTC")
+                    self.session_start = window_start
+            else:
+                window_start = end_time - datetime.timedelta(minutes=lookback_minutes)
+            start_time = self.bar_cache.fetch_start(window_start)
+            if self.bar_store is not None and start_time == window_start:
+                start_time = self._load_from_bar_store(window_start, end_time)
+            is_delta = start_time != window_start
             
-            # Try different possible method signatures
-            try:
-                data = self.client.get_historical_data(
-                    instrument=self.instrument,
-                    start=start_time.isoformat(),
-                    end=end_time.isoformat(),
-                    interval='1m'
-                )
-            except (TypeError, AttributeError):
-                # Try alternative parameter names
-                data = self.client.get_historical_data(
-                    symbol=self.instrument,
-                    start=start_time,
-                    end=end_time,
-                    interval='1m'
-                )
+            data = self._get_historical_data(start_time, end_time)
+            fetched = self._normalize_market_data(data)
             
-            df = pd.DataFrame(data)
-            if df.empty:
+            if not bar_count(fetched) and not is_delta:
                 logger.warning("No market data retrieved")
-                return df
+                return fetched
             
-            # Ensure required columns exist
-            required_columns = ['open', 'high', 'low', 'close', 'volume']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                logger.error(f"Missing required columns: {missing_columns}")
-                return pd.DataFrame()
+            if bar_count(fetched) and 'timestamp' not in fetched:
+                # Bars cannot be keyed by time, so serve the full window uncached
+                self.bar_cache.clear()
+                return fetched
             
-            # Convert timestamp if needed
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-            elif df.index.name == 'timestamp' or isinstance(df.index, pd.DatetimeIndex):
-                pass  # Already datetime indexed
-            else:
-                # Try to infer timestamp column
-                for col in df.columns:
-                    if 'time' in col.lower() or 'date' in col.lower():
-                        df['timestamp'] = pd.to_datetime(df[col])
-                        break
-            
-            return df
+            self.bar_cache.merge(fetched, start_time)
+            self.bar_cache.evict_before(window_start)
+            if self.bar_store is not None:
+                self._store_closed_bars(fetched, window_start, end_time)
+            bars = self.bar_cache.to_bars()
+            if not bar_count(bars):
+                logger.warning("No market data retrieved")
+            return bars
             
         except Exception as e:
+            cached = self.bar_cache.to_bars()
+            if bar_count(cached):
+                # Decide on the bars we have rather than skip the interval
+                logger.warning(f"Error fetching market data, using {bar_count(cached)} cached bars: {e}")
+                self._degrade('bars')
+                return cached
             logger.error(f"Error fetching market data: {e}")
-            return pd.DataFrame()
+            return empty_bars()
     
-    def calculate_vwap(self, data: pd.DataFrame) -> Optional[float]:
+    def _load_from_bar_store(self, window_start: datetime.datetime,
+                             end_time: datetime.datetime) -> datetime.datetime:
+        """
+        Seed the bar cache with closed bars from the bar store.
+        
+        Ranges of the window the store has not seen are fetched from the API
+        and persisted first.
+        
+        Returns:
+            Start time for fetching the bars the store cannot hold yet
+        """
+        closed_end = _minute_floor(end_time)
+        for gap_start, gap_end in self.bar_store.missing_ranges(self.instrument, window_start, closed_end):
+            gap = self._normalize_market_data(self._get_historical_data(gap_start, gap_end))
+            if bar_count(gap) and 'timestamp' not in gap:
+                # Bars without timestamps cannot be stored
+                return window_start
+            self._store_closed_bars(gap, gap_start, gap_end)
+        
+        stored = self.bar_store.read(self.instrument, window_start, closed_end)
+        if not bar_count(stored):
+            return window_start
+        self.bar_cache.merge(stored, window_start)
+        return max(stored['timestamp'][-1].astype('datetime64[us]').item(), window_start)
+    
+    def _store_closed_bars(self, bars: Bars, start_time: datetime.datetime,
+                           end_time: datetime.datetime):
+        """
+        Persist bars that closed before ``end_time`` and mark the span they cover.
+        
+        Only the span from the first to the end of the last stored bar is
+        marked, so parts of the range that returned no bars, e.g. during an
+        outage, are fetched again.
+        """
+        if not bar_count(bars):
+            return
+        closed_end = _minute_floor(end_time)
+        closed = slice_bars(bars, bars['timestamp'] < np.datetime64(closed_end, 'ns'))
+        if not bar_count(closed):
+            return
+        self.bar_store.append(self.instrument, closed)
+        first, last = (closed['timestamp'][i].astype('datetime64[us]').item() for i in (0, -1))
+        self.bar_store.mark_covered(self.instrument, max(first, start_time),
+                                    min(last + datetime.timedelta(minutes=1), closed_end))
+    
+    def _get_historical_data(self, start_time: datetime.datetime, end_time: datetime.datetime):
+        """Request 1-minute bars between two times from the client."""
+        # Try different possible method signatures
+        try:
+            return self.client.get_historical_data(
+                instrument=self.instrument,
+                start=start_time.isoformat(),
+                end=end_time.isoformat(),
+                interval='1m'
+            )
+        except (TypeError, AttributeError):
+            # Try alternative parameter names
+            return self.client.get_historical_data(
+                symbol=self.instrument,
+                start=start_time,
+                end=end_time,
+                interval='1m'
+            )
+    
+    def _normalize_market_data(self, data) -> Bars:
+        """Convert a historical data response into ``Bars`` column arrays."""
+        return self.bar_normalizer.normalize(data)
+    
+    def calculate_vwap(self, data: Bars) -> Optional[float]:
         """
         Calculate Volume Weighted Average Price (VWAP).
         
         Args:
-            data: DataFrame with OHLCV data
+            data: ``Bars`` or DataFrame with OHLCV data
             
         Returns:
             VWAP value or None if calculation fails
         """
-        if data.empty or len(data) < 1:
+        if not bar_count(data):
             logger.warning("Insufficient data for VWAP calculation")
             return None
         
         try:
-            # Calculate typical price
-            data['typical_price'] = (data['high'] + data['low'] + data['close']) / 3.0
-            
-            # Calculate price * volume
-            data['pv'] = data['typical_price'] * data['volume']
-            
-            # Calculate VWAP
-            total_pv = data['pv'].sum()
+            # Calculate typical price * volume without touching the caller's bars
+            typical_price = (data['high'] + data['low'] + data['close']) / 3.0
+            total_pv = (typical_price * data['volume']).sum()
             total_volume = data['volume'].sum()
             
             if total_volume == 0:
@@ -158,6 +325,35 @@ class VWAPStrategy:
             logger.error(f"Error calculating VWAP: {e}")
             return None
     
+    def update_vwap(self, data: Bars) -> Optional[float]:
+        """
+        Feed fetched market data into the running VWAP accumulator.
+        
+        Only bars that changed since the previous call are applied, so calling
+        this every few seconds costs O(1) regardless of the lookback window.
+        
+        Args:
+            data: Bars with OHLCV data as returned by fetch_market_data
+            
+        Returns:
+            VWAP value or None if calculation fails
+        """
+        if not bar_count(data):
+            logger.warning("Insufficient data for VWAP calculation")
+            return None
+        
+        with self._vwap_lock, metrics.timed(metrics.VWAP_SECONDS, self.instrument):
+            try:
+                vwap = self.vwap_accumulator.sync(data)
+            except Exception as e:
+                logger.error(f"Error updating VWAP: {e}")
+                self.vwap_accumulator.reset()
+                return None
+        
+        if vwap is None:
+            logger.warning("Total volume is zero, cannot calculate VWAP")
+        return vwap
+    
     def get_current_price(self) -> Optional[float]:
         """
         Get current market price for the instrument.
@@ -167,20 +363,38 @@ class VWAPStrategy:
         """
         try:
             market_data = self.client.get_market_data(self.instrument)
-            
-            # Try different possible keys for price
-            price_keys = ['last_price', 'price', 'close', 'last', 'current_price']
-            for key in price_keys:
-                if key in market_data:
-                    return float(market_data[key])
-            
-            logger.warning("Could not find price in market data")
-            return None
+            price = extract_price(market_data)
+            if price is None:
+                logger.warning("Could not find price in market data")
+            return price
             
         except Exception as e:
+            cached = self.bar_cache.to_bars()
+            if bar_count(cached):
+                price = float(cached['close'][-1])
+                logger.warning(f"Error getting current price, using last bar close {price}: {e}")
+                self._degrade('price')
+                return price
             logger.error(f"Error getting current price: {e}")
             return None
     
+    def get_position(self) -> Position:
+        """
+        Get the position in the instrument from the position tracker.
+        
+        The tracker is reconciled with get_positions only when it is due.
+        
+        Returns:
+            Signed quantity, side and average price of the position
+        """
+        if self.position_tracker.needs_reconcile():
+            self.reconcile_positions()
+        return self.position_tracker.get(self.instrument)
+    
+    def reconcile_positions(self):
+        """Replace the tracked positions with the broker's."""
+        self.position_tracker.reconcile(self.client.get_positions())
+    
     def has_open_position(self) -> bool:
         """
         Check if there is an open position.
@@ -189,70 +403,239 @@ class VWAPStrategy:
             True if open position exists, False otherwise
         """
         try:
-            positions = self.client.get_positions()
-            if not positions:
-                return False
-            
-            # Check for positions in the target instrument
-            for pos in positions:
-                instrument_match = pos.get('instrument') == self.instrument or pos.get('symbol') == self.instrument
-                quantity = pos.get('quantity', 0) or pos.get('size', 0)
-                if instrument_match and quantity != 0:
-                    return True
-            
+            if self.get_position().is_open:
+                # A fill may have consumed our working order
+                self.order_book.mark_stale()
+                return True
             return False
             
         except Exception as e:
-            logger.error(f"Error checking positions: {e}")
-            return False
+            position = self.position_tracker.get(self.instrument)
+            logger.warning(f"Error checking positions, using tracked position {position.quantity}: {e}")
+            self._degrade('position')
+            return position.is_open
+    
+    def _degrade(self, source: str):
+        """Note that this iteration uses cached state for an input."""
+        self.degraded.append(source)
+        metrics.STRATEGY_DEGRADED.labels(self.instrument, source).inc()
     
     def cancel_all_orders(self):
         """Cancel all open orders for the instrument."""
         try:
             orders = self.client.get_orders(status='OPEN')
-            if not orders:
-                return
-            
-            for order in orders:
-                instrument_match = (
-                    order.get('instrument') == self.instrument or 
-                    order.get('symbol') == self.instrument
-                )
-                if instrument_match:
-                    order_id = order.get('id') or order.get('order_id')
-                    if order_id:
-                        self.client.cancel_order(order_id)
-                        logger.info(f"Cancelled order: {order_id}")
-                        if order_id == self.current_order_id:
-                            self.current_order_id = None
+            for order_id in self._instrument_order_ids(orders):
+                self._cancel_order(order_id)
+            self.order_book.reconcile(self.instrument, [])
             
         except Exception as e:
             logger.error(f"Error cancelling orders: {e}")
+            self.order_book.mark_stale()
+    
+    def _instrument_order_ids(self, orders) -> List[str]:
+        """IDs of the orders in a get_orders response that are for our instrument."""
+        order_ids = []
+        for order in orders or []:
+            instrument_match = (
+                order.get('instrument') == self.instrument or 
+                order.get('symbol') == self.instrument
+            )
+            if instrument_match:
+                order_id = order.get('id') or order.get('order_id')
+                if order_id:
+                    order_ids.append(order_id)
+        return order_ids
+    
+    def _cancel_order(self, order_id: str) -> bool:
+        """
+        Cancel one order and forget it if it was our working order.
+        
+        Returns:
+            False if the order had already finished, e.g. filled, before the
+            cancel reached it; a fill in the response is applied to the
+            position tracker, which is reconciled before it is trusted again
+        """
+        started = time.perf_counter()
+        try:
+            response = self.client.cancel_order(order_id)
+        except Exception:
+            self._journal_order('cancel', False, started, order_id=order_id)
+            raise
+        order = self.order_book.remove(order_id)
+        if order_id == self.current_order_id:
+            self.current_order_id = None
+        
+        status = str(response.get('status') or '').upper() if isinstance(response, dict) else ''
+        if status not in ('', 'CANCELLED', 'CANCELED'):
+            self._journal_order('cancel', False, started, order_id=order_id)
+            logger.warning(f"Order {order_id} was {status} before it could be cancelled")
+            side = order.side if order is not None else response.get('side')
+            if side:
+                self._record_fill(order_id, side, response)
+            self.position_tracker.mark_stale()
+            return False
+        self._journal_order('cancel', True, started, order_id=order_id)
+        logger.info(f"Cancelled order: {order_id}")
+        return True
+    
+    def reconcile_orders(self) -> bool:
+        """
+        Replace the local order book with the broker's open orders.
+        
+        Returns:
+            True if orders we did not cancel were gone, in which case the
+            positions were reconciled as well
+        """
+        believed = {order.order_id for order in self.order_book.for_instrument(self.instrument)}
+        orders = self.client.get_orders(status='OPEN')
+        self.order_book.reconcile(self.instrument, orders)
+        working = self.order_book.for_instrument(self.instrument)
+        self.current_order_id = working[-1].order_id if working else None
+        
+        if believed - {order.order_id for order in working}:
+            # They may have filled: check now, before another order is placed
+            self.position_tracker.mark_stale()
+            self.reconcile_positions()
+            return True
+        return False
+    
+    def _plan_order(self, side: str, price: float) -> Tuple[str, List[WorkingOrder]]:
+        """
+        Decide how to get a limit order working at a price.
+        
+        Returns:
+            The action, 'keep' (an equal order is already working), 'amend'
+            (move the single working order) or 'replace' (cancel the working
+            orders and place a new one), and the working orders it applies to
+        """
+        if self.order_book.needs_reconcile() and not self.reconcile_orders():
+            # Fills of orders the book did not know about leave no gap in it
+            self.reconcile_positions()
+        
+        working = self.order_book.for_instrument(self.instrument)
+        if len(working) == 1 and working[0].side == side and working[0].quantity == self.contract_size:
+            if abs(working[0].price - price) <= self.order_price_tolerance:
+                return 'keep', working
+            if callable(getattr(self.client, 'modify_order', None)):
+                return 'amend', working
+        return 'replace', working
+    
+    def _amend_order(self, order: WorkingOrder, price: float) -> bool:
+        """Move a working order to a new price; reconciles the book on failure."""
+        started = time.perf_counter()
+        try:
+            response = self.client.modify_order(order.order_id, price=price)
+        except Exception as e:
+            self._journal_order('amend', False, started, order.side, price, order.quantity, order.order_id)
+            logger.warning(f"Could not amend order {order.order_id}, reconciling orders: {e}")
+            self.reconcile_orders()
+            return False
+        
+        self._journal_order('amend', True, started, order.side, price, order.quantity, order.order_id)
+        self.order_book.add(order._replace(price=price))
+        logger.info(f"Amended {order.side} order {order.order_id} from {order.price} to {price}")
+        self._record_fill(order.order_id, order.side, response)
+        return True
+    
+    def _record_fill(self, order_id: str, side: str, response):
+        """Apply a fill reported in an order response to the position tracker."""
+        if not isinstance(response, dict):
+            return
+        status = str(response.get('status') or '').upper()
+        filled = response.get('filled_quantity') or (
+            response.get('quantity', self.contract_size) if status == 'FILLED' else 0)
+        price = response.get('fill_price', response.get('average_price', response.get('price')))
+        if not filled or price is None:
+            return
+        
+        position = self.position_tracker.apply_fill(self.instrument, side, filled, float(price))
+        logger.info(f"Order {order_id} filled: {side} {filled} at {price}, "
+                   f"position {position.quantity} @ {position.average_price}")
+        if status == 'FILLED':
+            self.order_book.remove(order_id)
     
     def place_limit_order(self, side: str, price: float) -> bool:
         """
-        Place a limit order.
+        Get a limit order working at a price.
+        
+        Working orders come from the local order book instead of a
+        get_orders call. An equal order that is already working is left
+        alone, a single order on the same side is amended when the client
+        supports it, and otherwise our working orders are cancelled and a new
+        order is placed. A failed amend is only followed by a replacement if
+        the order is still working after reconciling the book. Positions are
+        reconciled before working orders are cancelled, and nothing is placed
+        if one of them already filled.
         
         Args:
             side: 'BUY' or 'SELL'
             price: Limit price
             
         Returns:
-            True if order placed successfully, False otherwise
+            True if the order is working, False otherwise
         """
         try:
-            # Cancel existing orders first
-            self.cancel_all_orders()
-            
-            # Place new order - try different parameter formats
-            order_params = {
-                'instrument': self.instrument,
-                'order_type': 'LIMIT',
-                'side': side,
-                'quantity': self.contract_size,
-                'price': price
-            }
+            action, working = self._plan_order(side, price)
+            if self._filled_meanwhile():
+                return False
+            if action == 'keep':
+                logger.info(f"{side} order {working[0].order_id} already working at {price}, not resending")
+                return True
+            if action == 'amend':
+                order_id = working[0].order_id
+                if self._amend_order(working[0], price):
+                    return True
+                if self._filled_meanwhile():
+                    return False
+                working = self.order_book.for_instrument(self.instrument)
+                if order_id not in {order.order_id for order in working}:
+                    # Filled or cancelled at the broker, not a transient error
+                    logger.info(f"Order {order_id} is no longer working, not replacing it")
+                    return False
             
+            # Cancel our working orders, then place the new one
+            if working:
+                # Between reconciles the tracker only sees fills reported in
+                # our order responses, so check whether one of these filled
+                self.reconcile_positions()
+                if self._filled_meanwhile():
+                    self.order_book.mark_stale()
+                    return False
+            if not self._cancel_orders(working):
+                # It may have filled: the next iteration decides on the new position
+                logger.info(f"Not placing {side} order at {price}: a working order was not cancelled")
+                return False
+            return self._submit_limit_order(side, price)
+                
+        except Exception as e:
+            logger.error(f"Error placing order: {e}")
+            self.order_book.mark_stale()
+            return False
+    
+    def _cancel_orders(self, orders: List[WorkingOrder]) -> bool:
+        """Cancel working orders one after another; False if any had already finished."""
+        return all([self._cancel_order(order.order_id) for order in orders])
+    
+    def _filled_meanwhile(self) -> bool:
+        """Whether a reconcile found a position opened since the iteration checked."""
+        position = self.position_tracker.get(self.instrument)
+        if position.is_open:
+            logger.info(f"Position of {position.quantity} opened by a fill, not placing another order")
+        return position.is_open
+    
+    def _submit_limit_order(self, side: str, price: float) -> bool:
+        """Send a limit order and record its ID as the working order."""
+        # Place new order - try different parameter formats
+        order_params = {
+            'instrument': self.instrument,
+            'order_type': 'LIMIT',
+            'side': side,
+            'quantity': self.contract_size,
+            'price': price
+        }
+        
+        started = time.perf_counter()
+        try:
             try:
                 response = self.client.place_order(**order_params)
             except (TypeError, AttributeError):
@@ -266,76 +649,282 @@ class VWAPStrategy:
                     'time_in_force': 'GTC'
                 }
                 response = self.client.place_order(**order_params_alt)
-            
-            # Extract order ID from response
-            order_id = response.get('id') or response.get('order_id')
-            if order_id:
-                self.current_order_id = order_id
-                logger.info(f"Placed {side} limit order: {order_id} at {price}")
-                return True
-            else:
-                logger.warning(f"Order placed but no ID returned: {response}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error placing order: {e}")
+        except Exception:
+            self._journal_order('place', False, started, side, price, self.contract_size)
+            raise
+        
+        # Extract order ID from response
+        order_id = response.get('id') or response.get('order_id')
+        self._journal_order('place', bool(order_id), started, side, price, self.contract_size, order_id)
+        if order_id:
+            self.current_order_id = order_id
+            self.order_book.add(WorkingOrder(order_id, self.instrument, side, price, self.contract_size))
+            logger.info(f"Placed {side} limit order: {order_id} at {price}")
+            self._record_fill(order_id, side, response)
+            return True
+        else:
+            logger.warning(f"Order placed but no ID returned: {response}")
             return False
     
-    def execute_strategy(self):
-        """Execute one iteration of the strategy."""
-        logger.info("Executing strategy iteration...")
+    def band_width(self) -> Optional[float]:
+        """
+        Distance of the entry bands from VWAP.
+        
+        In 'stddev' mode this is read from the VWAP accumulator, so it is
+        current as of the last ``update_vwap``.
+        
+        Returns:
+            Price distance, or None if the standard deviation is not known yet
+        """
+        if self.band_mode == 'fixed':
+            return self.vwap_deviation
+        std = self.vwap_accumulator.std
+        return None if std is None else self.vwap_deviation * std
+    
+    def decide_entry(self, vwap: float, current_price: float) -> Optional[Tuple[str, float]]:
+        """
+        Decide which limit order, if any, the VWAP bands call for.
+        
+        Args:
+            vwap: Current VWAP
+            current_price: Current market price
+            
+        Returns:
+            (side, limit price) to place, or None if price is within the bands
+        """
+        width = self.band_width()
+        if width is None:
+            logger.info(f"VWAP: {vwap:.2f}, Current Price: {current_price:.2f}, "
+                       f"no standard deviation for the bands yet, no action taken")
+            metrics.DECISIONS.labels(self.instrument, 'none').inc()
+            return None
         
+        logger.info(f"VWAP: {vwap:.2f}, Current Price: {current_price:.2f}, "
+                   f"Deviation: {self.vwap_deviation} ({self.band_mode}, {width:.2f})")
+        
+        order = self._entry_order(vwap, current_price)
+        if order is None:
+            logger.info(f"Price within VWAP bands, no action taken")
+        elif order[0] == 'BUY':
+            logger.info(f"Price below long entry ({order[1]:.2f}), placing BUY order")
+        else:
+            logger.info(f"Price above short entry ({order[1]:.2f}), placing SELL order")
+        
+        metrics.DECISIONS.labels(self.instrument, order[0] if order else 'none').inc()
+        return order
+    
+    def _entry_order(self, vwap: float, current_price: float) -> Optional[Tuple[str, float]]:
+        """The order ``decide_entry`` places, without logging or counting the decision."""
+        width = self.band_width()
+        if width is None:
+            return None
+        long_entry = vwap - width
+        short_entry = vwap + width
+        if current_price <= long_entry:
+            return 'BUY', long_entry
+        if current_price >= short_entry:
+            return 'SELL', short_entry
+        return None
+    
+    def needs_evaluation(self, price: float) -> bool:
+        """
+        Whether a new quote could lead to an order.
+        
+        Quotes inside the bands of the last known VWAP cannot, so event-driven
+        callers skip the iteration (and its API calls) for them.
+        
+        Args:
+            price: Latest quoted price
+            
+        Returns:
+            True if the price is outside the bands or no VWAP is known yet
+        """
+        vwap = self.vwap_accumulator.vwap
+        if vwap is None or self.band_width() is None:
+            return True
+        return self._entry_order(vwap, price) is not None
+    
+    def execute_strategy(self, current_price: Optional[float] = None):
+        """
+        Execute one iteration of the strategy.
+        
+        Args:
+            current_price: Price from a market data event; quoted from the
+                client if omitted
+        """
+        with metrics.timed(metrics.ITERATION_SECONDS, self.instrument):
+            logger.info("Executing strategy iteration...")
+            self.iteration += 1
+            self.degraded = []
+            started = time.perf_counter()
+            with deadline(self.iteration_budget):
+                self._execute(started, current_price)
+    
+    def _execute(self, started: float, current_price: Optional[float],
+                 has_position: Optional[bool] = None, data: Optional[Bars] = None,
+                 fetch_seconds: float = 0.0):
+        """
+        Body of ``execute_strategy``, run under the iteration's deadline.
+        
+        Args:
+            started: ``time.perf_counter()`` at the start of the iteration
+            current_price: Price from a market data event, if any
+            has_position: Result of ``has_open_position`` if already checked
+            data: Bars from ``fetch_market_data`` if already fetched
+            fetch_seconds: Time it took to fetch ``data``
+        """
         # Check if we already have an open position
-        if self.has_open_position():
+        if has_position is None:
+            has_position = self.has_open_position()
+        if has_position:
             logger.info("Open position exists, skipping order placement")
+            self._finish_iteration(started, self.vwap_accumulator.vwap, current_price, 'position_open')
             return
         
         # Fetch market data and calculate VWAP
-        data = self.fetch_market_data()
-        vwap = self.calculate_vwap(data)
+        if data is None:
+            fetch_started = time.perf_counter()
+            data = self.fetch_market_data()
+            fetch_seconds = time.perf_counter() - fetch_started
+        fetched = time.perf_counter()
+        vwap = self.update_vwap(data)
+        timings = {'fetch_seconds': fetch_seconds,
+                   'vwap_seconds': time.perf_counter() - fetched}
         
         if vwap is None:
             logger.warning("Could not calculate VWAP, skipping iteration")
+            self._finish_iteration(started, None, current_price, 'no_vwap', data, **timings)
             return
         
-        # Get current price
-        current_price = self.get_current_price()
+        # Get current price unless an event already delivered one
+        if current_price is None:
+            current_price = self.get_current_price()
         if current_price is None:
             logger.warning("Could not get current price, skipping iteration")
+            self._finish_iteration(started, vwap, None, 'no_price', data, **timings)
             return
         
-        logger.info(f"VWAP: {vwap:.2f}, Current Price: {current_price:.2f}, "
-                   f"Deviation: {self.vwap_deviation}")
+        order = self.decide_entry(vwap, current_price)
+        if order is not None:
+            placing = time.perf_counter()
+            with metrics.timed(metrics.DECISION_TO_ORDER_SECONDS, self.instrument):
+                self.place_limit_order(*order)
+            timings['order_seconds'] = time.perf_counter() - placing
+        self._finish_iteration(started, vwap, current_price, order[0] if order else 'none',
+                               data, **timings)
+    
+    def _finish_iteration(self, started: float, vwap: Optional[float], current_price: Optional[float],
+                          decision: str, data: Optional[Bars] = None, **timings):
+        """Publish the outcome of an iteration and record it in the journal."""
+        self.publish_snapshot(vwap, current_price, decision)
+        if self.journal is None:
+            return
+        try:
+            self.journal.record_decision(
+                self.instrument, self.iteration, decision,
+                vwap=vwap,
+                band_width=self.band_width(),
+                price=current_price,
+                position=self.position_tracker.get(self.instrument).quantity,
+                bars_hash=bars_fingerprint(data) if data is not None else 0,
+                bar_count=bar_count(data) if data is not None else 0,
+                total_seconds=time.perf_counter() - started,
+                **timings
+            )
+        except Exception as e:
+            logger.error(f"Error journaling iteration {self.iteration}: {e}")
+    
+    def _journal_order(self, action: str, ok: bool, started: float, side: str = '',
+                       price: Optional[float] = None, quantity: int = 0,
+                       order_id: Optional[str] = None):
+        """Record an order call that started at ``started`` (perf_counter) in the journal."""
+        if self.journal is None:
+            return
+        try:
+            self.journal.record_order(self.instrument, self.iteration, action, ok, side=side,
+                                      price=price, quantity=quantity, order_id=order_id,
+                                      seconds=time.perf_counter() - started)
+        except Exception as e:
+            logger.error(f"Error journaling {action} of order {order_id}: {e}")
+    
+    def publish_snapshot(self, vwap: Optional[float], current_price: Optional[float],
+                         decision: str) -> StrategySnapshot:
+        """
+        Publish the state of an evaluation for API readers.
         
-        # Determine entry logic based on VWAP deviation
-        long_entry = vwap - self.vwap_deviation
-        short_entry = vwap + self.vwap_deviation
+        Args:
+            vwap: VWAP the evaluation used
+            current_price: Price the evaluation used
+            decision: Outcome of the evaluation (see ``StrategySnapshot``)
+            
+        Returns:
+            The new snapshot
+        """
+        width = self.band_width()
+        has_bands = vwap is not None and width is not None
+        self.snapshot = StrategySnapshot(
+            instrument=self.instrument,
+            vwap=vwap,
+            current_price=current_price,
+            deviation=self.vwap_deviation,
+            band_mode=self.band_mode,
+            band_width=width,
+            std=self.vwap_accumulator.std,
+            long_entry=vwap - width if has_bands else None,
+            short_entry=vwap + width if has_bands else None,
+            anchor=self.anchor,
+            session_start=self.session_start,
+            decision=decision,
+            timestamp=time.time()
+        )
+        return self.snapshot
+    
+    def refresh_snapshot(self) -> StrategySnapshot:
+        """
+        Re-evaluate VWAP and price and publish them, without placing orders.
         
-        # Place orders based on price relative to VWAP bands
-        if current_price <= long_entry:
-            logger.info(f"Price below long entry ({long_entry:.2f}), placing BUY order")
-            self.place_limit_order('BUY', long_entry)
-        elif current_price >= short_entry:
-            logger.info(f"Price above short entry ({short_entry:.2f}), placing SELL order")
-            self.place_limit_order('SELL', short_entry)
-        else:
-            logger.info(f"Price within VWAP bands, no action taken")
+        Used when the published snapshot is too old, e.g. between timer runs.
+        
+        Returns:
+            The new snapshot
+        """
+        vwap = self.update_vwap(self.fetch_market_data())
+        current_price = self.get_current_price()
+        if self.has_open_position():
+            return self.publish_snapshot(vwap, current_price, 'position_open')
+        if vwap is None:
+            return self.publish_snapshot(None, current_price, 'no_vwap')
+        if current_price is None:
+            return self.publish_snapshot(vwap, None, 'no_price')
+        # Same bands as decide_entry, but a refresh is not a decision to count
+        order = self._entry_order(vwap, current_price)
+        return self.publish_snapshot(vwap, current_price, order[0] if order else 'none')
+    
+    def stop(self):
+        """Stop ``run`` at once, also while it waits for the next check."""
+        self._stop_event.set()
     
     def run(self):
-        """Run the strategy loop."""
+        """Run the strategy loop until ``stop`` is called."""
         logger.info("Starting VWAP strategy...")
         logger.info(f"Configuration: deviation={self.vwap_deviation}, "
                    f"interval={self.timer_interval}s, size={self.contract_size}")
         
+        scheduler = Scheduler()
+        due = scheduler.now()
+        self._stop_event.clear()
         try:
-            while True:
+            while not self._stop_event.is_set():
                 try:
                     self.execute_strategy()
                 except Exception as e:
                     logger.error(f"Error in strategy execution: {e}", exc_info=True)
                 
-                logger.info(f"Waiting {self.timer_interval} seconds until next check...")
-                time.sleep(self.timer_interval)
+                # Next bar close one interval after this run was due, so run time does not drift
+                due = scheduler.next_due(due, self.timer_interval)
+                logger.info(f"Waiting {due - scheduler.now():.0f} seconds until next check...")
+                scheduler.wait(self._stop_event, due)
+            logger.info("Strategy stopped")
                 
         except KeyboardInterrupt:
             logger.info("Strategy stopped by user")
@@ -345,3 +934,19 @@ class VWAPStrategy:
             self.cancel_all_orders()
             raise
 
+
+def extract_price(market_data) -> Optional[float]:
+    """Price from a get_market_data response, or None if it has none."""
+    if not market_data:
+        return None
+    # Try different possible keys for price
+    price_keys = ['last_price', 'price', 'close', 'last', 'current_price']
+    for key in price_keys:
+        if key in market_data:
+            return float(market_data[key])
+    return None
+
+
+def _minute_floor(timestamp: datetime.datetime) -> datetime.datetime:
+    """Start of the minute containing a timestamp, i.e. the forming bar."""
+    return timestamp.replace(second=0, microsecond=0)